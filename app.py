@@ -10,45 +10,63 @@
 
 from __future__ import annotations
 
+import html
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from flask import Flask, abort, redirect, render_template_string, request, url_for
+from flask import Flask, Response, abort, jsonify, redirect, render_template_string, request, url_for
 
 from pat.config import (
+    ALL_ACTIONS,
     APP_NAME,
     KEYRING_PATH,
     LOG_PATH,
     DEFAULT_POLICY,
+    EVENTS_PAGE_SIZE,
+    HTTP_CACHE_ENTRIES,
+    INGEST_MAX_ITEMS,
     PRESETS,
+    VERIFY_MAX_ERRORS,
 )
 from pat.ledger import (
-    append_receipt,
+    LedgerHead,
+    configure_storage,
+    configure_writer,
+    consistency_proof,
     ensure_log_exists,
     find_latest_by_event_id,
-    read_all_receipts,
+    get_ledger_head,
+    inclusion_proof,
+    is_record_boundary,
+    tail_receipts,
     tamper_last_log_line,
-    verify_chain,
+    verify_ledger,
     reset_log,
 )
+from pat.httpcache import ResponseCache, etag_matches, head_etag, receipt_etag, verify_etag
 from pat.keys import (
     ensure_demo_approver,
     ensure_keyring_exists,
     get_public_key_b64,
+    keyring_stamp,
     load_keyring,
     new_approver_keypair,
     verify_signature,
 )
 from pat.receipt import (
-    build_approval_transition,
-    build_new_receipt,
+    append_approval_transition,
+    append_new_receipt,
+    append_new_receipts,
 )
+from pat.query import EventFilter, event_summary
 from pat.replay import replay_and_compare
-from pat.hashing import compute_rules_hash
 
 app = Flask(__name__)
 
+# Rendered read pages; see _conditional.
+_responses = ResponseCache(HTTP_CACHE_ENTRIES)
+
 
 BASE_HTML = """
 <!doctype html>
@@ -230,7 +248,7 @@ def index():
     policy_version=DEFAULT_POLICY.version,
     threshold=DEFAULT_POLICY.confidence_threshold,
     high_stakes=json.dumps(list(DEFAULT_POLICY.high_stakes_actions), indent=2),
-    rules_hash=compute_rules_hash(DEFAULT_POLICY.as_text()),
+    rules_hash=DEFAULT_POLICY.compile().rules_hash,
     )
     return page(body, subtitle="Receipts, not vibes. Deterministic policy + append-only audit trail.")
 
@@ -241,7 +259,7 @@ def preset():
     if preset_id not in PRESETS:
         abort(400, "Unknown preset.")
     p = PRESETS[preset_id]
-    receipt = build_new_receipt(
+    receipt = append_new_receipt(
         prompt=p["prompt"],
         model_output_raw=p["model_output"],
         proposed_action_type=p["action_type"],
@@ -250,7 +268,6 @@ def preset():
         confidence_override=p["confidence"],
         policy=DEFAULT_POLICY,
     )
-    append_receipt(receipt)
     return redirect(url_for("event", event_id=receipt["event_id"]))
 
 
@@ -281,7 +298,7 @@ def submit():
         except Exception:
             abort(400, "Action Params must be valid JSON.")
 
-    receipt = build_new_receipt(
+    receipt = append_new_receipt(
         prompt=prompt,
         model_output_raw=model_output,
         proposed_action_type=action_type,
@@ -290,47 +307,238 @@ def submit():
         confidence_override=confidence_override,
         policy=DEFAULT_POLICY,
     )
-    append_receipt(receipt)
     return redirect(url_for("event", event_id=receipt["event_id"]))
 
 
+def _ingest_item(i: int, item: Any) -> Dict[str, Any]:
+    # Same checks as /submit, for one batch item.
+    if not isinstance(item, dict):
+        raise ValueError(f"Item {i}: must be a JSON object.")
+    for field in ("prompt", "model_output", "action_type", "target"):
+        if not isinstance(item.get(field, ""), str):
+            raise ValueError(f"Item {i}: {field} must be a string.")
+    confidence = item.get("confidence")
+    if confidence is not None:
+        if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+            raise ValueError(f"Item {i}: confidence must be a number between 0 and 1.")
+        if not (0.0 <= confidence <= 1.0):
+            raise ValueError(f"Item {i}: confidence must be between 0 and 1.")
+    params = item.get("params") or {}
+    if not isinstance(params, dict):
+        raise ValueError(f"Item {i}: params must be a JSON object.")
+    return {
+        "prompt": item.get("prompt", "").strip(),
+        "model_output_raw": item.get("model_output", "").strip(),
+        "proposed_action_type": item.get("action_type", "").strip().upper(),
+        "proposed_action_target": item.get("target", "").strip(),
+        "proposed_action_params": params,
+        "confidence_override": None if confidence is None else float(confidence),
+    }
+
+
+def _ingest_items() -> List[Dict[str, Any]]:
+    # NDJSON (one item per line), a JSON array, or {"items": [...]}.
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        raw = []
+        for n, line in enumerate(request.get_data().splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                raw.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Line {n}: invalid JSON.") from None
+    else:
+        body = request.get_json(silent=True)
+        raw = body.get("items") if isinstance(body, dict) else body
+        if not isinstance(raw, list):
+            raise ValueError("Body must be NDJSON, a JSON array or {\"items\": [...]}.")
+    if not raw:
+        raise ValueError("No items.")
+    if len(raw) > INGEST_MAX_ITEMS:
+        raise ValueError(f"At most {INGEST_MAX_ITEMS} items per request.")
+    return [_ingest_item(i, item) for i, item in enumerate(raw)]
+
+
+@app.post("/api/receipts")
+def ingest():
+    # Batch ingestion: validates every item first, then builds, chains and
+    # appends them all in one ledger critical section and one write.
+    try:
+        items = _ingest_items()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = []
+    for i, outcome in enumerate(append_new_receipts(items, policy=DEFAULT_POLICY)):
+        if isinstance(outcome, Exception):
+            results.append({"index": i, "error": str(outcome)})
+            continue
+        integ = outcome["integrity"]
+        results.append({
+            "index": i,
+            "event_id": outcome["event_id"],
+            "decision": outcome["decision"]["result"],
+            "canonical_hash": integ["canonical_hash"],
+            "this_hash": integ["this_hash"],
+        })
+    ok = all("error" not in r for r in results)
+    return jsonify({"count": sum("error" not in r for r in results), "receipts": results}), (201 if ok else 207)
+
+
+def _conditional(key: Any, tag: str, current: Callable[[], Tuple[str, Any]], render: Callable[[Any], str],
+                 content_type: str = "text/html; charset=utf-8") -> Response:
+    # Serves a read page from _responses while the ledger state behind it
+    # (`tag`) is unchanged, and answers If-None-Match with 304.
+    etag, body = _responses.get(key, tag, current, render)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status=304, headers=headers)
+    return Response(body, content_type=content_type, headers=headers)
+
+
+def _ledger_wide(key: Any, render: Callable[[], str], content_type: str = "text/html; charset=utf-8",
+                 etag_of: Callable[[LedgerHead], str] = head_etag) -> Response:
+    # For pages derived from the whole ledger: the ETag is the head's.
+    tag = etag_of(get_ledger_head())
+    return _conditional(key, tag, lambda: (tag, None), lambda _: render(), content_type)
+
+
+def _per_receipt(key: Any, event_id: str, render: Callable[[Dict[str, Any]], str], *extra: Any,
+                 content_type: str = "text/html; charset=utf-8") -> Response:
+    # For one event's pages: the ETag is its latest receipt's hash, so the
+    # cached page outlives appends of other events.
+    def current() -> Tuple[str, Dict[str, Any]]:
+        r = find_latest_by_event_id(event_id)
+        if not r:
+            abort(404, "Event not found.")
+        return receipt_etag(r, *extra), r
+
+    return _conditional(key, head_etag(get_ledger_head(), *extra), current, render, content_type)
+
+
+def _events_args() -> Tuple[EventFilter, Optional[int]]:
+    before: Optional[int] = None
+    before_str = (request.args.get("before") or "").strip()
+    if before_str:
+        try:
+            before = int(before_str)
+        except ValueError:
+            abort(400, "Invalid cursor.")
+    try:
+        where = EventFilter.from_params(request.args)
+    except ValueError as e:
+        abort(400, str(e))
+    return where, before
+
+
+def _events_page(where: EventFilter, before: Optional[int]) -> Tuple[List[Tuple[int, Dict[str, Any]]], Optional[int]]:
+    if before is not None and not is_record_boundary(before):
+        abort(400, "Invalid cursor.")
+    return tail_receipts(EVENTS_PAGE_SIZE, before=before, where=where)
+
+
+def _filter_form(where: EventFilter) -> str:
+    params = where.as_params()
+
+    def choice(name: str, label: str, options: List[Tuple[str, str]]) -> str:
+        opts = "".join(
+            f'<option value="{value}"{" selected" if params.get(name, "") == value else ""}>{text}</option>'
+            for value, text in [("", "any")] + options
+        )
+        return f'<div><label>{label}</label><select name="{name}">{opts}</select></div>'
+
+    def text(name: str, label: str, placeholder: str) -> str:
+        value = html.escape(params.get(name, ""), quote=True)
+        return f'<div><label>{label}</label><input name="{name}" value="{value}" placeholder="{placeholder}"/></div>'
+
+    actions = [(a, a) for a in sorted(ALL_ACTIONS)]
+    yes_no = [("1", "yes"), ("0", "no")]
+    return f"""
+      <form method="get" action="{url_for('events')}">
+        <div class="row">
+          {choice("decision", "Decision", [("BLOCKED", "BLOCKED"), ("PERMITTED", "PERMITTED")])}
+          {choice("action", "Action", actions)}
+          {choice("required", "Approval required", yes_no)}
+          {choice("approved", "Approved", yes_no)}
+        </div>
+        <div class="row">
+          {text("approver", "Approver", "alice.ops")}
+          {text("policy", "Policy version", DEFAULT_POLICY.version)}
+          {text("since", "Since (UTC)", "2026-01-21T00:00:00Z")}
+          {text("until", "Until (UTC, exclusive)", "")}
+        </div>
+        <div class="row" style="margin-top: 10px;">
+          <button type="submit">Filter</button>
+          <a href="{url_for('events')}" class="tiny" style="align-self: center;">Clear</a>
+        </div>
+      </form>
+    """
+
+
 @app.get("/events")
 def events():
-    receipts = list(reversed(read_all_receipts()))
+    where, before = _events_args()
+    return _ledger_wide(("events", where, before), lambda: _render_events(where, before))
+
+
+def _render_events(where: EventFilter, before: Optional[int]) -> str:
+    page_receipts, next_cursor = _events_page(where, before)
     rows = []
-    for r in receipts[:250]:
-        eid = r.get("event_id")
-        dec = (r.get("decision") or {}).get("result", "?")
-        action = (r.get("proposed_action") or {}).get("type", "")
-        approved = bool((r.get("approval") or {}).get("approved", False))
+    for offset, r in page_receipts:
+        e = event_summary(offset, r)
+        eid, dec = e["event_id"], e["decision"]
         b = badge_for(dec)
         rows.append(f"""
           <li style="margin: 8px 0;">
             <span class="badge {b}">{dec}</span>
             <span style="margin-left: 8px;"><a href="{url_for('event', event_id=eid)}"><b>{eid}</b></a></span>
-            <span class="tiny muted" style="margin-left: 8px;">action={action} approved={approved}</span>
+            <span class="tiny muted" style="margin-left: 8px;">action={e["action"]} approved={e["approved"]}</span>
           </li>
         """)
 
+    params = where.as_params()
+    links = []
+    if before is not None:
+        links.append(f'<a href="{url_for("events", **params)}">&larr; Newest</a>')
+    if next_cursor is not None:
+        links.append(f'<a href="{url_for("events", before=next_cursor, **params)}">Older &rarr;</a>')
+    pager = f'<div class="hr"></div><div class="row tiny">{" &nbsp;|&nbsp; ".join(links)}</div>' if links else ""
+    empty = "No matching events." if params else "No events yet."
+
     body = f"""
     <div class="card">
       <h3>Events</h3>
       <div class="tiny muted">Newest first. Multiple append-only receipts may exist for the same event_id (approval transition).</div>
+      {_filter_form(where)}
       <div class="hr"></div>
       <ul style="list-style:none; padding:0; margin:0;">
-        {''.join(rows) if rows else '<li class="muted">No events yet.</li>'}
+        {''.join(rows) if rows else f'<li class="muted">{empty}</li>'}
       </ul>
+      {pager}
     </div>
     """
     return page(body, subtitle="Browse the append-only ledger.")
 
 
+@app.get("/api/events")
+def api_events():
+    # Same filters and cursor as /events; pages of EVENTS_PAGE_SIZE.
+    where, before = _events_args()
+
+    def render() -> str:
+        page_receipts, next_cursor = _events_page(where, before)
+        return json.dumps({"events": [event_summary(o, r) for o, r in page_receipts], "next_before": next_cursor})
+
+    return _ledger_wide(("api_events", where, before), render, "application/json")
+
+
 @app.get("/event/<event_id>")
 def event(event_id: str):
-    r = find_latest_by_event_id(event_id)
-    if not r:
-        abort(404, "Event not found.")
+    # Signature checks and the approver list also depend on the keyring.
+    return _per_receipt(("event", event_id), event_id, lambda r: _render_event(event_id, r), keyring_stamp())
 
+
+def _render_event(event_id: str, r: Dict[str, Any]) -> str:
     decision = (r.get("decision") or {}).get("result", "BLOCKED")
     reason = (r.get("decision") or {}).get("reason", "")
     badge = badge_for(decision)
@@ -423,7 +631,7 @@ def event(event_id: str):
         <div class="hr"></div>
 
         <div class="row">
-          <div><a href="{{ url_for('receipt_json', event_id=event_id) }}">Receipt JSON</a></div>
+          <div><a href="{{ url_for('receipt_json', event_id=event_id) }}">Receipt JSON</a> · <a href="{{ url_for('proof', event_id=event_id) }}">Inclusion proof</a></div>
           <div style="text-align:right;"><a href="{{ url_for('replay', event_id=event_id) }}"><b>Replay →</b></a></div>
         </div>
 
@@ -471,17 +679,16 @@ def approve(event_id: str):
     if not get_public_key_b64(approver_id):
         abort(400, "Unknown approver ID.")
 
-    updated = build_approval_transition(r, approver_id=approver_id, policy=DEFAULT_POLICY)
-    append_receipt(updated)
+    append_approval_transition(r, approver_id=approver_id, policy=DEFAULT_POLICY)
     return redirect(url_for("event", event_id=event_id))
 
 
 @app.get("/receipt/<event_id>.json")
 def receipt_json(event_id: str):
-    r = find_latest_by_event_id(event_id)
-    if not r:
-        abort(404, "Event not found.")
+    return _per_receipt(("receipt", event_id), event_id, lambda r: _render_receipt(event_id, r))
+
 
+def _render_receipt(event_id: str, r: Dict[str, Any]) -> str:
     body = render_template_string("""
       <div class="card">
         <h3>Receipt JSON</h3>
@@ -496,14 +703,46 @@ def receipt_json(event_id: str):
     return page(body, subtitle="The receipt is the product.")
 
 
+def _tree_size_arg(name: str) -> Optional[int]:
+    raw = (request.args.get(name) or "").strip()
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        abort(400, f"{name} must be an integer.")
+
+
+@app.get("/proof/<event_id>")
+def proof(event_id: str):
+    # RFC 6962 inclusion proof for the event's newest receipt.
+    try:
+        p = inclusion_proof(event_id, _tree_size_arg("tree_size"))
+    except ValueError as e:
+        abort(400, str(e))
+    if not p:
+        abort(404, "Event not found.")
+    return jsonify(p)
+
+
+@app.get("/proof/consistency")
+def proof_consistency():
+    first = _tree_size_arg("first")
+    if first is None:
+        abort(400, "first is required.")
+    try:
+        return jsonify(consistency_proof(first, _tree_size_arg("second")))
+    except ValueError as e:
+        abort(400, str(e))
+
+
 @app.get("/replay/<event_id>")
 def replay(event_id: str):
     r = find_latest_by_event_id(event_id)
     if not r:
         abort(404, "Event not found.")
 
-    receipts = read_all_receipts()
-    chain_ok, chain_errors = verify_chain(receipts)
+    chain_ok, chain_errors = verify_ledger()
 
     replay_result = replay_and_compare(r, DEFAULT_POLICY)
 
@@ -593,7 +832,7 @@ def replay(event_id: str):
     sig_ok=sig_ok,
     stored=json.dumps(replay_result["stored"], indent=2, ensure_ascii=False),
     recomputed=json.dumps(replay_result["recomputed"], indent=2, ensure_ascii=False),
-    rules_hash=compute_rules_hash(DEFAULT_POLICY.as_text()),
+    rules_hash=DEFAULT_POLICY.compile().rules_hash,
     canonical_hash=(r.get("integrity") or {}).get("canonical_hash"),
     )
     return page(body, subtitle="Replay = same inputs → same checks → same outcome → same receipt.")
@@ -609,8 +848,17 @@ def tamper():
 
 @app.get("/verify")
 def verify():
-    receipts = read_all_receipts()
-    ok, errors = verify_chain(receipts)
+    # full=1 asks for a fresh re-verification, so it is never served cached.
+    if request.args.get("full") == "1":
+        return _render_verify(full=True)
+    return _ledger_wide(("verify",), lambda: _render_verify(full=False), etag_of=verify_etag)
+
+
+def _render_verify(full: bool) -> str:
+    # One error past the cap tells "exactly VERIFY_MAX_ERRORS" from "more".
+    ok, errors = verify_ledger(full=full, max_errors=VERIFY_MAX_ERRORS + 1)
+    truncated = len(errors) > VERIFY_MAX_ERRORS
+    del errors[VERIFY_MAX_ERRORS:]
 
     body = render_template_string("""
       <div class="card">
@@ -618,6 +866,9 @@ def verify():
         <div>
           <span class="badge {{ 'ok' if ok else 'bad' }}">{{ 'VERIFIED' if ok else 'FAILED' }}</span>
           <span class="tiny muted" style="margin-left: 10px;">records={{ n }}</span>
+          <span class="tiny muted" style="margin-left: 10px;">
+            {% if full %}full re-verify{% else %}incremental (<a href="{{ url_for('verify', full=1) }}">full re-verify</a>){% endif %}
+          </span>
         </div>
 
         <div class="hr"></div>
@@ -639,7 +890,7 @@ def verify():
 
         {% if not ok %}
           <div class="hr"></div>
-          <h3>Errors</h3>
+          <h3>{{ errors|length }}{{ '+' if truncated else '' }} errors</h3>
           <ul class="checks">
             {% for e in errors %}
               <li><span class="badge bad">FAIL</span> <span style="margin-left:8px;">{{ e }}</span></li>
@@ -647,10 +898,19 @@ def verify():
           </ul>
         {% else %}
           <div class="hr"></div>
-          <div class="muted">Chain is consistent. Edit any line in JSONL and this turns red.</div>
+          {% if full %}
+            <div class="muted">Chain is consistent: every record, sealed segments included, was re-hashed and linked. Edit any line in JSONL and this turns red.</div>
+          {% else %}
+            <div class="muted">
+              Chain is consistent from the last verified record onward; earlier records were checked
+              by previous runs and are not re-hashed, and sealed segments are checked against their
+              manifests. An in-place edit before that point only shows up
+              in a <a href="{{ url_for('verify', full=1) }}">full re-verify</a>.
+            </div>
+          {% endif %}
         {% endif %}
       </div>
-    """, ok=ok, errors=errors, n=len(receipts))
+    """, ok=ok, errors=errors, truncated=truncated, n=get_ledger_head().count, full=full)
     return page(body, subtitle="Tamper-evidence check for the append-only ledger.")
 
 
@@ -724,9 +984,19 @@ if __name__ == "__main__":
     ensure_keyring_exists()
     ensure_demo_approver()
 
+    # e.g. PAT_STORAGE=sqlite:pat_ledger.db (default: the JSONL log)
+    if os.environ.get("PAT_STORAGE"):
+        configure_storage(os.environ["PAT_STORAGE"])
+
+    # e.g. PAT_FSYNC_POLICY=always | none | batch(5ms,64)
+    if os.environ.get("PAT_FSYNC_POLICY"):
+        configure_writer(os.environ["PAT_FSYNC_POLICY"])
+
     print(f"{APP_NAME} running")
     print(f"Log:     {os.path.abspath(LOG_PATH)}")
+    print(f"Storage: {os.environ.get('PAT_STORAGE') or 'jsonl'}")
     print(f"Keyring: {os.path.abspath(KEYRING_PATH)}")
+    print(f"Fsync:   {os.environ.get('PAT_FSYNC_POLICY') or 'off (no writer thread)'}")
     print("Open: http://127.0.0.1:5000")
 
     app.run(host="127.0.0.1", port=int(os.environ.get("PORT", "5000")), debug=True)
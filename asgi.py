@@ -0,0 +1,220 @@
+# asgi.py
+# PAT read API as a dependency-free ASGI app, for many concurrent auditors.
+# Serves /events, /event/<id>, /receipt/<id>.json and /verify as JSON.
+# Ledger scans, hashing and signature checks run in a bounded thread pool,
+# so the event loop holds idle connections without a thread each, and
+# identical in-flight requests share one call. Bodies are cached until the
+# ledger head moves and carry ETags, so polling with If-None-Match gets 304s.
+#
+# Run:
+#   pip install uvicorn
+#   uvicorn asgi:app --port 5001
+#
+# Appends still go through app.py (or pat.receipt) in the same directory.
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from pat.config import EVENTS_PAGE_SIZE, HTTP_CACHE_ENTRIES, VERIFY_MAX_ERRORS
+from pat.httpcache import ResponseCache, etag_matches, head_etag, receipt_etag, verify_etag
+from pat.keys import keyring_stamp, verify_signature
+from pat.query import EventFilter, event_summary
+from pat.ledger import (
+    configure_storage,
+    ensure_log_exists,
+    find_latest_by_event_id,
+    get_ledger_head,
+    is_record_boundary,
+    tail_receipts,
+    verify_ledger,
+)
+
+READ_WORKERS = int(os.environ.get("PAT_READ_WORKERS", "8"))
+
+# Same storage as the app.py appending next to it, e.g. sqlite:pat_ledger.db.
+if os.environ.get("PAT_STORAGE"):
+    configure_storage(os.environ["PAT_STORAGE"])
+
+_executor: Optional[ThreadPoolExecutor] = None
+_inflight: Dict[Tuple[Any, ...], "asyncio.Future[Tuple[Optional[str], bytes]]"] = {}
+_responses = ResponseCache(HTTP_CACHE_ENTRIES)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _events(before: Optional[int], where: EventFilter) -> Dict[str, Any]:
+    if before is not None and not is_record_boundary(before):
+        raise HTTPError(400, "Invalid cursor.")
+    page, next_cursor = tail_receipts(EVENTS_PAGE_SIZE, before=before, where=where)
+    return {
+        "events": [event_summary(offset, r) for offset, r in page],
+        "next_before": next_cursor,
+    }
+
+
+def _receipt(event_id: str) -> Dict[str, Any]:
+    r = find_latest_by_event_id(event_id)
+    if not r:
+        raise HTTPError(404, "Event not found.")
+    return r
+
+
+def _event(event_id: str) -> Dict[str, Any]:
+    return _event_of(_receipt(event_id))
+
+
+def _event_of(r: Dict[str, Any]) -> Dict[str, Any]:
+    approval = r.get("approval") or {}
+    sig_ok = False
+    if approval.get("approved") and approval.get("approver_id") and approval.get("signature"):
+        canonical_hash = (r.get("integrity") or {}).get("canonical_hash")
+        sig_ok = verify_signature(approval["approver_id"], canonical_hash, approval["signature"])
+    return {"receipt": r, "signature_verified": sig_ok}
+
+
+def _verify(full: bool) -> Dict[str, Any]:
+    # At most VERIFY_MAX_ERRORS errors; "truncated" says there are more.
+    # One past the cap is collected to tell the two apart.
+    ok, errors = verify_ledger(full=full, max_errors=VERIFY_MAX_ERRORS + 1)
+    return {
+        "ok": ok,
+        "errors": errors[:VERIFY_MAX_ERRORS],
+        "truncated": len(errors) > VERIFY_MAX_ERRORS,
+        "records": get_ledger_head().count,
+        "full": full,
+    }
+
+
+def _encode(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _cached(fn: Callable[..., Any], *args: Any) -> Tuple[Optional[str], bytes]:
+    # (ETag, body) for fn(*args). Whole-ledger resources are tagged with the
+    # head; per-event ones with the receipt's own hash (and the keyring,
+    # for signature checks), so they outlive appends of other events.
+    # A full re-verify is always computed and never tagged; the incremental
+    # one is also tagged with the active file's inode and mtime.
+    if fn is _verify and args[0]:
+        return None, _encode(fn(*args))
+    if fn in (_receipt, _event):
+        extra = (keyring_stamp(),) if fn is _event else ()
+
+        def current() -> Tuple[str, Dict[str, Any]]:
+            r = _receipt(args[0])
+            return receipt_etag(r, *extra), r
+
+        render = _event_of if fn is _event else (lambda r: r)
+        return _responses.get((fn.__name__,) + args, head_etag(get_ledger_head(), *extra), current,
+                              lambda r: _encode(render(r)))
+    tag = (verify_etag if fn is _verify else head_etag)(get_ledger_head())
+    return _responses.get((fn.__name__,) + args, tag, lambda: (tag, None), lambda _: _encode(fn(*args)))
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(READ_WORKERS, thread_name_prefix="pat-read")
+    return _executor
+
+
+async def _offload(fn: Callable[..., Any], *args: Any) -> Tuple[Optional[str], bytes]:
+    # Runs fn (and the JSON encoding) in the read pool. Concurrent requests
+    # for the same resource await the same call instead of queueing copies.
+    key = (fn.__name__,) + args
+    fut = _inflight.get(key)
+    if fut is None:
+        fut = asyncio.get_running_loop().run_in_executor(_pool(), _cached, fn, *args)
+        _inflight[key] = fut
+        fut.add_done_callback(lambda _f: _inflight.pop(key, None))
+    return await asyncio.shield(fut)
+
+
+def _int_arg(query: Dict[str, List[str]], name: str) -> Optional[int]:
+    raw = (query.get(name) or [""])[0].strip()
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise HTTPError(400, "Invalid cursor.") from None
+
+
+def _filter_arg(query: Dict[str, List[str]]) -> EventFilter:
+    try:
+        return EventFilter.from_params({name: values[0] for name, values in query.items()})
+    except ValueError as e:
+        raise HTTPError(400, str(e)) from None
+
+
+async def _route(path: str, query: Dict[str, List[str]]) -> Tuple[Optional[str], bytes]:
+    if path == "/events":
+        return await _offload(_events, _int_arg(query, "before"), _filter_arg(query))
+    if path == "/verify":
+        return await _offload(_verify, (query.get("full") or [""])[0] == "1")
+    if path.startswith("/receipt/") and path.endswith(".json"):
+        return await _offload(_receipt, path[len("/receipt/"):-len(".json")])
+    if path.startswith("/event/") and "/" not in path[len("/event/"):]:
+        return await _offload(_event, path[len("/event/"):])
+    raise HTTPError(404, "Not found.")
+
+
+async def _respond(send: Callable[..., Any], status: int, body: bytes, etag: Optional[str] = None) -> None:
+    headers = [] if status == 304 else [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"content-length", str(len(body)).encode("ascii")),
+    ]
+    if etag is not None:
+        headers += [(b"etag", etag.encode("ascii")), (b"cache-control", b"no-cache")]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+    global _executor
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            ensure_log_exists()
+            _pool()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _executor is not None:
+                _executor.shutdown(wait=True)
+                _executor = None
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    if scope["method"] != "GET":
+        await _respond(send, 405, b'{"error":"Read-only API."}')
+        return
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    etag: Optional[str] = None
+    try:
+        etag, body = await _route(scope["path"], query)
+        status = 200
+    except HTTPError as e:
+        body = json.dumps({"error": str(e)}).encode("utf-8")
+        status = e.status
+    if etag is not None:
+        if_none_match = next((v.decode("latin-1") for k, v in scope.get("headers", []) if k == b"if-none-match"), None)
+        if etag_matches(if_none_match, etag):
+            status, body = 304, b""
+    await _respond(send, status, body, etag)
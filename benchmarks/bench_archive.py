@@ -0,0 +1,80 @@
+# benchmarks/bench_archive.py
+# Sealed segments as plain JSONL vs. block-compressed archives: bytes on
+# disk, random find_latest_by_event_id latency (one block decompressed per
+# miss) and full re-hash verification.
+#
+# Run:
+#   python benchmarks/bench_archive.py [--receipts 20000] [--codec zlib] [--block-kb 128]
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pat.archive as archive  # noqa: E402
+from pat.config import DEFAULT_POLICY, SEGMENTS_DIR  # noqa: E402
+from pat.ledger import archive_segments, find_latest_by_event_id, reset_log, rotate_segment, verify_ledger  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+from pat.segments import load_manifests  # noqa: E402
+
+
+def measure(event_ids):
+    on_disk = sum(os.path.getsize(m.path) for m in load_manifests(SEGMENTS_DIR))
+    archive._blocks.clear()
+    t0 = time.perf_counter()
+    for eid in event_ids:
+        find_latest_by_event_id(eid)
+    lookup = (time.perf_counter() - t0) / len(event_ids)
+    t0 = time.perf_counter()
+    ok, _ = verify_ledger(full=True, trust_sealed=False)
+    verify = time.perf_counter() - t0
+    assert ok
+    return on_disk, lookup, verify
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=20000)
+    ap.add_argument("--codec", default="zlib")
+    ap.add_argument("--block-kb", type=int, default=128)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    event_ids = []
+    for i in range(0, args.receipts, 1000):
+        batch = [
+            {
+                "prompt": f"Unattended bag reported near entrance {j % 7}. Staff on site.",
+                "model_output_raw": f"Recommendation: review footage. confidence: 0.{60 + j % 40}",
+                "proposed_action_type": ("NOTIFY", "LOCKDOWN", "LOG_ONLY")[j % 3],
+                "proposed_action_target": "SCHOOL_12",
+                "proposed_action_params": {"camera": j % 16},
+                "confidence_override": None,
+            }
+            for j in range(i, min(i + 1000, args.receipts))
+        ]
+        event_ids += [r["event_id"] for r in append_new_receipts(batch, policy=DEFAULT_POLICY)]
+        if (i // 1000) % 5 == 4:
+            rotate_segment()
+    rotate_segment()
+    sample = random.Random(0).sample(event_ids, min(500, len(event_ids)))
+
+    rows = [("plain",) + measure(sample)]
+    archive_segments(codec=args.codec, block_bytes=args.block_kb * 1024)
+    rows.append((args.codec,) + measure(sample))
+
+    print(f"{args.receipts} receipts in {len(load_manifests(SEGMENTS_DIR))} sealed segments")
+    print(f"  {'format':<6} {'MB on disk':>10} {'lookup us':>10} {'full verify s':>14}")
+    for label, size, lookup, verify in rows:
+        print(f"  {label:<6} {size / 1e6:>10.2f} {lookup * 1e6:>10.0f} {verify:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_canonical.py
+# Microseconds per receipt to hash and encode one receipt: the old path
+# (deep-copy payload via a JSON round-trip, encode it, then encode the whole
+# receipt again for the line) vs. CanonicalReceipt, which encodes each
+# section once and reuses the bytes for the line.
+#
+# Run:
+#   python benchmarks/bench_canonical.py [--number 20000]
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.hashing import CanonicalReceipt, canonical_json, receipt_canonical_payload  # noqa: E402
+from pat.keys import ensure_demo_approver  # noqa: E402
+from pat.receipt import build_approval_transition, build_new_receipt  # noqa: E402
+
+
+def legacy(receipt) -> bytes:
+    payload = receipt_canonical_payload(receipt)
+    hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+    return (canonical_json(receipt) + "\n").encode("utf-8")
+
+
+def legacy_approval_copy(receipt) -> bytes:
+    return legacy(json.loads(canonical_json(receipt)))
+
+
+def single_pass(receipt) -> bytes:
+    enc = CanonicalReceipt(receipt)
+    enc.canonical_hash()
+    return enc.line()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--number", type=int, default=20000)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    new = build_new_receipt(
+        prompt="Intruder reported near the east gate. " * 4,
+        model_output_raw="Recommendation: Lockdown. confidence: 0.92",
+        proposed_action_type="LOCKDOWN",
+        proposed_action_target="SCHOOL_12",
+        proposed_action_params={"zones": ["A", "B", "C"], "note": "ünïcødé"},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+    )
+    approved = build_approval_transition(new, approver_id=ensure_demo_approver(), policy=DEFAULT_POLICY)
+
+    for label, r in [("new receipt", new), ("approved receipt", approved)]:
+        assert single_pass(r) == legacy(r)
+        print(f"{label} ({len(legacy(r))} bytes)")
+        cases = [("legacy", legacy), ("single-pass", single_pass)]
+        if r is approved:
+            cases.insert(1, ("legacy + approval copy", legacy_approval_copy))
+        for name, fn in cases:
+            us = timeit.timeit(lambda: fn(r), number=args.number) / args.number * 1e6
+            print(f"  {name:<24} {us:>8.2f} us/receipt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_columns.py
+# "How many LOCKDOWNs were BLOCKED, by decision?" answered by parsing every
+# JSON receipt vs. from the columnar sidecar (cold rebuild and warm query).
+#
+# Run:
+#   python benchmarks/bench_columns.py [--receipts 50000]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import count_receipts, iter_receipts, rebuild_column_store, reset_log  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+
+
+def json_counts() -> dict:
+    counts: dict = {}
+    for r in iter_receipts():
+        if r["proposed_action"]["type"] == "LOCKDOWN":
+            key = (r["decision"]["result"],)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=50000)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    items = [
+        {
+            "prompt": "Unattended bag reported near the east entrance. " * 8,
+            "model_output_raw": f"Recommendation: review footage. confidence: 0.{60 + i % 40}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN", "LOG_ONLY")[i % 3],
+            "proposed_action_target": "SCHOOL_12",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(args.receipts)
+    ]
+    for i in range(0, len(items), 1000):
+        append_new_receipts(items[i:i + 1000], policy=DEFAULT_POLICY)
+
+    t0 = time.perf_counter()
+    expected = json_counts()
+    parse = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rebuild_column_store()
+    rebuild = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = count_receipts(by=("decision",), action="LOCKDOWN")
+    warm = time.perf_counter() - t0
+    assert got == expected, (got, expected)
+
+    print(f"{args.receipts} receipts, {os.path.getsize('pat_log.jsonl') / 1e6:.1f} MB")
+    print(f"  parse JSON          {parse * 1e3:>9.1f} ms")
+    print(f"  rebuild sidecar     {rebuild * 1e3:>9.1f} ms (once; appends keep it current)")
+    print(f"  sidecar query       {warm * 1e3:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
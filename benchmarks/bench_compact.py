@@ -0,0 +1,76 @@
+# benchmarks/bench_compact.py
+# JSONL vs. the compact binary encoding (pat.compact) on the same receipts:
+# file size, encode+write throughput, and full hash-chain verification
+# (decode + canonical_hash + this_hash for every record).
+#
+# Run:
+#   python benchmarks/bench_compact.py [--receipts 20000]
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.compact import iter_compact, write_compact, write_jsonl  # noqa: E402
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import iter_receipts, reset_log, verify_chain  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+
+
+def iter_jsonl(path: str):
+    with open(path, "rb") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=20000)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    items = [
+        {
+            "prompt": f"Unattended bag reported near entrance {i % 7}.",
+            "model_output_raw": f"Recommendation: review footage. confidence: 0.{60 + i % 40}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN", "LOG_ONLY")[i % 3],
+            "proposed_action_target": "SCHOOL_12",
+            "proposed_action_params": {"camera": i % 16},
+            "confidence_override": None,
+        }
+        for i in range(args.receipts)
+    ]
+    for i in range(0, len(items), 1000):
+        append_new_receipts(items[i:i + 1000], policy=DEFAULT_POLICY)
+    receipts = list(iter_receipts())
+
+    rows = []
+    for label, path, write, read in [
+        ("JSONL", "out.jsonl", lambda f: write_jsonl(f, receipts), iter_jsonl),
+        ("compact", "out.patb", lambda f: write_compact(f, receipts), iter_compact),
+    ]:
+        t0 = time.perf_counter()
+        with open(path, "wb") as f:
+            write(f)
+        w = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        ok, _ = verify_chain(read(path))
+        v = time.perf_counter() - t0
+        assert ok
+        rows.append((label, os.path.getsize(path), w, v))
+
+    print(f"{args.receipts} receipts")
+    print(f"  {'format':<8} {'bytes/receipt':>14} {'write rec/s':>12} {'verify s':>9}")
+    for label, size, w, v in rows:
+        print(f"  {label:<8} {size / args.receipts:>14.0f} {args.receipts / w:>12.0f} {v:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
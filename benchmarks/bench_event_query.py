@@ -0,0 +1,99 @@
+# benchmarks/bench_event_query.py
+# "Newest BLOCKED DISPATCH_POLICE receipts of the last 24h", one page of 50,
+# by scanning the JSON vs. from the column sidecar's posting lists; then
+# time windows that hold few or no rows (the walk must end early, not check
+# every row's ts).
+#
+# Run:
+#   python benchmarks/bench_event_query.py [--receipts 100000]
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import iter_receipts, rebuild_column_store, reset_log, tail_receipts  # noqa: E402
+from pat.query import EventFilter, normalize_ts  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+
+
+def scan(where: EventFilter, limit: int) -> list:
+    matching = (
+        (offset, r)
+        for offset, r in iter_receipts(reverse=True, with_offsets=True)
+        if (where.decision is None or r["decision"]["result"] == where.decision)
+        and (where.action_type is None or r["proposed_action"]["type"] == where.action_type)
+        and (where.since is None or r["ts_utc"] >= where.since)
+        and (where.until is None or r["ts_utc"] < where.until)
+    )
+    return list(itertools.islice(matching, limit))
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=100000)
+    ap.add_argument("--page", type=int, default=50)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    # DISPATCH_POLICE is rare, as in a real ledger, so a scan reads far.
+    actions = ["NOTIFY", "LOG_ONLY", "LOCKDOWN", "NOTIFY"] * 50 + ["DISPATCH_POLICE"]
+    items = [
+        {
+            "prompt": "Unattended bag reported near the east entrance. " * 8,
+            "model_output_raw": f"confidence: 0.{60 + i % 40}",
+            "proposed_action_type": actions[i % len(actions)],
+            "proposed_action_target": "SCHOOL_12",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(args.receipts)
+    ]
+    for i in range(0, len(items), 1000):
+        append_new_receipts(items[i:i + 1000], policy=DEFAULT_POLICY)
+
+    now = dt.datetime.now(dt.timezone.utc)
+    since = normalize_ts((now - dt.timedelta(days=1)).isoformat())
+    where = EventFilter(decision="BLOCKED", action_type="DISPATCH_POLICE", since=since)
+
+    expected, scanned = timed(scan, where, args.page)
+    _, rebuild = timed(rebuild_column_store)
+    (page, _), warm = timed(tail_receipts, args.page, where=where)
+    assert page == expected
+
+    print(f"{args.receipts} receipts, {os.path.getsize('pat_log.jsonl') / 1e6:.1f} MB, page of {len(page)}")
+    print(f"  scan JSON           {scanned * 1e3:>9.1f} ms")
+    print(f"  rebuild sidecar     {rebuild * 1e3:>9.1f} ms (once; appends keep it current)")
+    print(f"  posting-list query  {warm * 1e3:>9.1f} ms")
+
+    future = normalize_ts((now + dt.timedelta(days=1)).isoformat())
+    newest = tail_receipts(1)[0][0][1]["ts_utc"]
+    windows = [
+        ("empty window, BLOCKED", EventFilter(decision="BLOCKED", since=future)),
+        ("empty window, since only", EventFilter(since=future)),
+        ("newest second only", EventFilter(since=newest)),
+    ]
+    for label, w in windows:
+        want, _ = timed(scan, w, args.page)
+        (got, _), took = timed(tail_receipts, args.page, where=w)
+        assert got == want
+        print(f"  {label:<26}{took * 1e3:>6.2f} ms ({len(got)} rows)")
+
+
+if __name__ == "__main__":
+    main()
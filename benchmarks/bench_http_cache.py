@@ -0,0 +1,68 @@
+# benchmarks/bench_http_cache.py
+# A monitor polling /verify, /events and one /event/<id> on an idle ledger:
+# rendering every time vs. the head-keyed response cache vs. If-None-Match.
+#
+# Run:
+#   python benchmarks/bench_http_cache.py [--receipts 20000] [--polls 200]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as web  # noqa: E402
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import reset_log  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+
+
+def poll(client, paths: list, polls: int, etags: dict, clear: bool) -> float:
+    t0 = time.perf_counter()
+    for _ in range(polls):
+        for path in paths:
+            if clear:
+                web._responses.clear()
+            headers = {"If-None-Match": etags[path]} if path in etags else {}
+            assert client.get(path, headers=headers).status_code in (200, 304)
+    return (time.perf_counter() - t0) / (polls * len(paths))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=20000)
+    ap.add_argument("--polls", type=int, default=200)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    item = {
+        "prompt": "Unattended bag reported near the east entrance.",
+        "model_output_raw": "confidence: 0.81",
+        "proposed_action_type": "NOTIFY",
+        "proposed_action_target": "SCHOOL_12",
+        "proposed_action_params": {},
+        "confidence_override": None,
+    }
+    for _ in range(0, args.receipts, 1000):
+        receipts = append_new_receipts([item] * 1000, policy=DEFAULT_POLICY)
+    paths = ["/verify", "/events", f"/event/{receipts[0]['event_id']}"]
+    client = web.app.test_client()
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+
+    uncached = poll(client, paths, args.polls, {}, clear=True)
+    cached = poll(client, paths, args.polls, {}, clear=False)
+    not_modified = poll(client, paths, args.polls, etags, clear=False)
+
+    print(f"{args.receipts} receipts, {args.polls} polls of {len(paths)} pages")
+    print(f"  render every poll   {uncached * 1e3:>8.2f} ms/request")
+    print(f"  cached 200          {cached * 1e3:>8.2f} ms/request")
+    print(f"  304 Not Modified    {not_modified * 1e3:>8.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
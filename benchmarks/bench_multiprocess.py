@@ -0,0 +1,71 @@
+# benchmarks/bench_multiprocess.py
+# Receipts/sec with N worker processes appending to one ledger through
+# append_new_receipt (fcntl-locked reserve-head/hash/append), then a full
+# verify to show the chain did not fork.
+#
+# Run:
+#   python benchmarks/bench_multiprocess.py [--receipts 2000] [--procs 1 2 4 8]
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import configure_writer, reset_log, verify_ledger  # noqa: E402
+from pat.receipt import append_new_receipt  # noqa: E402
+
+
+def worker(n: int, policy) -> None:
+    if policy:
+        configure_writer(policy)
+    for i in range(n):
+        append_new_receipt(
+            prompt=f"bench {os.getpid()} {i}",
+            model_output_raw="Recommendation: Notify. confidence: 0.92",
+            proposed_action_type="NOTIFY",
+            proposed_action_target="SITE",
+            proposed_action_params={},
+            confidence_override=None,
+            policy=DEFAULT_POLICY,
+        )
+    configure_writer(None)
+
+
+def run(total: int, procs: int, policy) -> float:
+    reset_log()
+    ctx = multiprocessing.get_context("fork")
+    ps = [ctx.Process(target=worker, args=(total // procs, policy)) for _ in range(procs)]
+    t0 = time.perf_counter()
+    for p in ps:
+        p.start()
+    for p in ps:
+        p.join()
+    elapsed = time.perf_counter() - t0
+    ok, errors = verify_ledger(full=True, max_errors=1)
+    if not ok:
+        raise SystemExit(f"chain forked: {errors[0]}")
+    return (total // procs) * procs / elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=2000)
+    ap.add_argument("--procs", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--fsync", default=None, help="writer policy inside each worker, e.g. always")
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    print(f"{args.receipts} receipts, fsync policy={args.fsync or 'off'}")
+    for n in args.procs:
+        print(f"  {n:>2} processes  {run(args.receipts, n, args.fsync):>10.0f} receipts/sec  (chain verified)")
+
+
+if __name__ == "__main__":
+    main()
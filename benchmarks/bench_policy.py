@@ -0,0 +1,65 @@
+# benchmarks/bench_policy.py
+# Microseconds per call for the policy-bound hot paths: evaluating a
+# receipt's policy (rules_hash + confidence parse + checks), building a
+# full receipt, and replaying a receipt against the policy.
+#
+# Run:
+#   python benchmarks/bench_policy.py [--number 20000]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import GENESIS_HASH, LedgerHead  # noqa: E402
+from pat.policy import compile_policy, extract_confidence  # noqa: E402
+from pat.receipt import build_new_receipt  # noqa: E402
+from pat.replay import replay_and_compare  # noqa: E402
+
+RAW = "Recommendation: Lock down the school and notify authorities. confidence: 0.92"
+
+
+def policy_work() -> None:
+    compiled = compile_policy(DEFAULT_POLICY)
+    compiled.rules_hash
+    compiled.check("LOCKDOWN", extract_confidence(RAW), False)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--number", type=int, default=20000)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    head = LedgerHead("", 0, 0, 0, 0, GENESIS_HASH)
+
+    def build():
+        return build_new_receipt(
+            prompt="x",
+            model_output_raw=RAW,
+            proposed_action_type="LOCKDOWN",
+            proposed_action_target="SCHOOL_12",
+            proposed_action_params={},
+            confidence_override=None,
+            policy=DEFAULT_POLICY,
+            head=head,
+        )
+
+    r = build()
+    for label, fn in [
+        ("policy evaluation", policy_work),
+        ("build_new_receipt", build),
+        ("replay_and_compare", lambda: replay_and_compare(r, DEFAULT_POLICY)),
+    ]:
+        us = timeit.timeit(fn, number=args.number) / args.number * 1e6
+        print(f"  {label:<20} {us:>8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
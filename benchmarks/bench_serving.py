@@ -0,0 +1,145 @@
+# benchmarks/bench_serving.py
+# Requests/sec and latency percentiles for the read endpoints under many
+# concurrent clients: the Flask app on werkzeug's threaded WSGI server (what
+# `python app.py` runs) vs. asgi.py on uvicorn. Both servers run as
+# subprocesses over the same ledger; the load generator is asyncio.
+#
+# Run:
+#   pip install uvicorn
+#   python benchmarks/bench_serving.py [--receipts 5000] [--concurrency 50 200] [--requests 4000]
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import reset_log, verify_ledger  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+
+WSGI_CMD = (
+    "from werkzeug.serving import run_simple; import app; "
+    "run_simple('127.0.0.1', {port}, app.app, threaded=True)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(cmd: List[str], port: int) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit(f"server did not start: {cmd}")
+
+
+async def get(port: int, path: str) -> float:
+    t0 = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    if status != b"200":
+        raise RuntimeError(f"{path}: HTTP {status.decode()}")
+    return time.perf_counter() - t0
+
+
+async def load(port: int, paths: List[str], total: int, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+    it = iter(range(total))
+
+    async def client() -> None:
+        for i in it:
+            latencies.append(await get(port, paths[i % len(paths)]))
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+def report(label: str, latencies: List[float], elapsed: float) -> None:
+    lat = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000
+
+    print(f"  {label:<26} {len(lat) / elapsed:>8.0f} req/s   p50 {pct(0.50):>7.1f} ms   p99 {pct(0.99):>7.1f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=5000)
+    ap.add_argument("--requests", type=int, default=4000)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    items = [
+        {
+            "prompt": f"bench {i}",
+            "model_output_raw": "Recommendation: Notify. confidence: 0.92",
+            "proposed_action_type": "NOTIFY",
+            "proposed_action_target": "SITE",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(args.receipts)
+    ]
+    receipts = append_new_receipts(items, policy=DEFAULT_POLICY)
+    verify_ledger()
+    ids = [r["event_id"] for r in random.Random(0).sample(receipts, min(200, len(receipts)))]
+    paths = ["/events", "/verify"] + [f"/event/{e}" for e in ids] + [f"/receipt/{e}.json" for e in ids]
+
+    servers = [("WSGI (werkzeug threaded)", None)]
+    if importlib.util.find_spec("uvicorn") is not None:
+        servers.append(("ASGI (asgi.py on uvicorn)", "uvicorn"))
+    else:
+        print("uvicorn not installed; ASGI run skipped (pip install uvicorn)")
+
+    print(f"{args.receipts} receipts, {args.requests} requests per run, mixed read endpoints")
+    for concurrency in args.concurrency:
+        print(f"concurrency {concurrency}")
+        for label, kind in servers:
+            port = free_port()
+            if kind is None:
+                cmd = [sys.executable, "-c", WSGI_CMD.format(port=port)]
+            else:
+                cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--log-level", "warning",
+                       "--app-dir", ROOT]
+            proc: Optional[subprocess.Popen] = start(cmd, port)
+            try:
+                asyncio.run(load(port, paths, 200, 20))  # warm up caches
+                t0 = time.perf_counter()
+                latencies = asyncio.run(load(port, paths, args.requests, concurrency))
+                report(label, latencies, time.perf_counter() - t0)
+            finally:
+                proc.terminate()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    main()
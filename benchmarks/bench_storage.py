@@ -0,0 +1,99 @@
+# benchmarks/bench_storage.py
+# The same ledger in JSONL and in the SQLite backend: append throughput,
+# event lookup, a filtered page ("newest 50 BLOCKED LOCKDOWNs") and the
+# JSONL export, which must come out byte-identical.
+#
+# Run:
+#   python benchmarks/bench_storage.py [--receipts 50000]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import (  # noqa: E402
+    configure_storage,
+    export_jsonl,
+    find_latest_by_event_id,
+    import_jsonl,
+    read_all_receipts,
+    reset_log,
+    tail_receipts,
+)
+from pat.query import EventFilter  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+
+
+def run(label: str, items: list) -> None:
+    reset_log()
+    t0 = time.perf_counter()
+    for i in range(0, len(items), 1000):
+        append_new_receipts(items[i:i + 1000], policy=DEFAULT_POLICY)
+    append = time.perf_counter() - t0
+
+    event_ids = [r["event_id"] for r in read_all_receipts()[::997]]
+    t0 = time.perf_counter()
+    for eid in event_ids:
+        assert find_latest_by_event_id(eid) is not None
+    lookup = (time.perf_counter() - t0) / len(event_ids)
+
+    t0 = time.perf_counter()
+    page, _ = tail_receipts(50, where=EventFilter(decision="BLOCKED", action_type="LOCKDOWN"))
+    filtered = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    export_jsonl(f"export-{label}.jsonl")
+    export = time.perf_counter() - t0
+
+    print(f"{label}")
+    print(f"  append            {len(items) / append:>10.0f} receipts/s")
+    print(f"  event lookup      {lookup * 1e6:>10.1f} us")
+    print(f"  filtered page     {filtered * 1e3:>10.1f} ms ({len(page)} rows)")
+    print(f"  export JSONL      {export * 1e3:>10.1f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=50000)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    # Rare matches make the JSONL scan walk most of the log.
+    items = [
+        {
+            "prompt": f"Sensor report {i}. " * 8,
+            "model_output_raw": f"confidence: 0.{60 + i % 40}",
+            "proposed_action_type": "LOCKDOWN" if i % 500 == 0 else ("NOTIFY", "LOG_ONLY")[i % 2],
+            "proposed_action_target": "SCHOOL_12",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(args.receipts)
+    ]
+    run("jsonl", items)
+    configure_storage("sqlite:bench.db")
+    try:
+        run("sqlite", items)
+    finally:
+        configure_storage(None)
+
+    # Timestamps and event ids differ between the runs, so compare the
+    # SQLite export with a JSONL ledger imported from it.
+    with open("export-sqlite.jsonl", "rb") as f:
+        expected = f.read()
+    reset_log()
+    import_jsonl("export-sqlite.jsonl")
+    export_jsonl("roundtrip.jsonl")
+    with open("roundtrip.jsonl", "rb") as f:
+        assert f.read() == expected
+    print("export byte-identical after sqlite -> jsonl round trip")
+
+
+if __name__ == "__main__":
+    main()
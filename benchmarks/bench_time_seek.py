@@ -0,0 +1,87 @@
+# benchmarks/bench_time_seek.py
+# "Every receipt from one hour" in a ledger spanning days, by parsing the
+# whole log vs. reading only the blocks the sparse time index points at.
+#
+# Run:
+#   python benchmarks/bench_time_seek.py [--receipts 100000]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.columns import _epoch  # noqa: E402
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.hashing import compute_canonical_hash, compute_this_hash  # noqa: E402
+from pat.ledger import (  # noqa: E402
+    append_chained_batch,
+    iter_receipts,
+    iter_receipts_between,
+    rebuild_time_index,
+    reset_log,
+)
+from pat.receipt import build_new_receipt  # noqa: E402
+
+
+def backfill(j: int, ts: str, head):
+    r = build_new_receipt(
+        prompt="Unattended bag reported near the east entrance. " * 8,
+        model_output_raw=f"confidence: 0.{60 + j % 40}",
+        proposed_action_type="NOTIFY",
+        proposed_action_target="SCHOOL_12",
+        proposed_action_params={},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+        head=head,
+    )
+    r["event_id"], r["ts_utc"] = f"{ts}_{j:06d}", ts
+    integrity = r["integrity"]
+    integrity["canonical_hash"] = compute_canonical_hash(r)
+    integrity["this_hash"] = compute_this_hash(integrity["prev_hash"], integrity["canonical_hash"])
+    return r
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--receipts", type=int, default=100000)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    # A backfill with one receipt every 10 s, so the ledger spans days.
+    start = _epoch("2026-01-01T00:00:00Z")
+    stamps = [time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start + 10 * j)) for j in range(args.receipts)]
+    for i in range(0, args.receipts, 1000):
+        append_chained_batch(
+            [lambda head, j=j: backfill(j, stamps[j], head) for j in range(i, min(i + 1000, args.receipts))]
+        )
+
+    since = start + 10 * args.receipts // 2
+    until = since + 3600
+
+    t0 = time.perf_counter()
+    expected = [r for r in iter_receipts() if since <= _epoch(r["ts_utc"]) < until]
+    parsed = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rebuild_time_index()
+    rebuild = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = list(iter_receipts_between(since, until))
+    seek = time.perf_counter() - t0
+    assert got == expected
+
+    print(f"{args.receipts} receipts, {os.path.getsize('pat_log.jsonl') / 1e6:.1f} MB, {len(got)} in the hour")
+    print(f"  parse whole log     {parsed * 1e3:>9.1f} ms")
+    print(f"  rebuild time index  {rebuild * 1e3:>9.1f} ms (once; appends keep it current)")
+    print(f"  indexed range read  {seek * 1e3:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
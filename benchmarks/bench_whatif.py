@@ -0,0 +1,105 @@
+# benchmarks/bench_whatif.py
+# What-if policy simulation: vectorized evaluation over synthetic decision
+# columns vs. one CompiledPolicy.check call per receipt, plus the cost of
+# loading columns from a real ledger (parsed, or mapped from the sidecar).
+#
+# Run:
+#   python benchmarks/bench_whatif.py [--rows 2000000] [--ledger 20000] [--policies 5]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import ALL_ACTIONS, DEFAULT_POLICY  # noqa: E402
+from pat.ledger import reset_log  # noqa: E402
+from pat.policy import compile_policy  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+from pat.simulate import DecisionColumns, decision_columns, evaluate, load_decision_columns, simulate  # noqa: E402
+
+
+def synthetic(rows: int) -> DecisionColumns:
+    rng = np.random.default_rng(0)
+    actions = sorted(ALL_ACTIONS) + ["UNKNOWN"]
+    start = np.datetime64("2026-01-01T00:00:00", "s")
+    return DecisionColumns(
+        actions=actions,
+        action_code=rng.integers(0, len(actions), rows, dtype=np.int32),
+        confidence=rng.random(rows),
+        has_confidence=rng.random(rows) > 0.05,
+        approved=rng.random(rows) > 0.5,
+        permitted=rng.random(rows) > 0.5,
+        ts=start + rng.integers(0, 90 * 86400, rows),
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--ledger", type=int, default=20000)
+    ap.add_argument("--policies", type=int, default=5)
+    args = ap.parse_args()
+
+    candidates = [replace(DEFAULT_POLICY, confidence_threshold=0.70 + 0.05 * i) for i in range(args.policies)]
+    cols = synthetic(args.rows)
+
+    compiled = compile_policy(DEFAULT_POLICY)
+    sample = min(args.rows, 200_000)
+    t0 = time.perf_counter()
+    for a, c, h, ok in zip(
+        cols.action_code[:sample].tolist(),
+        cols.confidence[:sample].tolist(),
+        cols.has_confidence[:sample].tolist(),
+        cols.approved[:sample].tolist(),
+    ):
+        compiled.check(cols.actions[a], c if h else None, ok)
+    loop = (time.perf_counter() - t0) / sample * args.rows
+
+    t0 = time.perf_counter()
+    evaluate(cols, DEFAULT_POLICY)
+    vec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    simulate(candidates, columns=cols)
+    sim = time.perf_counter() - t0
+
+    print(f"{args.rows} rows")
+    print(f"  per-receipt check (extrapolated) {loop:>8.2f} s/policy")
+    print(f"  evaluate                         {vec:>8.3f} s/policy")
+    print(f"  simulate, {args.policies} policies + breakdowns {sim:>8.3f} s")
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    items = [
+        {
+            "prompt": f"p{i}",
+            "model_output_raw": f"confidence: 0.{60 + i % 40}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN", "LOG_ONLY")[i % 3],
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(args.ledger)
+    ]
+    for i in range(0, len(items), 1000):
+        append_new_receipts(items[i:i + 1000], policy=DEFAULT_POLICY)
+    t0 = time.perf_counter()
+    loaded = load_decision_columns()
+    load = time.perf_counter() - t0
+    print(f"load_decision_columns: {len(loaded)} receipts in {load:.2f}s ({load / len(loaded) * 1e6:.1f} us/receipt)")
+    t0 = time.perf_counter()
+    mapped = decision_columns()
+    load = time.perf_counter() - t0
+    print(f"decision_columns (sidecar): {len(mapped)} receipts in {load * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_writer.py
+# Receipts/sec for the default append path vs. the group-commit writer
+# under each fsync policy.
+#
+# Run:
+#   python benchmarks/bench_writer.py [--threads 16] [--receipts 4000]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import append_receipt, configure_writer, reset_log  # noqa: E402
+from pat.receipt import build_new_receipt  # noqa: E402
+
+
+def run(policy, receipts, threads: int) -> float:
+    reset_log()
+    configure_writer(policy)
+    chunks = [receipts[k::threads] for k in range(threads)]
+
+    def work(chunk):
+        for r in chunk:
+            append_receipt(r)
+
+    workers = [threading.Thread(target=work, args=(c,)) for c in chunks]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    configure_writer(None)
+    return len(receipts) / elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--receipts", type=int, default=4000)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pat-bench-"))
+    reset_log()
+    receipts = [
+        build_new_receipt(
+            prompt=f"bench {i}",
+            model_output_raw="Recommendation: Notify. confidence: 0.92",
+            proposed_action_type="NOTIFY",
+            proposed_action_target="SITE",
+            proposed_action_params={},
+            confidence_override=None,
+            policy=DEFAULT_POLICY,
+        )
+        for i in range(args.receipts)
+    ]
+
+    print(f"{args.receipts} receipts, {args.threads} threads")
+    for label, policy in [
+        ("direct (no writer, no fsync)", None),
+        ("writer none", "none"),
+        ("writer always", "always"),
+        ("writer batch(2ms)", "batch(2ms)"),
+        ("writer batch(10ms,512)", "batch(10ms,512)"),
+    ]:
+        print(f"  {label:<30} {run(policy, receipts, args.threads):>10.0f} receipts/sec")
+
+
+if __name__ == "__main__":
+    main()
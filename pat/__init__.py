@@ -3,7 +3,22 @@ __all__ = [
     "hashing",
     "policy",
     "ledger",
+    "query",
+    "httpcache",
+    "timeindex",
+    "storage",
+    "index",
+    "merkle",
+    "columns",
+    "compact",
+    "checkpoint",
+    "archive",
+    "segments",
+    "parallel",
+    "writer",
     "keys",
     "receipt",
     "replay",
+    "simulate",
+    "cli",
 ]
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import lzma
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Compressed archive of a sealed ledger file. Whole lines are grouped into
+# blocks of about `block_bytes` that are compressed independently, so any
+# record can be read by decompressing one block. Layout:
+#
+#   MAGIC | block 0 | block 1 | ... | zlib(index JSON) | >Q index length | MAGIC
+#
+# The index lists every block (raw start, raw length, compressed offset,
+# compressed length, first record number) and every record's local offset
+# and event_id. Offsets are those of the original uncompressed file, so the
+# ledger's logical offsets stay valid after archiving.
+
+MAGIC = b"PATZ\x01"
+ARCHIVE_SUFFIX = ".pata"
+DEFAULT_BLOCK_BYTES = 128 * 1024
+CODECS = ("zlib", "lzma")
+
+_FOOTER = struct.Struct(">Q")
+_BLOCK_CACHE_SIZE = 16
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "lzma":
+        return lzma.compress(data, preset=6)
+    raise ValueError(f"Unknown codec {codec!r} (expected one of {', '.join(CODECS)})")
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    return zlib.decompress(data) if codec == "zlib" else lzma.decompress(data)
+
+
+class ArchiveIndex:
+    def __init__(self, raw: Dict) -> None:
+        self.codec: str = raw["codec"]
+        self.size: int = raw["size"]
+        self.sha256: str = raw["sha256"]
+        self.blocks: List[Tuple[int, int, int, int, int]] = [tuple(b) for b in raw["blocks"]]
+        self.offsets: List[int] = raw["offsets"]
+        self.event_ids: List[Optional[str]] = raw["event_ids"]
+        self._starts = [b[0] for b in self.blocks]
+
+    def as_json(self) -> Dict:
+        return {
+            "codec": self.codec,
+            "size": self.size,
+            "sha256": self.sha256,
+            "blocks": self.blocks,
+            "offsets": self.offsets,
+            "event_ids": self.event_ids,
+        }
+
+    def block_at(self, offset: int) -> int:
+        # Block holding local raw `offset`.
+        return max(0, bisect.bisect_right(self._starts, offset) - 1)
+
+    def block_of_record(self, record: int) -> int:
+        return self.block_at(self.offsets[record])
+
+    def record_end(self, record: int) -> int:
+        # Local end of record `record` (its line, newline included).
+        if record + 1 < len(self.offsets):
+            nxt = self.offsets[record + 1]
+        else:
+            nxt = self.size
+        b = self.blocks[self.block_of_record(record)]
+        return min(nxt, b[0] + b[1])
+
+
+def is_archive(path: str) -> bool:
+    return path.endswith(ARCHIVE_SUFFIX)
+
+
+def _event_id_of(line: bytes) -> Optional[str]:
+    try:
+        eid = json.loads(line).get("event_id")
+    except (ValueError, AttributeError):
+        return None
+    return eid if isinstance(eid, str) else None
+
+
+def write_archive(src: str, dst: str, codec: str = "zlib", block_bytes: int = DEFAULT_BLOCK_BYTES) -> ArchiveIndex:
+    # Compresses the JSONL file `src` into `dst` (written to a temp file and
+    # renamed into place).
+    if block_bytes <= 0:
+        raise ValueError("block_bytes must be positive")
+    _compress(codec, b"")
+    h = hashlib.sha256()
+    blocks: List[List[int]] = []
+    offsets: List[int] = []
+    event_ids: List[Optional[str]] = []
+    tmp = dst + ".tmp"
+    with open(src, "rb") as f, open(tmp, "wb") as out:
+        out.write(MAGIC)
+        comp_off = len(MAGIC)
+        pending: List[bytes] = []
+        pending_len = 0
+        block_start = pos = 0
+        first_record = 0
+
+        def flush() -> None:
+            nonlocal comp_off, pending, pending_len, block_start, first_record
+            if not pending:
+                return
+            comp = _compress(codec, b"".join(pending))
+            out.write(comp)
+            blocks.append([block_start, pending_len, comp_off, len(comp), first_record])
+            comp_off += len(comp)
+            block_start += pending_len
+            first_record = len(offsets)
+            pending, pending_len = [], 0
+
+        for line in f:
+            if pending and pending_len + len(line) > block_bytes:
+                flush()
+            h.update(line)
+            if line.strip():
+                offsets.append(pos)
+                event_ids.append(_event_id_of(line))
+            pending.append(line)
+            pending_len += len(line)
+            pos += len(line)
+        flush()
+        index = ArchiveIndex(
+            {
+                "codec": codec,
+                "size": pos,
+                "sha256": "sha256:" + h.hexdigest(),
+                "blocks": blocks,
+                "offsets": offsets,
+                "event_ids": event_ids,
+            }
+        )
+        raw = zlib.compress(json.dumps(index.as_json(), separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        out.write(raw + _FOOTER.pack(len(raw)) + MAGIC)
+    os.replace(tmp, dst)
+    return index
+
+
+_lock = threading.Lock()
+_indexes: Dict[str, Tuple[Tuple[int, int, int], ArchiveIndex]] = {}
+_blocks: "OrderedDict[Tuple[str, int, int, int], bytes]" = OrderedDict()
+
+
+def _stamp(path: str) -> Tuple[int, int, int]:
+    st = os.stat(path)
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def load_index(path: str) -> ArchiveIndex:
+    # Cached per file identity; archives are immutable once written.
+    key = os.path.abspath(path)
+    stamp = _stamp(path)
+    with _lock:
+        hit = _indexes.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not a ledger archive")
+        f.seek(-(_FOOTER.size + len(MAGIC)), os.SEEK_END)
+        tail = f.read()
+        if tail[_FOOTER.size:] != MAGIC:
+            raise ValueError(f"{path}: archive footer missing (truncated?)")
+        (n,) = _FOOTER.unpack(tail[:_FOOTER.size])
+        f.seek(-(_FOOTER.size + len(MAGIC) + n), os.SEEK_END)
+        index = ArchiveIndex(json.loads(zlib.decompress(f.read(n))))
+    with _lock:
+        _indexes[key] = (stamp, index)
+    return index
+
+
+def read_block(path: str, n: int) -> bytes:
+    # Decompressed block `n`; the most recently used blocks are kept.
+    index = load_index(path)
+    stamp = _stamp(path)
+    key = (os.path.abspath(path), stamp[0], stamp[2], n)
+    with _lock:
+        data = _blocks.get(key)
+        if data is not None:
+            _blocks.move_to_end(key)
+            return data
+    _, _, comp_off, comp_len, _ = index.blocks[n]
+    with open(path, "rb") as f:
+        f.seek(comp_off)
+        data = _decompress(index.codec, f.read(comp_len))
+    with _lock:
+        _blocks[key] = data
+        while len(_blocks) > _BLOCK_CACHE_SIZE:
+            _blocks.popitem(last=False)
+    return data
+
+
+def _block_lines(path: str, n: int) -> List[Tuple[int, bytes]]:
+    start = load_index(path).blocks[n][0]
+    out: List[Tuple[int, bytes]] = []
+    for line in read_block(path, n).splitlines(keepends=True):
+        out.append((start, line))
+        start += len(line)
+    return out
+
+
+def iter_archive_lines(path: str, start: int, end: Optional[int]) -> Iterator[Tuple[int, bytes]]:
+    # (local offset, line) for every line starting in [start, end),
+    # decompressing only the blocks that overlap it.
+    index = load_index(path)
+    stop = index.size if end is None else min(end, index.size)
+    if start >= stop:
+        return
+    for n in range(index.block_at(start), len(index.blocks)):
+        if index.blocks[n][0] >= stop:
+            break
+        for offset, line in _block_lines(path, n):
+            if start <= offset < stop:
+                yield offset, line
+
+
+def iter_archive_lines_reverse(path: str, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    index = load_index(path)
+    end = min(end, index.size)
+    if start >= end:
+        return
+    for n in range(index.block_at(end - 1), index.block_at(start) - 1, -1):
+        for offset, line in reversed(_block_lines(path, n)):
+            if start <= offset < end:
+                yield offset, line
+
+
+def read_archive_line(path: str, offset: int) -> bytes:
+    index = load_index(path)
+    for at, line in _block_lines(path, index.block_at(offset)):
+        if at == offset:
+            return line
+        if at > offset:
+            break
+    return b""
+
+
+def archive_block_bounds(path: str, chunks: int) -> List[Tuple[int, int]]:
+    # Up to `chunks` (start, end) local ranges aligned to block boundaries.
+    index = load_index(path)
+    if not index.blocks:
+        return []
+    n = len(index.blocks)
+    cuts = sorted({index.blocks[n * k // chunks][0] for k in range(max(1, min(chunks, n)))})
+    return list(zip(cuts, cuts[1:] + [index.size]))
+
+
+def iter_file_lines(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    # (local offset, line) for every line (blank ones included) starting in
+    # [start, end) of a plain ledger file or an archive.
+    if is_archive(path):
+        yield from iter_archive_lines(path, start, end)
+        return
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if end is not None and pos >= end:
+                break
+            yield pos, line
+            pos += len(line)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class VerifyCheckpoint:
+    # Everything before logical `offset` verified cleanly; the record that
+    # starts at `anchor_offset` is the last verified one and carries `this_hash`.
+    offset: int
+    anchor_offset: int
+    count: int
+    this_hash: str
+
+
+def load_checkpoint(path: str) -> Optional[VerifyCheckpoint]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return VerifyCheckpoint(**json.loads(f.read()))
+    except (ValueError, TypeError):
+        return None
+
+
+def save_checkpoint(path: str, cp: VerifyCheckpoint) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(asdict(cp), sort_keys=True, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def clear_checkpoint(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
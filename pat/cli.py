@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, replace
+from typing import List, Optional
+
+from .config import DEFAULT_POLICY
+from .ledger import configure_storage, count_receipts, verify_ledger
+from .parallel import verify_ledger_parallel
+from .replay import DEFAULT_MAX_MISMATCHES, replay_all
+
+# Command-line audit tools. They act on the ledger in the current directory,
+# like app.py.
+
+
+def _replay(args: argparse.Namespace) -> int:
+    t0 = time.perf_counter()
+    try:
+        report = replay_all(DEFAULT_POLICY, workers=args.workers, max_mismatches=args.max_mismatches)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - t0
+    if args.json:
+        print(json.dumps(dict(asdict(report), ok=report.ok, elapsed_s=round(elapsed, 3)), indent=2, ensure_ascii=False))
+        return 0 if report.ok else 1
+
+    print(f"Replayed {report.total} receipts in {elapsed:.2f}s against {DEFAULT_POLICY.policy_id} {DEFAULT_POLICY.version}")
+    print(f"  matched:         {report.matched}")
+    print(f"  mismatched:      {report.mismatched}")
+    print(f"  malformed:       {report.malformed}")
+    print(f"  distinct inputs: {report.distinct_inputs}")
+    for m in report.mismatches:
+        print(
+            f"  Line {m['line']} ({m['event_id']}): stored {m['stored']['decision']} ({m['stored']['reason']}), "
+            f"replayed {m['recomputed']['decision']} ({m['recomputed']['reason']})"
+        )
+    if report.mismatched > len(report.mismatches):
+        print(f"  ... {report.mismatched - len(report.mismatches)} more")
+    print("REPLAY OK" if report.ok else "REPLAY MISMATCH")
+    return 0 if report.ok else 1
+
+
+def _verify(args: argparse.Namespace) -> int:
+    try:
+        if args.file is not None:
+            from .compact import verify_file
+
+            ok, errors = verify_file(args.file, max_errors=args.max_errors)
+        elif args.workers is not None:
+            ok, errors = verify_ledger_parallel(workers=args.workers, max_errors=args.max_errors)
+        else:
+            ok, errors = verify_ledger(full=args.full, max_errors=args.max_errors)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    for e in errors:
+        print(e)
+    print("VERIFIED" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+def _whatif(args: argparse.Namespace) -> int:
+    from .simulate import decision_columns, load_decision_columns, simulate
+
+    high_stakes = DEFAULT_POLICY.high_stakes_actions
+    if args.high_stakes is not None:
+        high_stakes = tuple(a.strip().upper() for a in args.high_stakes.split(",") if a.strip())
+    candidates = [
+        replace(DEFAULT_POLICY, version=f"{DEFAULT_POLICY.version}+whatif", high_stakes_actions=high_stakes, confidence_threshold=t)
+        for t in (args.threshold or [DEFAULT_POLICY.confidence_threshold])
+    ]
+
+    t0 = time.perf_counter()
+    columns = load_decision_columns(workers=args.workers) if args.parse else decision_columns()
+    t1 = time.perf_counter()
+    reports = simulate(candidates, columns=columns, bucket_s=args.bucket)
+    t2 = time.perf_counter()
+    if args.json:
+        print(json.dumps([asdict(r) for r in reports], indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"Loaded {len(columns)} receipts in {t1 - t0:.2f}s, simulated {len(reports)} policies in {t2 - t1:.3f}s")
+    for r in reports:
+        print(f"threshold {r.confidence_threshold}, high-stakes {','.join(r.high_stakes_actions) or '-'}")
+        print(f"  permitted:          {r.permitted} of {r.total}")
+        print(f"  PERMITTED->BLOCKED: {r.to_blocked}")
+        print(f"  BLOCKED->PERMITTED: {r.to_permitted}")
+        for action, (b, p) in sorted(r.by_action.items()):
+            print(f"    {action:<20} -{b} +{p}")
+        for bucket, (b, p) in r.by_bucket.items():
+            print(f"    {bucket:<20} -{b} +{p}")
+    return 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    from .compact import export_compact
+    from .ledger import export_jsonl
+
+    n = export_jsonl(args.dst) if args.jsonl else export_compact(args.dst)
+    print(f"Wrote {n} receipts to {args.dst}")
+    return 0
+
+
+def _import(args: argparse.Namespace) -> int:
+    from .ledger import import_jsonl
+
+    try:
+        n = import_jsonl(args.src)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"Imported {n} receipts from {args.src}")
+    return 0
+
+
+def _convert(args: argparse.Namespace) -> int:
+    from .compact import compact_to_jsonl, is_compact, jsonl_to_compact
+
+    try:
+        if is_compact(args.src):
+            n, fmt = compact_to_jsonl(args.src, args.dst), "JSONL"
+        else:
+            n, fmt = jsonl_to_compact(args.src, args.dst), "compact"
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"Wrote {n} receipts to {args.dst} ({fmt})")
+    return 0
+
+
+def _archive(args: argparse.Namespace) -> int:
+    from .archive import CODECS
+    from .ledger import archive_segments, rotate_segment
+
+    if args.codec not in CODECS:
+        print(f"error: unknown codec {args.codec!r}", file=sys.stderr)
+        return 2
+    if args.rotate:
+        rotate_segment()
+    for m in archive_segments(codec=args.codec, block_bytes=args.block_kb * 1024):
+        print(f"Segment {m.segment}: {m.size} bytes -> {os.path.getsize(m.path)} bytes ({m.path})")
+    return 0
+
+
+def _epoch_arg(raw: Optional[str]) -> Optional[int]:
+    if raw is None:
+        return None
+    t = dt.datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=dt.timezone.utc)
+    return int(t.timestamp())
+
+
+def _counts(args: argparse.Namespace) -> int:
+    by = tuple(c.strip() for c in args.by.split(",") if c.strip())
+    equals = {name: value for name, value in (("action", args.action), ("decision", args.decision)) if value is not None}
+    try:
+        counts = count_receipts(by, since=_epoch_arg(args.since), until=_epoch_arg(args.until), **equals)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    rows = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    if args.json:
+        print(json.dumps([dict(zip(by, key), count=n) for key, n in rows], indent=2, ensure_ascii=False))
+        return 0
+    for key, n in rows:
+        print(f"{n:>10}  " + "  ".join(str(k) for k in key))
+    print(f"{sum(counts.values()):>10}  total")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="pat", description="Practical Audit Trail ledger tools")
+    ap.add_argument("--storage", default=None, help="jsonl (default) or sqlite:<path>")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    rp = sub.add_parser("replay", help="replay every receipt against the current policy")
+    rp.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    rp.add_argument("--max-mismatches", type=int, default=DEFAULT_MAX_MISMATCHES)
+    rp.add_argument("--json", action="store_true", help="print the report as JSON")
+    rp.set_defaults(func=_replay)
+
+    vp = sub.add_parser("verify", help="verify the hash chain")
+    vp.add_argument("--full", action="store_true", help="ignore the verification checkpoint")
+    vp.add_argument("--workers", type=int, default=None, help="full re-hash in N processes")
+    vp.add_argument("--max-errors", type=int, default=None)
+    vp.add_argument("--file", default=None, help="verify an exported JSONL or compact file instead")
+    vp.set_defaults(func=_verify)
+
+    wp = sub.add_parser("whatif", help="count decisions that would flip under other thresholds/high-stakes sets (needs numpy)")
+    wp.add_argument("--threshold", type=float, nargs="+", default=None, help="one candidate policy per threshold")
+    wp.add_argument("--high-stakes", default=None, help="comma-separated actions (default: current policy)")
+    wp.add_argument("--bucket", type=int, default=86400, help="time bucket in seconds")
+    wp.add_argument("--parse", action="store_true", help="parse the ledger JSON instead of reading the column sidecar")
+    wp.add_argument("--workers", type=int, default=None, help="processes for --parse (default: CPU count)")
+    wp.add_argument("--json", action="store_true", help="print the reports as JSON")
+    wp.set_defaults(func=_whatif)
+
+    cp = sub.add_parser("counts", help="receipt counts from the column sidecar, e.g. BLOCKED LOCKDOWNs last week")
+    cp.add_argument("--by", default="action,decision", help="comma-separated columns to group by")
+    cp.add_argument("--action", default=None)
+    cp.add_argument("--decision", default=None)
+    cp.add_argument("--since", default=None, help="ISO time, inclusive")
+    cp.add_argument("--until", default=None, help="ISO time, exclusive")
+    cp.add_argument("--json", action="store_true")
+    cp.set_defaults(func=_counts)
+
+    ep = sub.add_parser("export", help="write the whole ledger as one compact binary file")
+    ep.add_argument("dst")
+    ep.add_argument("--jsonl", action="store_true", help="write the exact JSONL lines instead")
+    ep.set_defaults(func=_export)
+
+    ip = sub.add_parser("import", help="copy a JSONL ledger file into the (empty) configured storage")
+    ip.add_argument("src")
+    ip.set_defaults(func=_import)
+
+    xp = sub.add_parser("convert", help="convert a JSONL ledger file to compact binary or back")
+    xp.add_argument("src")
+    xp.add_argument("dst")
+    xp.set_defaults(func=_convert)
+
+    zp = sub.add_parser("archive", help="compress sealed segments into block-indexed archives")
+    zp.add_argument("--codec", default="zlib", help="zlib or lzma")
+    zp.add_argument("--block-kb", type=int, default=128, help="uncompressed block size")
+    zp.add_argument("--rotate", action="store_true", help="seal the active file first")
+    zp.set_defaults(func=_archive)
+
+    args = ap.parse_args(argv)
+    if args.storage is not None:
+        try:
+            configure_storage(args.storage)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
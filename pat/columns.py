@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import itertools
+import json
+import math
+import mmap
+import os
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Column name -> array typecode. One file per column under the sidecar
+# directory, rows in ledger order, native byte order so the files can be
+# memory-mapped and read without copying (memoryview, numpy.frombuffer).
+COLUMNS: Dict[str, str] = {
+    "offset": "Q",  # logical byte offset of the record
+    "length": "I",  # record length in bytes, newline included
+    "ts": "q",  # ts_utc as epoch seconds, TS_MISSING if absent
+    "tsmax": "q",  # running maximum of ts up to this row, ascending
+    "action": "I",  # code into the action dictionary
+    "decision": "I",  # code into the decision dictionary
+    "confidence": "d",  # effective_confidence, NaN if absent or not a number
+    "approved": "B",
+    "required": "B",  # approval.required
+    "approver": "I",  # code into the approver_id dictionary ("" if none)
+    "policy": "I",  # code into the policy version dictionary
+}
+# Dictionary-encoded columns; code i is line i of <name>.dict. Each code
+# also has a posting list, <name>.<code>.rows: its row numbers, ascending.
+DICT_COLUMNS = ("action", "decision", "approver", "policy")
+POSTING_TYPECODE = "I"
+# Same bit pattern as numpy's NaT, so ts views as datetime64[s] directly.
+TS_MISSING = -(1 << 63)
+
+Row = Tuple[int, int, int, str, str, float, int, int, str, str]
+
+
+def _epoch(ts: Any) -> int:
+    if not isinstance(ts, str):
+        return TS_MISSING
+    try:
+        t = dt.datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return TS_MISSING
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=dt.timezone.utc)
+    return int(t.timestamp())
+
+
+def row_of_receipt(r: Dict[str, Any], offset: int, length: int) -> Row:
+    conf = (r.get("model_output") or {}).get("effective_confidence")
+    approval = r.get("approval") or {}
+    return (
+        offset,
+        length,
+        _epoch(r.get("ts_utc")),
+        str((r.get("proposed_action") or {}).get("type") or ""),
+        str((r.get("decision") or {}).get("result") or ""),
+        float(conf) if isinstance(conf, (int, float)) else math.nan,
+        1 if approval.get("approved") else 0,
+        1 if approval.get("required") else 0,
+        str(approval.get("approver_id") or ""),
+        str((r.get("policy") or {}).get("version") or ""),
+    )
+
+
+class ColumnStore:
+    # Incrementally maintained columnar copy of the decision fields of every
+    # receipt, for aggregate and filtered queries that should not parse JSON.
+    # Dictionary files and posting lists are appended before the columns and
+    # "offset" last, so the row count is the shortest column and a torn
+    # write only loses whole rows.
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._maps: Dict[str, Tuple[int, memoryview]] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self.rows = 0
+        self.covered = 0
+        self.last: Optional[Tuple[int, int]] = None  # (offset, length) of the newest row
+        self._tsmax = TS_MISSING
+        self.dicts: Dict[str, List[str]] = {name: [] for name in DICT_COLUMNS}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in DICT_COLUMNS}
+        self._dict_consumed: Dict[str, int] = {name: 0 for name in DICT_COLUMNS}
+        self._pending: Dict[str, array] = {name: array(tc) for name, tc in COLUMNS.items()}
+        self._pending_dicts: Dict[str, List[str]] = {name: [] for name in DICT_COLUMNS}
+        self._postings: Dict[Tuple[str, int], int] = {}  # (column, code) -> entries
+        self._pending_postings: Dict[Tuple[str, int], array] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "ColumnStore":
+        store = cls(path)
+        store.refresh()
+        return store
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".col")
+
+    def _dict_file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".dict")
+
+    def _posting_file(self, name: str, code: int) -> str:
+        return os.path.join(self.path, f"{name}.{code}.rows")
+
+    def refresh(self) -> None:
+        # Picks up rows appended (possibly by another process) since the last
+        # load and trims torn column tails. Callers hold the ledger lock.
+        if not os.path.isdir(self.path):
+            return
+        for name in DICT_COLUMNS:
+            path = self._dict_file(name)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                f.seek(self._dict_consumed[name])
+                for line in f:
+                    try:
+                        value = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        value = None
+                    if not isinstance(value, str):
+                        os.truncate(path, self._dict_consumed[name])
+                        break
+                    self._dict_consumed[name] += len(line)
+                    self._codes[name][value] = len(self.dicts[name])
+                    self.dicts[name].append(value)
+        sizes = {name: self._size(name) for name in COLUMNS}
+        rows = min(sizes[name] // array(tc).itemsize for name, tc in COLUMNS.items())
+        for name, tc in COLUMNS.items():
+            if sizes[name] > rows * array(tc).itemsize:
+                os.truncate(self._file(name), rows * array(tc).itemsize)
+        self.rows = rows
+        for name in DICT_COLUMNS:
+            for code in range(len(self.dicts[name])):
+                self._trim_posting(name, code)
+        self.last = None
+        self._tsmax = self.column("tsmax")[rows - 1] if rows else TS_MISSING
+        if rows:
+            self.last = (self.column("offset")[rows - 1], self.column("length")[rows - 1])
+            self.covered = max(self.covered, sum(self.last))
+
+    def _trim_posting(self, name: str, code: int) -> None:
+        # Drops torn entries and rows past the last committed one.
+        path = self._posting_file(name, code)
+        itemsize = array(POSTING_TYPECODE).itemsize
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        keep = 0
+        if size >= itemsize and self.rows:
+            keep = bisect.bisect_left(self._view(path, POSTING_TYPECODE, size // itemsize), self.rows)
+        if size != keep * itemsize:
+            os.truncate(path, keep * itemsize)
+        self._postings[(name, code)] = keep
+
+    def _size(self, name: str) -> int:
+        path = self._file(name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def in_sync(self) -> bool:
+        return self._size("offset") == self.rows * array(COLUMNS["offset"]).itemsize
+
+    def _code(self, name: str, value: str) -> int:
+        code = self._codes[name].get(value)
+        if code is None:
+            code = self._codes[name][value] = len(self.dicts[name])
+            self.dicts[name].append(value)
+            self._pending_dicts[name].append(value)
+        return code
+
+    def add(self, row: Row) -> None:
+        offset, length, ts, action, decision, confidence, approved, required, approver, policy = row
+        p = self._pending
+        row_no = self.rows + len(p["offset"])
+        for name, value in (("action", action), ("decision", decision), ("approver", approver), ("policy", policy)):
+            code = self._code(name, value)
+            p[name].append(code)
+            posting = self._pending_postings.get((name, code))
+            if posting is None:
+                posting = self._pending_postings[(name, code)] = array(POSTING_TYPECODE)
+            posting.append(row_no)
+        p["offset"].append(offset)
+        p["length"].append(length)
+        p["ts"].append(ts)
+        self._tsmax = max(self._tsmax, ts)
+        p["tsmax"].append(self._tsmax)
+        p["confidence"].append(confidence)
+        p["approved"].append(approved)
+        p["required"].append(required)
+        self.covered = max(self.covered, offset + length)
+
+    def flush(self) -> None:
+        n = len(self._pending["offset"])
+        if not n:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        for name, values in self._pending_dicts.items():
+            if values:
+                raw = "".join(json.dumps(v, ensure_ascii=False) + "\n" for v in values).encode("utf-8")
+                with open(self._dict_file(name), "ab") as f:
+                    f.write(raw)
+                self._dict_consumed[name] += len(raw)
+                values.clear()
+        for key, rows in self._pending_postings.items():
+            path = self._posting_file(*key)
+            committed = self._postings.get(key, 0) * rows.itemsize
+            if os.path.exists(path) and os.path.getsize(path) > committed:
+                os.truncate(path, committed)  # left by a writer that died mid-flush
+            with open(path, "ab") as f:
+                rows.tofile(f)
+            self._postings[key] = self._postings.get(key, 0) + len(rows)
+        self._pending_postings = {}
+        for name in [c for c in COLUMNS if c != "offset"] + ["offset"]:
+            with open(self._file(name), "ab") as f:
+                self._pending[name].tofile(f)
+            self._pending[name] = array(COLUMNS[name])
+        self.rows += n
+        self.last = (self.column("offset")[self.rows - 1], self.column("length")[self.rows - 1])
+
+    def clear(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        for name in list(COLUMNS) + [n + ".dict" for n in DICT_COLUMNS]:
+            path = self._file(name) if name in COLUMNS else os.path.join(self.path, name)
+            tmp = path + ".tmp"
+            with open(tmp, "wb"):
+                pass
+            # Replacing (not truncating) keeps existing mappings valid.
+            os.replace(tmp, path)
+        for name in os.listdir(self.path):
+            if name.endswith(".rows"):
+                os.remove(os.path.join(self.path, name))
+        self._maps = {}
+        self._reset()
+
+    def _view(self, path: str, tc: str, n: int) -> memoryview:
+        # Zero-copy, read-only view of the first `n` values of a file. The
+        # mapping is reused until the file outgrows it.
+        need = n * array(tc).itemsize
+        cached = self._maps.get(path)
+        if not need:
+            return memoryview(array(tc))
+        if cached is None or cached[0] < need:
+            size = os.path.getsize(path)
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            cached = self._maps[path] = (size, memoryview(mm))
+        return cached[1][:need].cast(tc)
+
+    def column(self, name: str) -> memoryview:
+        return self._view(self._file(name), COLUMNS[name], self.rows)
+
+    def posting(self, name: str, value: str) -> memoryview:
+        # Row numbers (ascending) whose dictionary column `name` is `value`.
+        code = self._codes[name].get(value)
+        if code is None:
+            return memoryview(array(POSTING_TYPECODE))
+        return self._view(self._posting_file(name, code), POSTING_TYPECODE, self._postings.get((name, code), 0))
+
+    def decode(self, name: str, codes: Iterable[int]) -> List[str]:
+        values = self.dicts[name]
+        return [values[c] for c in codes]
+
+    def first_since(self, since: Optional[int]) -> int:
+        # First row that can have ts >= since: every earlier row's running
+        # maximum, and so its ts, is older.
+        return 0 if since is None else bisect.bisect_left(self.column("tsmax"), since)
+
+    def row_ranges(self, ranges: Optional[List[Tuple[int, int]]], first: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+        # [start, stop) row ranges, within [first, end), of the rows whose
+        # records start in the given logical offset ranges (all rows if None).
+        end = self.rows if end is None else end
+        if ranges is None:
+            return [(first, end)] if first < end else []
+        offsets = self.column("offset")
+        out: List[Tuple[int, int]] = []
+        for start, stop in ranges:
+            lo = max(first, bisect.bisect_left(offsets, start))
+            hi = min(end, bisect.bisect_left(offsets, stop))
+            if lo < hi:
+                out.append((lo, hi))
+        return out
+
+    def select(
+        self,
+        limit: int,
+        before: Optional[int] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        ranges: Optional[List[Tuple[int, int]]] = None,
+        **equals: Any,
+    ) -> List[int]:
+        # Up to `limit` row numbers, newest first, of rows starting before
+        # logical offset `before` that pass the same filters as count(). The
+        # shortest posting list among the dictionary filters drives the walk
+        # (every row if there is none); other filters are column lookups.
+        # The walk ends at the first row that can be as new as `since`, and
+        # only visits rows in `ranges` (logical offsets, e.g. the time
+        # index's blocks for the window) if given.
+        for name in equals:
+            if name not in COLUMNS:
+                raise ValueError(f"Unknown column: {name}")
+        end = self.rows if before is None else bisect.bisect_left(self.column("offset"), before)
+        spans = self.row_ranges(ranges, self.first_since(since), end)
+        if not spans:
+            return []
+        drivers: List[memoryview] = []
+        checks: List[Tuple[memoryview, Any]] = []
+        for name, value in equals.items():
+            if name in DICT_COLUMNS:
+                code = self._codes[name].get(value)
+                if code is None:
+                    return []
+                drivers.append(self.posting(name, value))
+                value = code
+            elif name in ("approved", "required"):
+                value = int(value)
+            checks.append((self.column(name), value))
+        timed = since is not None or until is not None
+        ts = self.column("ts") if timed else None
+        lo = TS_MISSING + 1 if since is None else since
+        hi = (1 << 63) - 1 if until is None else until
+
+        candidates: Iterable[int]
+        if drivers:
+            rows = min(drivers, key=len)
+            candidates = (
+                rows[i]
+                for a, b in reversed(spans)
+                for i in range(bisect.bisect_left(rows, b) - 1, bisect.bisect_left(rows, a) - 1, -1)
+            )
+        else:
+            candidates = (row for a, b in reversed(spans) for row in range(b - 1, a - 1, -1))
+        out: List[int] = []
+        for row in candidates:
+            if ts is not None and not lo <= ts[row] < hi:
+                continue
+            if any(col[row] != v for col, v in checks):
+                continue
+            out.append(row)
+            if len(out) >= limit:
+                break
+        return out
+
+    def count(
+        self,
+        by: Tuple[str, ...] = ("action", "decision"),
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        ranges: Optional[List[Tuple[int, int]]] = None,
+        **equals: Any,
+    ) -> Dict[Tuple[Any, ...], int]:
+        # Row counts grouped by `by` columns, for rows with since <= ts < until
+        # (epoch seconds) and column == value for each keyword filter, read
+        # only from rows in `ranges` (logical offsets) if given.
+        # Dictionary columns are compared by code and decoded at the end.
+        for name in tuple(by) + tuple(equals):
+            if name not in COLUMNS:
+                raise ValueError(f"Unknown column: {name}")
+        want: Dict[str, Any] = {}
+        for name, value in equals.items():
+            if name in DICT_COLUMNS:
+                code = self._codes[name].get(value)
+                if code is None:
+                    return {}
+                want[name] = code
+            else:
+                want[name] = int(value) if name == "approved" else value
+        timed = since is not None or until is not None
+        names = list(dict.fromkeys(tuple(by) + tuple(want) + (("ts",) if timed else ())))
+        views = [self.column(n) for n in names]
+        key_at = [names.index(n) for n in by]
+        filters = [(names.index(n), v) for n, v in want.items()]
+        ts_at = names.index("ts") if timed else -1
+        lo = TS_MISSING + 1 if since is None else since
+        hi = (1 << 63) - 1 if until is None else until
+
+        spans = self.row_ranges(ranges, self.first_since(since))
+        counts: Dict[Tuple[Any, ...], int] = {}
+        for row in itertools.chain.from_iterable(zip(*(v[a:b] for v in views)) for a, b in spans):
+            if timed and not lo <= row[ts_at] < hi:
+                continue
+            if any(row[i] != v for i, v in filters):
+                continue
+            key = tuple(row[i] for i in key_at)
+            counts[key] = counts.get(key, 0) + 1
+
+        out: Dict[Tuple[Any, ...], int] = {}
+        for key, n in counts.items():
+            out[tuple(self.dicts[name][k] if name in DICT_COLUMNS else k for name, k in zip(by, key))] = n
+        return out
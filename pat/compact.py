@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import datetime as dt
+import io
+import json
+import re
+import struct
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .hashing import canonical_json
+from .ledger import iter_receipts, verify_chain
+
+# Compact binary encoding of ledger records. A file is MAGIC followed by
+# records, each a varint payload length and a tagged value. Dict keys and
+# common strings are coded against SYMBOLS; "sha256:<hex>" strings and
+# second-precision UTC timestamps are packed when they round-trip exactly.
+# Decoded records are equal to the originals, so their canonical_json (and
+# with it canonical_hash and this_hash) is byte-identical.
+
+MAGIC = b"PATB\x01"
+# Bytes read per step when decoding a file.
+COMPACT_READ_BYTES = 1 << 20
+
+# Symbol codes are part of format version 1: only ever append to this table.
+SYMBOLS: Tuple[str, ...] = (
+    # keys
+    "actuation", "actuation_event_id", "attempted", "executed",
+    "approval", "approved", "approver_id", "public_key_b64", "required", "signature", "signature_alg", "signed_ts_utc",
+    "decision", "decision_by", "reason", "result",
+    "event_id", "inputs", "context", "channel", "source", "prompt",
+    "integrity", "canonical_hash", "prev_hash", "this_hash", "verified_at",
+    "model_output", "effective_confidence", "model", "parsed_confidence", "raw", "temperature",
+    "policy", "policy_id", "rules_hash", "version",
+    "policy_checks", "check_id", "details", "action_type", "allowed", "confidence", "threshold", "present", "note",
+    "proposed_action", "params", "target", "type", "ts_utc",
+    # values
+    "policy_engine", "BLOCKED", "PERMITTED", "PASS", "FAIL",
+    "ALLOWED_ACTIONS", "CONFIDENCE_PRESENT", "CONFIDENCE_THRESHOLD", "HUMAN_AUTH_REQUIRED", "HUMAN_AUTH_NOT_REQUIRED",
+    "Action not in allowed list",
+    "High-stakes action requires human authorization",
+    "Confidence < threshold for high-stakes action",
+    "Approved + confidence >= threshold",
+    "No confidence available",
+    "Confidence < threshold",
+    "Confidence >= threshold",
+    "No confidence provided/parsed",
+    "LOCKDOWN", "DISPATCH_POLICE", "ESCALATE_INCIDENT", "NOTIFY", "LOG_ONLY", "NOOP",
+    "demo", "sim", "demo-model", "ed25519", "",
+)
+_SYMBOL_CODES: Dict[str, int] = {s: i for i, s in enumerate(SYMBOLS)}
+
+_NULL, _FALSE, _TRUE, _INT, _FLOAT, _STR, _SYM, _HASH, _TS, _LIST, _DICT = range(11)
+# Tags followed by a varint (length, count, code or value).
+_COUNTED = frozenset((_INT, _STR, _SYM, _TS, _LIST, _DICT))
+
+_DOUBLE = struct.Struct(">d")
+_HASH_RE = re.compile(r"sha256:[0-9a-f]{64}\Z")
+_TS_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}Z\Z")
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+_EPOCH = dt.datetime(1970, 1, 1)
+
+
+def _varint(n: int, out: bytearray) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _encode_str(s: str, out: bytearray) -> None:
+    code = _SYMBOL_CODES.get(s)
+    if code is not None:
+        out.append(_SYM)
+        _varint(code, out)
+        return
+    if len(s) == 71 and _HASH_RE.match(s):
+        out.append(_HASH)
+        out += bytes.fromhex(s[7:])
+        return
+    if len(s) == 20 and _TS_RE.match(s):
+        try:
+            t = dt.datetime.strptime(s, _TS_FORMAT)
+        except ValueError:
+            t = None
+        if t is not None and t.year >= 1970:
+            out.append(_TS)
+            _varint(int((t - _EPOCH).total_seconds()), out)
+            return
+    raw = s.encode("utf-8", "surrogatepass")
+    out.append(_STR)
+    _varint(len(raw), out)
+    out += raw
+
+
+def _encode(v: Any, out: bytearray) -> None:
+    # bool before int: bool is an int subclass.
+    if v is None:
+        out.append(_NULL)
+    elif v is True:
+        out.append(_TRUE)
+    elif v is False:
+        out.append(_FALSE)
+    elif isinstance(v, str):
+        _encode_str(v, out)
+    elif isinstance(v, int):
+        out.append(_INT)
+        _varint(v << 1 if v >= 0 else ((-v) << 1) - 1, out)
+    elif isinstance(v, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(v)
+    elif isinstance(v, dict):
+        out.append(_DICT)
+        _varint(len(v), out)
+        for k, item in v.items():
+            if not isinstance(k, str):
+                raise ValueError(f"Non-string key {k!r} cannot be encoded")
+            _encode_str(k, out)
+            _encode(item, out)
+    elif isinstance(v, (list, tuple)):
+        out.append(_LIST)
+        _varint(len(v), out)
+        for item in v:
+            _encode(item, out)
+    else:
+        raise ValueError(f"Cannot encode {type(v).__name__} value")
+
+
+def encode_record(record: Any) -> bytes:
+    # One framed record: varint payload length, then the payload.
+    payload = bytearray()
+    _encode(record, payload)
+    out = bytearray()
+    _varint(len(payload), out)
+    return bytes(out + payload)
+
+
+def _decoder(data: bytes) -> Tuple[Callable[[int], Tuple[Any, int]], Callable[[int], Tuple[int, int]]]:
+    symbols = SYMBOLS
+    unpack_double = _DOUBLE.unpack_from
+
+    def varint(i: int) -> Tuple[int, int]:
+        n = shift = 0
+        while True:
+            b = data[i]
+            i += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n, i
+            shift += 7
+
+    def value(i: int) -> Tuple[Any, int]:
+        # Single-byte varints (every length or code below 128) are read
+        # inline; this loop is the whole decode cost.
+        tag = data[i]
+        n = data[i + 1] if tag in _COUNTED else 0
+        if n & 0x80:
+            n, i = varint(i + 1)
+        else:
+            i += 2 if tag in _COUNTED else 1
+        if tag == _SYM:
+            return symbols[n], i
+        if tag == _STR:
+            return data[i:i + n].decode("utf-8", "surrogatepass"), i + n
+        if tag == _DICT:
+            d = {}
+            for _ in range(n):
+                if data[i] == _SYM and data[i + 1] < 0x80:
+                    k = symbols[data[i + 1]]
+                    i += 2
+                else:
+                    k, i = value(i)
+                d[k], i = value(i)
+            return d, i
+        if tag == _LIST:
+            lst = []
+            for _ in range(n):
+                item, i = value(i)
+                lst.append(item)
+            return lst, i
+        if tag == _NULL:
+            return None, i
+        if tag == _TRUE:
+            return True, i
+        if tag == _FALSE:
+            return False, i
+        if tag == _INT:
+            return (n >> 1) if not n & 1 else -((n + 1) >> 1), i
+        if tag == _FLOAT:
+            return unpack_double(data, i)[0], i + 8
+        if tag == _HASH:
+            return "sha256:" + data[i:i + 32].hex(), i + 32
+        if tag == _TS:
+            return (_EPOCH + dt.timedelta(seconds=n)).strftime(_TS_FORMAT), i
+        raise ValueError(f"Unknown tag {tag}")
+
+    return value, varint
+
+
+def _decode_stream(read: Callable[[int], bytes], chunk: int) -> Iterator[Any]:
+    # Decodes every record after MAGIC, reading `chunk` bytes at a time; only
+    # the current chunk (and a record straddling its end) is held in memory.
+    # A record cut short raises ValueError.
+    data = read(max(chunk, len(MAGIC)))
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a compact ledger file (bad magic)")
+    value, varint = _decoder(data)
+    base = 0  # file offset of data[0]
+    i = len(MAGIC)
+    while True:
+        end = len(data)
+        start = i
+        need = 1 if i == end else 0
+        if not need:
+            try:
+                n, i = varint(i)
+                need = i + n - end
+            except IndexError:
+                need = 1
+        if need > 0:
+            # The next frame isn't all in this chunk: keep it and read on.
+            more = read(max(chunk, need))
+            if not more:
+                if start == end:
+                    return
+                raise ValueError(f"Truncated record at byte {base + start}")
+            data = data[start:] + more
+            base += start
+            i = 0
+            value, varint = _decoder(data)
+            continue
+        try:
+            record, stop = value(i)
+        except IndexError:
+            raise ValueError(f"Truncated record at byte {base + start}") from None
+        if stop != i + n:
+            raise ValueError(f"Corrupt record at byte {base + start}")
+        i = stop
+        yield record
+
+
+def decode_records(data: bytes) -> Iterator[Any]:
+    return _decode_stream(io.BytesIO(data).read, len(data))
+
+
+def iter_compact(path: str) -> Iterator[Any]:
+    with open(path, "rb") as f:
+        yield from _decode_stream(f.read, COMPACT_READ_BYTES)
+
+
+def write_compact(f: BinaryIO, records: Iterable[Any]) -> int:
+    f.write(MAGIC)
+    count = 0
+    buf: List[bytes] = []
+    for r in records:
+        buf.append(encode_record(r))
+        count += 1
+        if len(buf) >= 1024:
+            f.write(b"".join(buf))
+            buf = []
+    f.write(b"".join(buf))
+    return count
+
+
+def is_compact(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _iter_jsonl(path: str) -> Iterator[Any]:
+    with open(path, "rb") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise ValueError(f"Line {line_no}: unparseable JSON") from None
+
+
+def jsonl_to_compact(src: str, dst: str) -> int:
+    with open(dst, "wb") as f:
+        return write_compact(f, _iter_jsonl(src))
+
+
+def write_jsonl(f: BinaryIO, records: Iterable[Any]) -> int:
+    # Same line bytes the ledger writes (canonical_json + newline).
+    count = 0
+    for r in records:
+        f.write(canonical_json(r).encode("utf-8", "surrogatepass") + b"\n")
+        count += 1
+    return count
+
+
+def compact_to_jsonl(src: str, dst: str) -> int:
+    with open(dst, "wb") as f:
+        return write_jsonl(f, iter_compact(src))
+
+
+def export_compact(dst: str) -> int:
+    # The whole ledger, sealed segments included, as one compact file.
+    with open(dst, "wb") as f:
+        return write_compact(f, iter_receipts())
+
+
+def verify_file(path: str, max_errors: Optional[int] = None) -> Tuple[bool, List[str]]:
+    # Full hash-chain verification of an exported file in either format.
+    records = iter_compact(path) if is_compact(path) else _iter_jsonl(path)
+    try:
+        return verify_chain(records, max_errors=max_errors)
+    except ValueError as e:
+        return False, [str(e)]
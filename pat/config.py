@@ -1,10 +1,24 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Tuple, Optional
+from typing import TYPE_CHECKING, Any, Dict, Tuple, Optional
+
+if TYPE_CHECKING:
+    from .policy import CompiledPolicy
 
 APP_NAME = "PAT v0.2"
 LOG_PATH = "pat_log.jsonl"
+INDEX_PATH = "pat_index.jsonl"
+MERKLE_PATH = "pat_merkle.bin"
+COLUMNS_DIR = "pat_columns"
+TIME_INDEX_PATH = "pat_time.jsonl"
+# Sparse time index granularity: one entry per this many ledger bytes.
+TIME_INDEX_BLOCK_BYTES = 64 * 1024
+VERIFY_CHECKPOINT_PATH = "pat_verify.json"
+LOCK_PATH = "pat_log.lock"
+SEGMENTS_DIR = "pat_segments"
+SEGMENT_MAX_BYTES: Optional[int] = None
+SEGMENT_MAX_AGE_S: Optional[float] = None
 KEYRING_PATH = "pat_keys.json"
 
 DEFAULT_POLICY_ID = "PAT_DEMO_001"
@@ -16,6 +30,14 @@ ALL_ACTIONS = HIGH_STAKES_ACTIONS | LOW_STAKES_ACTIONS
 
 CONFIDENCE_THRESHOLD = 0.85
 
+EVENTS_PAGE_SIZE = 250
+INGEST_MAX_ITEMS = 10000
+# Errors collected (and shown) per /verify run; a badly broken ledger
+# stops there instead of listing every line.
+VERIFY_MAX_ERRORS = 100
+# Rendered read responses kept per process (see pat/httpcache.py).
+HTTP_CACHE_ENTRIES = 512
+
 
 @dataclass(frozen=True)
 class PolicyRuleSet:
@@ -40,6 +62,11 @@ class PolicyRuleSet:
             ensure_ascii=False,
         )
 
+    def compile(self) -> "CompiledPolicy":
+        # Cached per rule set; see pat.policy.compile_policy
+        from .policy import compile_policy
+        return compile_policy(self)
+
 
 DEFAULT_POLICY = PolicyRuleSet(
     policy_id=DEFAULT_POLICY_ID,
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 
 def canonical_json(obj: Any) -> str:
@@ -22,15 +22,77 @@ def receipt_canonical_payload(receipt: Dict[str, Any]) -> Dict[str, Any]:
     if isinstance(r.get("integrity"), dict):
         r["integrity"].pop("this_hash", None)
         r["integrity"].pop("verified_at", None)
+        # canonical_hash is still null when the hash is first computed
+        if "canonical_hash" in r["integrity"]:
+            r["integrity"]["canonical_hash"] = None
     if isinstance(r.get("approval"), dict):
         r["approval"].pop("signature", None)
     return r
 
 
+_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+# Top-level sections that differ between the hashed payload and the stored line.
+_PAYLOAD_SECTIONS = ("approval", "integrity")
+
+
+def _payload_section(key: str, value: Any) -> Any:
+    # Same stripping as receipt_canonical_payload, on one shallow section.
+    if not isinstance(value, dict):
+        return value
+    if key == "integrity":
+        return {
+            k: (None if k == "canonical_hash" else v)
+            for k, v in value.items()
+            if k not in ("this_hash", "verified_at")
+        }
+    return {k: v for k, v in value.items() if k != "signature"}
+
+
+class CanonicalReceipt:
+    # Encodes a receipt once per top-level section. The hashed payload and
+    # the final JSONL line share every section except approval/integrity,
+    # so those are the only ones encoded twice. Output is byte-identical to
+    # canonical_json. Other sections must not change between
+    # canonical_hash() and line().
+
+    def __init__(self, receipt: Dict[str, Any]) -> None:
+        self.receipt = receipt
+        self._sections: Dict[str, bytes] = {}
+
+    def _section(self, key: str, value: Any) -> bytes:
+        return (_encoder.encode(key) + ":" + _encoder.encode(value)).encode("utf-8")
+
+    def _chunks(self, payload: bool) -> Iterator[bytes]:
+        r = self.receipt
+        if not all(isinstance(k, str) for k in r):
+            yield canonical_json(receipt_canonical_payload(r) if payload else r).encode("utf-8")
+            return
+        yield b"{"
+        for i, key in enumerate(sorted(r)):
+            if i:
+                yield b","
+            if key in _PAYLOAD_SECTIONS:
+                yield self._section(key, _payload_section(key, r[key]) if payload else r[key])
+                continue
+            part = self._sections.get(key)
+            if part is None:
+                part = self._sections[key] = self._section(key, r[key])
+            yield part
+        yield b"}"
+
+    def canonical_hash(self) -> str:
+        h = hashlib.sha256()
+        for chunk in self._chunks(payload=True):
+            h.update(chunk)
+        return "sha256:" + h.hexdigest()
+
+    def line(self) -> bytes:
+        return b"".join(self._chunks(payload=False)) + b"\n"
+
+
 def compute_canonical_hash(receipt: Dict[str, Any]) -> str:
-    payload = receipt_canonical_payload(receipt)
-    canon = canonical_json(payload).encode("utf-8")
-    return "sha256:" + sha256_hex(canon)
+    return CanonicalReceipt(receipt).canonical_hash()
 
 
 def compute_this_hash(prev_hash: str, canonical_hash: str) -> str:
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .ledger import LedgerHead
+
+# Per key: (state tag it was rendered at, ETag, body).
+_Entry = Tuple[str, str, Any]
+
+
+def _tag(*parts: Any) -> str:
+    return '"' + hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def head_etag(head: LedgerHead, *extra: Any) -> str:
+    # Validator for anything derived from the ledger as a whole. The head's
+    # this_hash alone would survive a rewrite of the last line (tamper) that
+    # keeps the stored hash, so its size and count go in as well.
+    return _tag(head.last_hash, head.count, head.size, *extra)
+
+
+def verify_etag(head: LedgerHead) -> str:
+    # Validator for the verification page. An in-place edit that keeps the
+    # file's length (and a hash field's value) leaves size, count and even
+    # last_hash as they were; the active file's inode and mtime_ns still move.
+    return head_etag(head, head.inode, head.mtime_ns)
+
+
+def receipt_etag(receipt: Dict[str, Any], *extra: Any) -> str:
+    # Validator for a single receipt: its own this_hash, unchanged by
+    # unrelated appends.
+    return _tag((receipt.get("integrity") or {}).get("this_hash"), *extra)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t[2:] == etag if t.startswith("W/") else t == etag for t in tags)
+
+
+class ResponseCache:
+    # Rendered responses by request key, each stored with the ledger state
+    # tag it was rendered at. A hit at the same tag costs one dict lookup.
+    # When the tag moves, `current()` revalidates (e.g. the receipt's own
+    # hash) and the stored body is reused if its ETag still matches; only
+    # then is it rendered again. Least recently used entries are dropped.
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        tag: str,
+        current: Callable[[], Tuple[str, Any]],
+        render: Callable[[Any], Any],
+    ) -> Tuple[str, Any]:
+        # Returns (etag, body). current() -> (etag, state); render(state) -> body.
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+        if hit is not None and hit[0] == tag:
+            return hit[1], hit[2]
+        etag, state = current()
+        body = hit[2] if hit is not None and hit[1] == etag else render(state)
+        with self._lock:
+            self._entries[key] = (tag, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag, body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
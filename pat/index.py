@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+class EventIndex:
+    # Sidecar mapping event_id -> logical byte offsets of its receipts in the
+    # ledger (newest last). Stored as JSONL of [event_id, offset] so it can be
+    # appended alongside the ledger and rebuilt from it at any time.
+
+    def __init__(self, path: str, log_path: str) -> None:
+        self.path = path
+        self.log_path = log_path
+        self.offsets: Dict[str, List[int]] = {}
+        self.covered = 0
+        self.consumed = 0
+        self.last: Optional[Tuple[str, int]] = None
+        self._pending: List[Tuple[str, int]] = []
+
+    @classmethod
+    def load(cls, path: str, log_path: str) -> "EventIndex":
+        idx = cls(path, log_path)
+        idx.refresh()
+        return idx
+
+    def refresh(self) -> None:
+        # Reads sidecar entries appended (possibly by another process) since
+        # the last load.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.consumed)
+            for line in f:
+                try:
+                    event_id, offset = json.loads(line)
+                except (ValueError, TypeError):
+                    # Torn trailing write; drop it and let the log catch-up refill.
+                    os.truncate(self.path, self.consumed)
+                    break
+                self.consumed += len(line)
+                self._insert(event_id, offset)
+
+    def _insert(self, event_id: str, offset: int) -> bool:
+        lst = self.offsets.setdefault(event_id, [])
+        if offset in lst:
+            return False
+        if lst and offset < lst[-1]:
+            bisect.insort(lst, offset)
+        else:
+            lst.append(offset)
+        if self.last is None or offset > self.last[1]:
+            self.last = (event_id, offset)
+        return True
+
+    def get(self, event_id: str) -> List[int]:
+        return self.offsets.get(event_id, [])
+
+    def add(self, event_id: str, offset: int, end: int) -> None:
+        if self._insert(event_id, offset):
+            self._pending.append((event_id, offset))
+        self.covered = max(self.covered, end)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size != self.consumed:
+            # Someone else wrote entries; fold them in before appending ours.
+            if size < self.consumed:
+                self.consumed = 0
+            self.refresh()
+        data = "".join(json.dumps(e, separators=(",", ":"), ensure_ascii=False) + "\n" for e in self._pending)
+        raw = data.encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(raw)
+        self.consumed += len(raw)
+        self._pending = []
+
+    def clear(self) -> None:
+        self.offsets = {}
+        self.covered = 0
+        self.consumed = 0
+        self.last = None
+        self._pending = []
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("")
+        os.replace(tmp, self.path)
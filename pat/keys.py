@@ -5,7 +5,7 @@ import datetime as dt
 import json
 import os
 import threading
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set, Tuple
 
 from cryptography.hazmat.primitives.asymmetric.ed25519 import (
     Ed25519PrivateKey,
@@ -17,6 +17,11 @@ from .config import KEYRING_PATH
 
 _key_lock = threading.Lock()
 
+# (path, inode, size, mtime_ns) of the keyring file -> its parsed contents and
+# the public keys decoded from it so far.
+_KeyringStamp = Tuple[str, int, int, int]
+_keyring_cache: Optional[Tuple[_KeyringStamp, Dict[str, Any], Dict[str, Ed25519PublicKey]]] = None
+
 
 def ensure_keyring_exists() -> None:
     if not os.path.exists(KEYRING_PATH):
@@ -31,8 +36,34 @@ def load_keyring() -> Dict[str, Any]:
 
 
 def save_keyring(data: Dict[str, Any]) -> None:
-    with open(KEYRING_PATH, "w", encoding="utf-8") as f:
+    # Replaced atomically so readers never see a half-written keyring and the
+    # new inode always invalidates their cached copy.
+    global _keyring_cache
+    tmp = KEYRING_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         f.write(json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False))
+    os.replace(tmp, KEYRING_PATH)
+    _keyring_cache = None
+
+
+def keyring_stamp() -> _KeyringStamp:
+    # Changes whenever the keyring file is written or replaced.
+    ensure_keyring_exists()
+    st = os.stat(KEYRING_PATH)
+    return (os.path.abspath(KEYRING_PATH), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _cached_keyring() -> Tuple[Dict[str, Any], Dict[str, Ed25519PublicKey]]:
+    # Shared, read-only view of the keyring; re-parsed only when the file
+    # changes. Callers must not mutate what it returns.
+    global _keyring_cache
+    stamp = keyring_stamp()
+    hit = _keyring_cache
+    if hit is not None and hit[0] == stamp:
+        return hit[1], hit[2]
+    kr = load_keyring()
+    _keyring_cache = (stamp, kr, {})
+    return kr, _keyring_cache[2]
 
 
 def _privkey_to_b64(priv: Ed25519PrivateKey) -> str:
@@ -85,25 +116,99 @@ def ensure_demo_approver() -> str:
 
 
 def get_public_key_b64(approver_id: str) -> Optional[str]:
-    kr = load_keyring()
+    kr, _ = _cached_keyring()
     entry = (kr.get("keys") or {}).get(approver_id)
     if not entry:
         return None
     return entry.get("public_key_b64")
 
 
+def _public_key(approver_id: str) -> Optional[Ed25519PublicKey]:
+    kr, decoded = _cached_keyring()
+    pub = decoded.get(approver_id)
+    if pub is None:
+        pub_b64 = ((kr.get("keys") or {}).get(approver_id) or {}).get("public_key_b64")
+        if not pub_b64:
+            return None
+        pub = decoded[approver_id] = _b64_to_pubkey(pub_b64)
+    return pub
+
+
+class SignerRegistry:
+    # (keyring path, approver_id) -> private key handle, loaded from the
+    # keyring on first use. A handle is kept while the keyring file's stamp
+    # is unchanged, so a rotated key is picked up on the next signature.
+    # Signing itself takes no lock; the lock only serializes loads on a miss.
+
+    def __init__(self) -> None:
+        self._handles: Dict[Tuple[str, str], Tuple[_KeyringStamp, Ed25519PrivateKey]] = {}
+        self._revoked: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def get(self, approver_id: str) -> Ed25519PrivateKey:
+        stamp = keyring_stamp()
+        key = (stamp[0], approver_id)
+        hit = self._handles.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        with self._lock:
+            if key in self._revoked:
+                raise ValueError("Signer revoked for approver")
+            hit = self._handles.get(key)
+            if hit is not None and hit[0] == stamp:
+                return hit[1]
+            kr, _ = _cached_keyring()
+            entry = (kr.get("keys") or {}).get(approver_id)
+            if not entry:
+                raise ValueError("Unknown approver_id")
+            priv_b64 = entry.get("private_key_b64")
+            if not priv_b64:
+                raise ValueError("No private key available for approver")
+            priv = _b64_to_privkey(priv_b64)
+            self._handles[key] = (stamp, priv)
+            return priv
+
+    def reload(self, approver_id: Optional[str] = None) -> None:
+        # Drops cached handles so the next signature re-reads the keyring.
+        # Revocations stay; only reinstate() lifts one.
+        with self._lock:
+            if approver_id is None:
+                self._handles = {}
+            else:
+                self._handles = {k: v for k, v in self._handles.items() if k[1] != approver_id}
+
+    def revoke(self, approver_id: str) -> None:
+        # Refuses to sign for approver_id under the current keyring in this
+        # process until reinstate().
+        key = (os.path.abspath(KEYRING_PATH), approver_id)
+        with self._lock:
+            self._revoked.add(key)
+            self._handles.pop(key, None)
+
+    def reinstate(self, approver_id: str) -> None:
+        key = (os.path.abspath(KEYRING_PATH), approver_id)
+        with self._lock:
+            self._revoked.discard(key)
+            self._handles.pop(key, None)
+
+
+_signers = SignerRegistry()
+
+
+def reload_signers(approver_id: Optional[str] = None) -> None:
+    _signers.reload(approver_id)
+
+
+def revoke_signer(approver_id: str) -> None:
+    _signers.revoke(approver_id)
+
+
+def reinstate_signer(approver_id: str) -> None:
+    _signers.reinstate(approver_id)
+
+
 def sign_with_approver(approver_id: str, message: str) -> str:
-    with _key_lock:
-        kr = load_keyring()
-        entry = (kr.get("keys") or {}).get(approver_id)
-        if not entry:
-            raise ValueError("Unknown approver_id")
-        priv_b64 = entry.get("private_key_b64")
-        if not priv_b64:
-            raise ValueError("No private key available for approver")
-        priv = _b64_to_privkey(priv_b64)
-
-    sig = priv.sign(message.encode("utf-8"))
+    sig = _signers.get(approver_id).sign(message.encode("utf-8"))
     return "ed25519:" + base64.b64encode(sig).decode("ascii")
 
 
@@ -116,10 +221,9 @@ def verify_signature(approver_id: str, message: str, signature: str) -> bool:
     except Exception:
         return False
 
-    pub_b64 = get_public_key_b64(approver_id)
-    if not pub_b64:
+    pub = _public_key(approver_id)
+    if pub is None:
         return False
-    pub = _b64_to_pubkey(pub_b64)
 
     try:
         pub.verify(sig, message.encode("utf-8"))
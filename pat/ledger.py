@@ -1,14 +1,152 @@
 from __future__ import annotations
 
+import bisect
+import contextlib
+import datetime as dt
+import itertools
 import json
 import os
 import threading
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from .config import LOG_PATH
-from .hashing import canonical_json, compute_canonical_hash, compute_this_hash
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
 
-_log_lock = threading.Lock()
+from .archive import (
+    DEFAULT_BLOCK_BYTES,
+    is_archive,
+    iter_archive_lines,
+    iter_archive_lines_reverse,
+    load_index,
+    read_archive_line,
+)
+from .checkpoint import VerifyCheckpoint, clear_checkpoint, load_checkpoint, save_checkpoint
+from .columns import TS_MISSING, ColumnStore, Row, _epoch, row_of_receipt
+from .config import (
+    COLUMNS_DIR,
+    INDEX_PATH,
+    LOCK_PATH,
+    LOG_PATH,
+    MERKLE_PATH,
+    SEGMENT_MAX_AGE_S,
+    SEGMENT_MAX_BYTES,
+    SEGMENTS_DIR,
+    TIME_INDEX_BLOCK_BYTES,
+    TIME_INDEX_PATH,
+    VERIFY_CHECKPOINT_PATH,
+)
+from .hashing import CanonicalReceipt, canonical_json, compute_canonical_hash, compute_this_hash
+from .index import EventIndex
+from .merkle import MerkleTree, encode_hash, receipt_leaf_hash
+from .query import EventFilter
+from .segments import SegmentManifest, archive_segment, file_sha256, load_manifests, remove_segments, seal_segment
+from .storage import LedgerBackend, SqliteBackend, open_backend
+from .timeindex import TimeIndex
+from .writer import FsyncPolicy, GroupCommitWriter
+
+GENESIS_HASH = "sha256:" + "0" * 64
+
+_log_lock = threading.RLock()
+
+
+@dataclass(frozen=True)
+class LedgerHead:
+    path: str
+    inode: int
+    size: int  # logical end of the ledger, across sealed segments
+    mtime_ns: int
+    count: int
+    last_hash: str
+    base: int = 0  # logical offset where the active file starts
+
+
+_head: Optional[LedgerHead] = None
+_index: Optional[EventIndex] = None
+_merkle: Optional[MerkleTree] = None
+_columns: Optional[ColumnStore] = None
+_times: Optional[TimeIndex] = None
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+_append_fh: Optional[Tuple[str, int, Any]] = None
+_lock_fh: Optional[Tuple[str, Any]] = None
+_lock_depth = 0
+_rotate_max_bytes: Optional[int] = SEGMENT_MAX_BYTES
+_rotate_max_age_s: Optional[float] = SEGMENT_MAX_AGE_S
+_active_started: Optional[Tuple[int, float]] = None
+# None is the JSONL file plus sealed segments; see configure_storage().
+_backend: Optional[LedgerBackend] = None
+
+# Builders may return an already-encoded receipt so its line bytes are reused.
+ReceiptBuilder = Callable[[LedgerHead], Union[Dict[str, Any], CanonicalReceipt]]
+
+
+def _reset_after_fork() -> None:
+    # A forked worker must not share the parent's flock description, writer
+    # thread or possibly-held thread lock.
+    global _log_lock, _lock_fh, _lock_depth, _writer, _append_fh
+    _log_lock = threading.RLock()
+    _lock_fh = None
+    _lock_depth = 0
+    _writer = None
+    _append_fh = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@contextlib.contextmanager
+def ledger_lock() -> Iterator[None]:
+    # Thread lock plus an exclusive flock on LOCK_PATH, so every process
+    # appending to the same ledger serializes on it. Re-entrant per thread.
+    global _lock_fh, _lock_depth
+    with _log_lock:
+        if fcntl is None:
+            yield
+            return
+        path = os.path.abspath(LOCK_PATH)
+        if _lock_depth == 0:
+            if _lock_fh is None or _lock_fh[0] != path:
+                if _lock_fh is not None:
+                    _lock_fh[1].close()
+                _lock_fh = (path, open(LOCK_PATH, "a+b"))
+            fcntl.flock(_lock_fh[1].fileno(), fcntl.LOCK_EX)
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+            if _lock_depth == 0:
+                fcntl.flock(_lock_fh[1].fileno(), fcntl.LOCK_UN)
+
+
+def configure_storage(storage: Union[None, str, LedgerBackend]) -> None:
+    # Installs a storage backend behind every function in this module: None
+    # or "jsonl" for the JSONL ledger, "sqlite:<path>", or a LedgerBackend.
+    # Sidecars are re-anchored against the new storage on next use.
+    global _backend
+    backend = open_backend(storage) if isinstance(storage, str) else storage
+    with ledger_lock():
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+        invalidate_ledger_head()
+        _invalidate_event_index()
+        _invalidate_merkle_tree()
+        _invalidate_column_store()
+        _invalidate_time_index()
+
+
+def storage_backend() -> Optional[LedgerBackend]:
+    return _backend
+
+
+def _require_jsonl(what: str) -> None:
+    if _backend is not None:
+        raise ValueError(f"{what} needs the JSONL storage (current: {_backend.name})")
 
 
 def ensure_log_exists() -> None:
@@ -17,74 +155,1113 @@ def ensure_log_exists() -> None:
             pass
 
 
-def read_all_receipts() -> List[Dict[str, Any]]:
-    ensure_log_exists()
-    out: List[Dict[str, Any]] = []
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
+READ_BLOCK_BYTES = 1 << 16
+
+
+@dataclass(frozen=True)
+class _Piece:
+    # One physical file of the ledger: a sealed segment or the active log.
+    path: str
+    base: int
+    size: int
+    manifest: Optional[SegmentManifest]
+
+
+def _active_base(segs: List[SegmentManifest]) -> Tuple[int, int, str]:
+    if not segs:
+        return 0, 0, GENESIS_HASH
+    m = segs[-1]
+    return m.end_offset, m.base_count + m.count, m.last_hash or GENESIS_HASH
+
+
+def _pieces() -> List[_Piece]:
+    segs = load_manifests(SEGMENTS_DIR)
+    out = [_Piece(m.path, m.base_offset, m.size, m) for m in segs]
+    out.append(_Piece(LOG_PATH, _active_base(segs)[0], os.path.getsize(LOG_PATH), None))
+    return out
+
+
+def _logical_end() -> int:
+    if _backend is not None:
+        return _backend.end()
+    active = _pieces()[-1]
+    return active.base + active.size
+
+
+def _piece_at(offset: int) -> _Piece:
+    pieces = _pieces()
+    i = bisect.bisect_right([p.base for p in pieces], offset) - 1
+    return pieces[max(i, 0)]
+
+
+def _iter_file_lines(path: str, start: int, end: Optional[int], base: int) -> Iterator[Tuple[int, bytes]]:
+    if is_archive(path):
+        # Only the blocks overlapping [start, end) are decompressed.
+        for pos, line in iter_archive_lines(path, start, end):
+            if line.strip():
+                yield base + pos, line
+        return
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
         for line in f:
-            line = line.strip()
-            if not line:
+            if end is not None and pos >= end:
+                break
+            if line.strip():
+                yield base + pos, line
+            pos += len(line)
+
+
+def _iter_file_lines_reverse(path: str, start: int, end: int, base: int) -> Iterator[Tuple[int, bytes]]:
+    # Reads backwards from `end` in fixed blocks; `start` must be a line start.
+    if is_archive(path):
+        for pos, line in iter_archive_lines_reverse(path, start, end):
+            if line.strip():
+                yield base + pos, line
+        return
+    with open(path, "rb") as f:
+        pos = end
+        carry = b""
+        while pos > start:
+            n = min(READ_BLOCK_BYTES, pos - start)
+            pos -= n
+            f.seek(pos)
+            buf = f.read(n) + carry
+            if pos > start:
+                # The first line in the block may continue in the previous one.
+                cut = buf.find(b"\n") + 1
+                if cut == 0:
+                    carry = buf
+                    continue
+            else:
+                cut = 0
+            carry = buf[:cut]
+            j = len(buf)
+            while j > cut:
+                i = buf.rfind(b"\n", cut, j - 1) + 1 or cut
+                line = buf[i:j]
+                # Only the newest line can lack its newline: a writer is
+                # still appending it, so it isn't a record yet.
+                if line.strip() and line.endswith(b"\n"):
+                    yield base + pos + i, line
+                j = i
+
+
+def _iter_lines(start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    # Logical offsets across segments; records never span two files.
+    if _backend is not None:
+        yield from _backend.scan(start, end)
+        return
+    for p in _pieces():
+        lo = max(start, p.base)
+        if end is None and p.manifest is None:
+            local_end = None  # active file: read to EOF
+        else:
+            stop = min(end if end is not None else p.base + p.size, p.base + p.size)
+            if lo >= stop:
                 continue
-            out.append(json.loads(line))
-    return out
+            local_end = stop - p.base
+        yield from _iter_file_lines(p.path, lo - p.base, local_end, p.base)
+
+
+def _iter_lines_reverse(start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    if _backend is not None:
+        yield from _backend.scan(start, end, reverse=True)
+        return
+    for p in reversed(_pieces()):
+        lo, hi = max(start, p.base), min(end, p.base + p.size)
+        if lo < hi:
+            yield from _iter_file_lines_reverse(p.path, lo - p.base, hi - p.base, p.base)
+
+
+def iter_receipts(
+    start_offset: int = 0,
+    end_offset: Optional[int] = None,
+    reverse: bool = False,
+    with_offsets: bool = False,
+) -> Iterator[Any]:
+    # Streams receipts in [start_offset, end_offset) without loading the log.
+    # With `with_offsets`, yields (byte_offset, receipt) pairs.
+    ensure_log_exists()
+    if end_offset is None:
+        end_offset = _logical_end()
+    if reverse:
+        lines = _iter_lines_reverse(start_offset, end_offset)
+    else:
+        lines = _iter_lines(start_offset, end_offset)
+    for offset, line in lines:
+        r = json.loads(line)
+        yield (offset, r) if with_offsets else r
+
+
+def is_record_boundary(offset: int) -> bool:
+    ensure_log_exists()
+    if offset == 0:
+        return True
+    if offset < 0 or offset > _logical_end():
+        return False
+    if _backend is not None:
+        return _backend.is_boundary(offset)
+    p = _piece_at(offset)
+    if offset == p.base:
+        return True
+    if is_archive(p.path):
+        return bool(read_archive_line(p.path, offset - p.base))
+    with open(p.path, "rb") as f:
+        f.seek(offset - p.base - 1)
+        return f.read(1) == b"\n"
+
+
+def _select_receipts(limit: int, before: Optional[int], where: EventFilter) -> List[Tuple[int, Dict[str, Any]]]:
+    since, until = where.epoch_range()
+    with ledger_lock():
+        store = column_store()
+        ranges = _time_ranges(since, until)
+        rows = store.select(limit, before, since, until, ranges, **where.column_equals())
+        offsets = [store.column("offset")[row] for row in rows]
+    return [(offset, json.loads(_read_line_at(offset))) for offset in offsets]
+
+
+def tail_receipts(
+    limit: int,
+    before: Optional[int] = None,
+    where: Optional[EventFilter] = None,
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], Optional[int]]:
+    # Newest-first page ending before byte offset `before` (EOF if None),
+    # optionally filtered by `where`. Returns the page and the cursor for the
+    # next, older page. Filtered pages come from indexes, never a scan of the
+    # log: SQLite's own, otherwise the column sidecar's posting lists.
+    if isinstance(_backend, SqliteBackend):
+        rows = _backend.select(limit, before, where)
+        page = [(offset, json.loads(line)) for offset, line in rows]
+    elif where is not None and not where.is_empty():
+        page = _select_receipts(limit, before, where)
+    else:
+        page = list(itertools.islice(iter_receipts(end_offset=before, reverse=True, with_offsets=True), limit))
+    if len(page) < limit or page[-1][0] == 0:
+        return page, None
+    return page, page[-1][0]
+
+
+def read_all_receipts() -> List[Dict[str, Any]]:
+    return list(iter_receipts())
 
 
 def get_last_hash(receipts: List[Dict[str, Any]]) -> str:
     if not receipts:
-        return "sha256:" + "0" * 64
+        return GENESIS_HASH
     integ = receipts[-1].get("integrity") or {}
-    return integ.get("this_hash") or ("sha256:" + "0" * 64)
+    return integ.get("this_hash") or GENESIS_HASH
 
 
-def append_receipt(receipt: Dict[str, Any]) -> None:
+def _hash_of_line(line: bytes) -> str:
+    integ = json.loads(line).get("integrity") or {}
+    return integ.get("this_hash") or GENESIS_HASH
+
+
+def _scan_head(path: str, st: os.stat_result, base: int, start: int, count: int, last_hash: str) -> LedgerHead:
+    # Only the final line is parsed; the rest are counted. A line another
+    # process is still writing (no newline yet, or past the stat) is left
+    # out of the head, as the sidecar catch-ups do.
+    last_line = b""
+    scanned = start
+    with open(LOG_PATH, "rb") as f:
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b"\n") or scanned + len(line) > st.st_size:
+                break
+            scanned += len(line)
+            if line.strip():
+                count += 1
+                last_line = line
+    if last_line:
+        last_hash = _hash_of_line(last_line)
+    return LedgerHead(path, st.st_ino, base + scanned, st.st_mtime_ns, count, last_hash, base)
+
+
+def get_ledger_head() -> LedgerHead:
+    global _head
+    if _backend is not None:
+        return _backend.head()
     ensure_log_exists()
-    line = canonical_json(receipt)
     with _log_lock:
-        with open(LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        path = os.path.abspath(LOG_PATH)
+        st = os.stat(LOG_PATH)
+        h = _head
+        if h is not None and h.path == path and h.inode == st.st_ino:
+            end = h.base + st.st_size
+            if h.size == end and h.mtime_ns == st.st_mtime_ns:
+                return h
+            if end > h.size:
+                # Another writer appended; pick up only the new tail.
+                _head = _scan_head(path, st, h.base, h.size - h.base, h.count, h.last_hash)
+                return _head
+        # New active file (rotation, reset or first use): sealed segments
+        # contribute their manifest totals, only the active file is scanned.
+        base, count, last_hash = _active_base(load_manifests(SEGMENTS_DIR, force=True))
+        _head = _scan_head(path, st, base, 0, count, last_hash)
+        return _head
+
+
+def invalidate_ledger_head() -> None:
+    global _head
+    with _log_lock:
+        _head = None
+
+
+def _invalidate_event_index() -> None:
+    global _index
+    _index = None
+
+
+def _invalidate_merkle_tree() -> None:
+    global _merkle
+    _merkle = None
+
+
+def _invalidate_column_store() -> None:
+    global _columns
+    _columns = None
+
+
+def _invalidate_time_index() -> None:
+    global _times
+    _times = None
+
+
+def _note_appended(head: LedgerHead, items: List[Tuple[Dict[str, Any], bytes]], st: os.stat_result) -> None:
+    # Advance the head and event index past records we just wrote at the end
+    # of the log; if anything else landed in between, let them rescan.
+    global _head
+    total = sum(len(data) for _, data in items)
+    if st.st_ino != head.inode or head.base + st.st_size != head.size + total:
+        _head = None
+        return
+    this_hash = (items[-1][0].get("integrity") or {}).get("this_hash") or GENESIS_HASH
+    _head = replace(
+        head,
+        size=head.size + total,
+        mtime_ns=st.st_mtime_ns,
+        count=head.count + len(items),
+        last_hash=this_hash,
+    )
+    idx = _index
+    if idx is not None and idx.covered == head.size:
+        offset = head.size
+        for receipt, data in items:
+            idx.add(receipt.get("event_id"), offset, offset + len(data))
+            offset += len(data)
+        idx.flush()
+    tree = _merkle
+    if tree is not None and tree.covered == head.size and tree.in_sync():
+        entries: List[Tuple[int, int, bytes]] = []
+        offset = head.size
+        for receipt, data in items:
+            leaf = _leaf_of_receipt(receipt)
+            if leaf is not None:
+                entries.append((offset, offset + len(data), leaf))
+            offset += len(data)
+        tree.append(entries)
+        tree.covered = head.size + total
+    store = _columns
+    if store is not None and store.covered == head.size and store.in_sync():
+        offset = head.size
+        for receipt, data in items:
+            store.add(row_of_receipt(receipt, offset, len(data)))
+            offset += len(data)
+        store.flush()
+    times = _times
+    if times is not None and times.scanned == head.size and times.in_sync():
+        offset = head.size
+        for receipt, data in items:
+            times.add(offset, len(data), _epoch(receipt.get("ts_utc")))
+            offset += len(data)
+        times.flush()
+
+
+def _append_handle() -> Any:
+    global _append_fh
+    path = os.path.abspath(LOG_PATH)
+    inode = os.stat(LOG_PATH).st_ino
+    if _append_fh is None or _append_fh[0] != path or _append_fh[1] != inode:
+        if _append_fh is not None:
+            _append_fh[2].close()
+        _append_fh = (path, inode, open(LOG_PATH, "ab"))
+    return _append_fh[2]
+
+
+def _encode_line(built: Union[Dict[str, Any], CanonicalReceipt]) -> Tuple[Dict[str, Any], bytes]:
+    if not isinstance(built, CanonicalReceipt):
+        built = CanonicalReceipt(built)
+    return built.receipt, built.line()
+
+
+def _write_batch(builders: List[Any]) -> Tuple[List[Any], int]:
+    # Runs each builder against the head as it stands after the previous one,
+    # then writes the whole batch with a single write. A builder that raises
+    # is skipped and its exception returned in its slot. An item may also be
+    # a list of builders (append_chained_batch); its slot is then the list
+    # of their outcomes.
+    ensure_log_exists()
+    with ledger_lock():
+        head = get_ledger_head()
+        cur = head
+        items: List[Tuple[Dict[str, Any], bytes]] = []
+
+        def step(build: ReceiptBuilder) -> Any:
+            nonlocal cur
+            try:
+                receipt, data = _encode_line(build(cur))
+            except Exception as e:
+                return e
+            items.append((receipt, data))
+            this_hash = (receipt.get("integrity") or {}).get("this_hash") or GENESIS_HASH
+            cur = replace(cur, size=cur.size + len(data), count=cur.count + 1, last_hash=this_hash)
+            return receipt
+
+        outcomes = [[step(b) for b in item] if isinstance(item, list) else step(item) for item in builders]
+        if _backend is not None:
+            # The backend commits durably itself; there is no fd to fsync.
+            if items:
+                _backend.append(head, items)
+            return outcomes, -1
+        f = _append_handle()
+        if items:
+            f.write(b"".join(data for _, data in items))
+            f.flush()
+            _note_appended(head, items, os.fstat(f.fileno()))
+        fd = f.fileno()
+        _maybe_rotate()
+        return outcomes, fd
+
+
+def configure_writer(policy: Optional[str]) -> None:
+    # None restores the default open/write/close append with no fsync;
+    # otherwise appends go through a group-commit writer thread that blocks
+    # callers until their batch is written (and fsynced, per the policy).
+    global _writer, _append_fh
+    fsync_policy = FsyncPolicy.parse(policy) if policy is not None else None
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+        with _log_lock:
+            if _append_fh is not None:
+                _append_fh[2].close()
+                _append_fh = None
+        if fsync_policy is not None:
+            _writer = GroupCommitWriter(fsync_policy, _write_batch)
+
+
+def append_chained(build: ReceiptBuilder) -> Dict[str, Any]:
+    # Reserve the head, build the receipt against it and append it as one
+    # critical section across threads and processes; returns the receipt.
+    ensure_log_exists()
+    w = _writer
+    if w is not None:
+        return w.submit(build)
+    with ledger_lock():
+        head = get_ledger_head()
+        receipt, data = _encode_line(build(head))
+        if _backend is not None:
+            _backend.append(head, [(receipt, data)])
+            return receipt
+        with open(LOG_PATH, "ab") as f:
+            f.write(data)
+        _note_appended(head, [(receipt, data)], os.stat(LOG_PATH))
+        _maybe_rotate()
+    return receipt
+
+
+def append_chained_batch(builders: List[ReceiptBuilder]) -> List[Any]:
+    # append_chained for many receipts: one critical section and one write,
+    # chained in order. Returns one outcome per builder, either the receipt
+    # or the exception it raised (nothing is written for that slot).
+    ensure_log_exists()
+    w = _writer
+    if w is not None:
+        return w.submit(list(builders))
+    outcomes, _ = _write_batch([list(builders)])
+    return outcomes[0]
+
+
+def append_receipt(receipt: Dict[str, Any]) -> None:
+    append_chained(lambda _head: receipt)
+
+
+def _append_lines(head: LedgerHead, items: List[Tuple[Dict[str, Any], bytes]]) -> LedgerHead:
+    # Stores already-encoded lines after `head`; ledger lock held.
+    if _backend is not None:
+        _backend.append(head, items)
+        return _backend.head()
+    with open(LOG_PATH, "ab") as f:
+        f.write(b"".join(data for _, data in items))
+    _note_appended(head, items, os.stat(LOG_PATH))
+    return get_ledger_head()
+
+
+def import_jsonl(src: str, batch: int = 1024) -> int:
+    # Copies a JSONL ledger (e.g. an export) into the current storage line
+    # for line. The chain is taken as it is, so the ledger must be empty.
+    ensure_log_exists()
+    with ledger_lock():
+        head = get_ledger_head()
+        if head.count:
+            raise ValueError("Import needs an empty ledger")
+        count = 0
+        items: List[Tuple[Dict[str, Any], bytes]] = []
+        with open(src, "rb") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append((json.loads(line), line if line.endswith(b"\n") else line + b"\n"))
+                except ValueError:
+                    raise ValueError(f"Line {line_no}: unparseable JSON") from None
+                if len(items) >= batch:
+                    head = _append_lines(head, items)
+                    count += len(items)
+                    items = []
+        if items:
+            _append_lines(head, items)
+            count += len(items)
+        return count
+
+
+def export_jsonl(dst: str) -> int:
+    # The ledger's exact line bytes, sealed segments included, whatever the
+    # storage: a backend exports what the JSONL ledger would hold.
+    ensure_log_exists()
+    count = 0
+    with open(dst, "wb") as f:
+        for _, line in _iter_lines(0, _logical_end()):
+            f.write(line)
+            count += 1
+    return count
+
+
+def configure_rotation(max_bytes: Optional[int] = None, max_age_s: Optional[float] = None) -> None:
+    # Seal the active file once it reaches max_bytes, or once its first
+    # record is older than max_age_s. None disables that trigger.
+    global _rotate_max_bytes, _rotate_max_age_s
+    _rotate_max_bytes = max_bytes
+    _rotate_max_age_s = max_age_s
+
+
+def rotate_segment() -> Optional[SegmentManifest]:
+    # Seals the active file into SEGMENTS_DIR with a manifest and starts an
+    # empty one. Returns None if there was nothing to seal.
+    global _active_started
+    _require_jsonl("Segment rotation")
+    ensure_log_exists()
+    with ledger_lock():
+        base, base_count, prev_hash = _active_base(load_manifests(SEGMENTS_DIR, force=True))
+        m = seal_segment(LOG_PATH, SEGMENTS_DIR, base, base_count, prev_hash)
+        if m is not None:
+            ensure_log_exists()
+            invalidate_ledger_head()
+            _active_started = None
+        return m
+
+
+def archive_segments(codec: str = "zlib", block_bytes: int = DEFAULT_BLOCK_BYTES) -> List[SegmentManifest]:
+    # Compresses every sealed segment that is still plain JSONL. Logical
+    # offsets are unchanged, so the sidecars stay valid.
+    _require_jsonl("Archiving")
+    ensure_log_exists()
+    with ledger_lock():
+        done = []
+        for m in load_manifests(SEGMENTS_DIR, force=True):
+            if m.compression is None:
+                done.append(archive_segment(SEGMENTS_DIR, m.segment, codec=codec, block_bytes=block_bytes))
+        return done
+
+
+def _active_age_s(head: LedgerHead) -> float:
+    global _active_started
+    if _active_started is None or _active_started[0] != head.inode:
+        with open(LOG_PATH, "rb") as f:
+            first = f.readline()
+        try:
+            ts = json.loads(first).get("ts_utc") or ""
+            started = dt.datetime.fromisoformat(ts.rstrip("Z")).replace(tzinfo=dt.timezone.utc).timestamp()
+        except (ValueError, AttributeError):
+            started = os.stat(LOG_PATH).st_mtime
+        _active_started = (head.inode, started)
+    return dt.datetime.now(dt.timezone.utc).timestamp() - _active_started[1]
+
+
+def _maybe_rotate() -> None:
+    # Called with the ledger lock held, right after an append.
+    if _backend is not None:
+        return
+    if _rotate_max_bytes is None and _rotate_max_age_s is None:
+        return
+    head = get_ledger_head()
+    active = head.size - head.base
+    if active == 0:
+        return
+    if _rotate_max_bytes is not None and active >= _rotate_max_bytes:
+        rotate_segment()
+    elif _rotate_max_age_s is not None and _active_age_s(head) >= _rotate_max_age_s:
+        rotate_segment()
+
+
+def _read_line_at(offset: int) -> bytes:
+    if _backend is not None:
+        return _backend.line_at(offset)
+    p = _piece_at(offset)
+    if is_archive(p.path):
+        return read_archive_line(p.path, offset - p.base)
+    with open(p.path, "rb") as f:
+        f.seek(offset - p.base)
+        return f.readline()
+
+
+def _event_id_of(line: bytes) -> Optional[str]:
+    try:
+        return json.loads(line).get("event_id")
+    except ValueError:
+        return None
+
+
+def _anchor_event_index(idx: EventIndex) -> None:
+    # covered = end of the newest indexed record, if it is still in the log.
+    if idx.last is None:
+        return
+    line = _read_line_at(idx.last[1])
+    if _event_id_of(line) == idx.last[0]:
+        idx.covered = max(idx.covered, idx.last[1] + len(line))
+    else:
+        idx.clear()
+
+
+def _iter_event_records(start: int, end: int) -> Iterator[Tuple[int, int, Optional[str]]]:
+    # (offset, end, event_id) per record in [start, end). Archived segments
+    # answer from their block index without decompressing anything.
+    if _backend is not None:
+        for offset, line in _backend.scan(start, end):
+            yield offset, offset + len(line), _event_id_of(line)
+        return
+    for p in _pieces():
+        lo, hi = max(start, p.base), min(end, p.base + p.size)
+        if lo >= hi:
+            continue
+        if is_archive(p.path):
+            index = load_index(p.path)
+            first = bisect.bisect_left(index.offsets, lo - p.base)
+            for i in range(first, len(index.offsets)):
+                if index.offsets[i] >= hi - p.base:
+                    break
+                yield p.base + index.offsets[i], p.base + index.record_end(i), index.event_ids[i]
+            continue
+        for offset, line in _iter_file_lines(p.path, lo - p.base, hi - p.base, p.base):
+            if not line.endswith(b"\n"):
+                return  # writer still mid-line
+            yield offset, offset + len(line), _event_id_of(line)
+
+
+def _event_index() -> EventIndex:
+    global _index
+    ensure_log_exists()
+    with ledger_lock():
+        path = os.path.abspath(LOG_PATH)
+        end = _logical_end()
+        idx = _index
+        if idx is None or idx.log_path != path or end < idx.covered:
+            idx = EventIndex.load(INDEX_PATH, path)
+            _anchor_event_index(idx)
+        elif end > idx.covered and os.path.exists(INDEX_PATH) and os.path.getsize(INDEX_PATH) > idx.consumed:
+            # Another process appended and indexed; read its entries first.
+            idx.refresh()
+            _anchor_event_index(idx)
+        if end > idx.covered:
+            for offset, rec_end, event_id in _iter_event_records(idx.covered, end):
+                if event_id is None:
+                    idx.covered = rec_end
+                else:
+                    idx.add(event_id, offset, rec_end)
+            idx.flush()
+        _index = idx
+        return idx
+
+
+def rebuild_event_index() -> None:
+    global _index
+    ensure_log_exists()
+    with ledger_lock():
+        idx = EventIndex(INDEX_PATH, os.path.abspath(LOG_PATH))
+        idx.clear()
+        _index = idx
+        _event_index()
+
+
+def _event_offsets(event_id: str) -> List[int]:
+    # A backend answers from its own event_id index.
+    if _backend is not None:
+        return _backend.offsets_of(event_id)
+    return _event_index().get(event_id)
 
 
 def find_latest_by_event_id(event_id: str) -> Optional[Dict[str, Any]]:
-    receipts = read_all_receipts()
-    for r in reversed(receipts):
-        if r.get("event_id") == event_id:
+    for attempt in range(2):
+        offsets = _event_offsets(event_id)
+        if not offsets:
+            return None
+        try:
+            r = json.loads(_read_line_at(offsets[-1]))
+        except ValueError:
+            r = None
+        if isinstance(r, dict) and r.get("event_id") == event_id:
             return r
+        # The log was rewritten under the index.
+        rebuild_event_index()
     return None
 
 
-def verify_chain(receipts: List[Dict[str, Any]]) -> Tuple[bool, List[str]]:
+def _leaf_of_receipt(r: Any) -> Optional[bytes]:
+    canon = ((r.get("integrity") or {}) if isinstance(r, dict) else {}).get("canonical_hash")
+    return receipt_leaf_hash(canon) if isinstance(canon, str) else None
+
+
+def _leaf_of(line: bytes) -> Optional[bytes]:
+    try:
+        return _leaf_of_receipt(json.loads(line))
+    except ValueError:
+        return None
+
+
+def _anchor_merkle_tree(tree: MerkleTree, end: int) -> None:
+    # covered = end of the newest leaf's record, if that record is unchanged.
+    if not tree.offsets:
+        return
+    offset = tree.offsets[-1]
+    line = _read_line_at(offset) if offset < end else b""
+    if line and _leaf_of(line) == tree.levels[0][-1]:
+        tree.covered = max(tree.covered, offset + len(line))
+    else:
+        tree.clear()
+
+
+def _merkle_tree() -> MerkleTree:
+    global _merkle
+    ensure_log_exists()
+    with ledger_lock():
+        end = _logical_end()
+        tree = _merkle
+        if tree is None or end < tree.covered:
+            tree = MerkleTree.load(MERKLE_PATH)
+            _anchor_merkle_tree(tree, end)
+        elif end > tree.covered and not tree.in_sync():
+            # Another process appended leaves; take them before ours.
+            tree.refresh()
+            _anchor_merkle_tree(tree, end)
+        if end > tree.covered:
+            entries: List[Tuple[int, int, bytes]] = []
+            covered = tree.covered
+            for offset, line in _iter_lines(tree.covered, end):
+                if not line.endswith(b"\n"):
+                    break  # writer still mid-line
+                leaf = _leaf_of(line)
+                if leaf is not None:
+                    entries.append((offset, offset + len(line), leaf))
+                covered = offset + len(line)
+            tree.append(entries)
+            tree.covered = max(tree.covered, covered)
+        _merkle = tree
+        return tree
+
+
+def rebuild_merkle_tree() -> None:
+    global _merkle
+    ensure_log_exists()
+    with ledger_lock():
+        tree = MerkleTree(MERKLE_PATH)
+        tree.clear()
+        _merkle = tree
+        _merkle_tree()
+
+
+def merkle_root(tree_size: Optional[int] = None) -> Dict[str, Any]:
+    with ledger_lock():
+        tree = _merkle_tree()
+        size = tree.size if tree_size is None else tree_size
+        return {"tree_size": size, "root_hash": encode_hash(tree.root(size))}
+
+
+def inclusion_proof(event_id: str, tree_size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    # Audit path for the newest receipt of `event_id` within the first
+    # `tree_size` leaves (the whole tree by default). None if there is none.
+    with ledger_lock():
+        offsets = _event_offsets(event_id)
+        tree = _merkle_tree()
+        size = tree.size if tree_size is None else tree_size
+        for offset in reversed(offsets):
+            i = bisect.bisect_left(tree.offsets, offset)
+            if i < size and i < len(tree.offsets) and tree.offsets[i] == offset:
+                break
+        else:
+            return None
+        return {
+            "event_id": event_id,
+            "leaf_index": i,
+            "tree_size": size,
+            "canonical_hash": (json.loads(_read_line_at(tree.offsets[i])).get("integrity") or {}).get("canonical_hash"),
+            "leaf_hash": encode_hash(tree.levels[0][i]),
+            "audit_path": [encode_hash(h) for h in tree.inclusion_proof(i, size)],
+            "root_hash": encode_hash(tree.root(size)),
+        }
+
+
+def consistency_proof(first: int, second: Optional[int] = None) -> Dict[str, Any]:
+    # Proof that the tree of size `first` is a prefix of the tree of size
+    # `second` (the current tree by default).
+    with ledger_lock():
+        tree = _merkle_tree()
+        size = tree.size if second is None else second
+        return {
+            "first": first,
+            "second": size,
+            "first_root": encode_hash(tree.root(first)),
+            "second_root": encode_hash(tree.root(size)),
+            "proof": [encode_hash(h) for h in tree.consistency_proof(first, size)],
+        }
+
+
+def _row_of(line: bytes, offset: int) -> Optional[Row]:
+    try:
+        r = json.loads(line)
+    except ValueError:
+        return None
+    return row_of_receipt(r, offset, len(line)) if isinstance(r, dict) else None
+
+
+def _anchor_column_store(store: ColumnStore, end: int) -> None:
+    # covered = end of the newest row's record, if that record still has the
+    # same length and decision fields.
+    if store.last is None:
+        return
+    offset, length = store.last
+    line = _read_line_at(offset) if offset < end else b""
+    row = _row_of(line, offset) if len(line) == length else None
+    stored = (
+        store.dicts["action"][store.column("action")[-1]],
+        store.dicts["decision"][store.column("decision")[-1]],
+        store.column("ts")[-1],
+    )
+    if row is not None and (row[3], row[4], row[2]) == stored:
+        store.covered = max(store.covered, offset + length)
+    else:
+        store.clear()
+
+
+def column_store() -> ColumnStore:
+    # The columnar sidecar, caught up with the ledger. Columns are read
+    # through ColumnStore.column() without touching the JSON.
+    global _columns
+    ensure_log_exists()
+    with ledger_lock():
+        end = _logical_end()
+        store = _columns
+        if store is None or end < store.covered:
+            store = ColumnStore.load(COLUMNS_DIR)
+            _anchor_column_store(store, end)
+        elif end > store.covered and not store.in_sync():
+            # Another process appended rows; take them before ours.
+            store.refresh()
+            _anchor_column_store(store, end)
+        if end > store.covered:
+            for offset, line in _iter_lines(store.covered, end):
+                if not line.endswith(b"\n"):
+                    break  # writer still mid-line
+                row = _row_of(line, offset)
+                if row is not None:
+                    store.add(row)
+                store.covered = offset + len(line)
+            store.flush()
+        _columns = store
+        return store
+
+
+def rebuild_column_store() -> None:
+    global _columns
+    ensure_log_exists()
+    with ledger_lock():
+        store = ColumnStore(COLUMNS_DIR)
+        store.clear()
+        _columns = store
+        column_store()
+
+
+def count_receipts(
+    by: Tuple[str, ...] = ("action", "decision"),
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    **equals: Any,
+) -> Dict[Tuple[Any, ...], int]:
+    # Aggregate counts from the columnar sidecar; see ColumnStore.count. A
+    # time window only reads the rows of the time index's matching blocks.
+    with ledger_lock():
+        store = column_store()
+        return store.count(by, since, until, _time_ranges(since, until), **equals)
+
+
+def _ts_of(line: bytes) -> int:
+    try:
+        r = json.loads(line)
+    except ValueError:
+        return TS_MISSING
+    return _epoch(r.get("ts_utc")) if isinstance(r, dict) else TS_MISSING
+
+
+def _anchor_time_index(idx: TimeIndex, end: int) -> None:
+    # Keeps the closed blocks if the newest one still ends on its last
+    # record; the open block is always re-read from the log.
+    block = idx.last
+    if block is None:
+        return
+    _, block_end, last_offset, _, _ = block
+    line = _read_line_at(last_offset) if block_end <= end else b""
+    if not line or last_offset + len(line) != block_end:
+        idx.clear()
+
+
+def time_index() -> TimeIndex:
+    # The sparse time index, caught up with the ledger.
+    global _times
+    ensure_log_exists()
+    with ledger_lock():
+        end = _logical_end()
+        idx = _times
+        if idx is None or end < idx.scanned:
+            idx = TimeIndex.load(TIME_INDEX_PATH, TIME_INDEX_BLOCK_BYTES)
+            _anchor_time_index(idx, end)
+        elif end > idx.scanned and not idx.in_sync():
+            # Another process closed blocks; take them before ours.
+            idx.refresh()
+            _anchor_time_index(idx, end)
+        if end > idx.scanned:
+            for offset, line in _iter_lines(idx.scanned, end):
+                if not line.endswith(b"\n"):
+                    break  # writer still mid-line
+                idx.add(offset, len(line), _ts_of(line))
+            idx.flush()
+        _times = idx
+        return idx
+
+
+def rebuild_time_index() -> None:
+    global _times
+    ensure_log_exists()
+    with ledger_lock():
+        idx = TimeIndex(TIME_INDEX_PATH, TIME_INDEX_BLOCK_BYTES)
+        idx.clear()
+        _times = idx
+        time_index()
+
+
+def _time_ranges(since: Optional[int], until: Optional[int]) -> Optional[List[Tuple[int, int]]]:
+    # Logical offset ranges that can hold records with since <= ts < until:
+    # the time index's matching closed blocks plus the open block. None
+    # without a window (everything). Call under ledger_lock().
+    if since is None and until is None:
+        return None
+    idx = time_index()
+    ranges = idx.ranges(since, until)
+    if idx.covered < idx.scanned:
+        ranges.append((idx.covered, idx.scanned))
+    return ranges
+
+
+def seek_time(since: int) -> int:
+    # A logical offset before which every receipt has ts_utc < since (epoch
+    # seconds): a cursor to read forward from instead of the start.
+    with ledger_lock():
+        idx = time_index()
+        return idx.seek(since)
+
+
+def iter_receipts_between(
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    with_offsets: bool = False,
+) -> Iterator[Any]:
+    # Receipts with since <= ts_utc < until (epoch seconds), in ledger
+    # order. The time index narrows the read to the blocks that can hold
+    # them (binary search on the running maximum for the start), plus the
+    # open block; only those ranges are read and parsed.
+    with ledger_lock():
+        idx = time_index()
+        ranges = idx.ranges(since, until)
+        tail, end = idx.covered, idx.scanned
+    if tail < end:
+        ranges.append((tail, end))
+    lo = TS_MISSING + 1 if since is None else since
+    hi = (1 << 63) - 1 if until is None else until
+    for start, stop in ranges:
+        for offset, line in _iter_lines(start, stop):
+            r = json.loads(line)
+            ts = _epoch(r.get("ts_utc"))
+            if ts != TS_MISSING and lo <= ts < hi:
+                yield (offset, r) if with_offsets else r
+
+
+def _check_link(
+    line_no: int,
+    prev: str,
+    integ: Dict[str, Any],
+    recomputed_canon: str,
+    errors: List[str],
+) -> str:
+    stored_prev = integ.get("prev_hash")
+    stored_this = integ.get("this_hash")
+    stored_canon = integ.get("canonical_hash")
+
+    if stored_prev != prev:
+        errors.append(f"Line {line_no}: prev_hash mismatch (expected {prev}, got {stored_prev})")
+
+    if stored_canon != recomputed_canon:
+        errors.append(f"Line {line_no}: canonical_hash mismatch (expected {recomputed_canon}, got {stored_canon})")
+
+    recomputed_this = compute_this_hash(prev, recomputed_canon)
+    if stored_this != recomputed_this:
+        errors.append(f"Line {line_no}: this_hash mismatch (expected {recomputed_this}, got {stored_this})")
+
+    return stored_this or recomputed_this
+
+
+def _verify_record(r: Dict[str, Any], line_no: int, prev: str, errors: List[str]) -> str:
+    return _check_link(line_no, prev, r.get("integrity") or {}, compute_canonical_hash(r), errors)
+
+
+def verify_chain(receipts: Iterable[Dict[str, Any]], max_errors: Optional[int] = None) -> Tuple[bool, List[str]]:
     errors: List[str] = []
-    prev = "sha256:" + "0" * 64
+    prev = GENESIS_HASH
 
     for idx, r in enumerate(receipts):
-        integ = r.get("integrity") or {}
-        stored_prev = integ.get("prev_hash")
-        stored_this = integ.get("this_hash")
-        stored_canon = integ.get("canonical_hash")
+        prev = _verify_record(r, idx + 1, prev, errors)
+        if max_errors is not None and len(errors) >= max_errors:
+            del errors[max_errors:]
+            break
+
+    return (len(errors) == 0), errors
 
-        if stored_prev != prev:
-            errors.append(f"Line {idx+1}: prev_hash mismatch (expected {prev}, got {stored_prev})")
 
-        recomputed_canon = compute_canonical_hash(r)
-        if stored_canon != recomputed_canon:
-            errors.append(f"Line {idx+1}: canonical_hash mismatch (expected {recomputed_canon}, got {stored_canon})")
+def _checkpoint_still_valid(cp: VerifyCheckpoint, end: int) -> bool:
+    if cp.offset > end:
+        return False
+    if cp.count == 0:
+        return cp.offset == 0
+    # Re-hash the last verified record so a rewrite of it is still caught.
+    line = _read_line_at(cp.anchor_offset)
+    if cp.anchor_offset + len(line) != cp.offset:
+        return False
+    try:
+        r = json.loads(line)
+    except ValueError:
+        return False
+    integ = r.get("integrity") or {}
+    canon = compute_canonical_hash(r)
+    return (
+        integ.get("canonical_hash") == canon
+        and integ.get("this_hash") == cp.this_hash
+        and compute_this_hash(integ.get("prev_hash") or "", canon) == cp.this_hash
+    )
 
-        recomputed_this = compute_this_hash(prev, recomputed_canon)
-        if stored_this != recomputed_this:
-            errors.append(f"Line {idx+1}: this_hash mismatch (expected {recomputed_this}, got {stored_this})")
 
-        prev = stored_this or recomputed_this
+def _verify_sealed(m: SegmentManifest, prev: str, errors: List[str]) -> None:
+    # A sealed segment is trusted by its manifest: it must link to the chain
+    # so far and its bytes must still hash to the sealed SHA-256. An archive
+    # is checked against the hash of its compressed file, without
+    # decompressing anything.
+    if m.prev_hash != prev:
+        errors.append(f"Segment {m.segment}: prev_hash mismatch (expected {prev}, got {m.prev_hash})")
+    if not os.path.exists(m.path):
+        errors.append(f"Segment {m.segment}: file missing ({m.path})")
+        return
+    expected = m.archive_sha256 if m.compression is not None else m.sha256
+    actual = file_sha256(m.path)
+    if actual != expected:
+        errors.append(f"Segment {m.segment}: sha256 mismatch (expected {expected}, got {actual})")
 
+
+def verify_ledger(
+    full: bool = False,
+    max_errors: Optional[int] = None,
+    trust_sealed: Optional[bool] = None,
+) -> Tuple[bool, List[str]]:
+    # Verifies the on-disk ledger, resuming from the last clean checkpoint
+    # unless `full` is set. Sealed segments are checked against their
+    # manifests if `trust_sealed` (the default unless `full`); otherwise
+    # every record is re-hashed and the manifests' hashes must match them.
+    # Stops early once `max_errors` are collected.
+    if trust_sealed is None:
+        trust_sealed = not full
+    ensure_log_exists()
+    with _log_lock:
+        if _backend is not None:
+            pieces = [_Piece(_backend.path, 0, _backend.end(), None)]
+        else:
+            pieces = _pieces()
+    ledger_end = pieces[-1].base + pieces[-1].size
+
+    cp = None if full else load_checkpoint(VERIFY_CHECKPOINT_PATH)
+    if cp is None or not _checkpoint_still_valid(cp, ledger_end):
+        cp = VerifyCheckpoint(0, 0, 0, GENESIS_HASH)
+
+    errors: List[str] = []
+    prev = cp.this_hash
+    count = cp.count
+    anchor = cp.anchor_offset
+    end = cp.offset
+    for p in pieces:
+        p_end = p.base + p.size
+        if p_end <= cp.offset:
+            continue
+        if p.manifest is not None and trust_sealed and p.base >= cp.offset:
+            m = p.manifest
+            _verify_sealed(m, prev, errors)
+            count += m.count
+            prev = m.last_hash or prev
+            anchor = m.last_offset
+            end = p_end
+        else:
+            for offset, line in _iter_lines(max(cp.offset, p.base), p_end):
+                count += 1
+                try:
+                    r = json.loads(line)
+                except ValueError:
+                    errors.append(f"Line {count}: unparseable JSON")
+                    if max_errors is not None and len(errors) >= max_errors:
+                        break
+                    continue
+                prev = _verify_record(r, count, prev, errors)
+                anchor = offset
+                end = offset + len(line)
+                if max_errors is not None and len(errors) >= max_errors:
+                    break
+            else:
+                if p.manifest is not None and end == p_end and prev != p.manifest.last_hash:
+                    errors.append(f"Segment {p.manifest.segment}: manifest last_hash does not match its records")
+        if max_errors is not None and len(errors) >= max_errors:
+            del errors[max_errors:]
+            break
+
+    if not errors and end > cp.offset:
+        save_checkpoint(VERIFY_CHECKPOINT_PATH, VerifyCheckpoint(end, anchor, count, prev))
     return (len(errors) == 0), errors
 
 
 def tamper_last_log_line(field_path: str = "decision.reason") -> Tuple[bool, str]:
     ensure_log_exists()
-    with _log_lock:
-        with open(LOG_PATH, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+    with ledger_lock():
+        if _backend is not None:
+            lines = [line.decode("utf-8") for _, line in itertools.islice(_backend.scan(reverse=True), 1)]
+        else:
+            with open(LOG_PATH, "r", encoding="utf-8") as f:
+                lines = f.readlines()
         if not lines:
-            return False, "Log is empty; nothing to tamper."
+            return False, "Active log is empty; nothing to tamper."
 
         last = json.loads(lines[-1])
 
@@ -99,14 +1276,32 @@ def tamper_last_log_line(field_path: str = "decision.reason") -> Tuple[bool, str
             last["tampered"] = True
 
         lines[-1] = canonical_json(last) + "\n"
-        with open(LOG_PATH, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+        if _backend is not None:
+            _backend.replace_last(lines[-1].encode("utf-8"))
+        else:
+            with open(LOG_PATH, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+        invalidate_ledger_head()
+        _invalidate_event_index()
+        _invalidate_merkle_tree()
+        _invalidate_column_store()
+        _invalidate_time_index()
 
     return True, "Last log entry corrupted. Verification should now fail."
 
 
 def reset_log() -> None:
     ensure_log_exists()
-    with _log_lock:
-        with open(LOG_PATH, "w", encoding="utf-8") as f:
-            f.write("")
+    with ledger_lock():
+        if _backend is not None:
+            _backend.reset()
+        else:
+            with open(LOG_PATH, "w", encoding="utf-8") as f:
+                f.write("")
+            remove_segments(SEGMENTS_DIR)
+        invalidate_ledger_head()
+        rebuild_event_index()
+        rebuild_merkle_tree()
+        rebuild_column_store()
+        rebuild_time_index()
+        clear_checkpoint(VERIFY_CHECKPOINT_PATH)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+# RFC 6962 Merkle tree hashing: leaves and interior nodes are domain
+# separated so a leaf can never be passed off as a node.
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+_ENTRY = struct.Struct(">Q32s")  # logical offset, leaf hash
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def receipt_leaf_hash(canonical_hash: str) -> bytes:
+    # Leaves commit to the receipt's canonical_hash string as stored.
+    return leaf_hash(canonical_hash.encode("utf-8"))
+
+
+def encode_hash(h: bytes) -> str:
+    return "sha256:" + h.hex()
+
+
+def decode_hash(s: str) -> bytes:
+    if not s.startswith("sha256:"):
+        raise ValueError(f"Not a sha256 hash: {s!r}")
+    return bytes.fromhex(s[len("sha256:"):])
+
+
+def _split(n: int) -> int:
+    # Largest power of two strictly less than n (n >= 2).
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class MerkleTree:
+    # Incremental tree over the ledger, one leaf per receipt in ledger order.
+    # The sidecar holds fixed-size (offset, leaf hash) entries; interior
+    # nodes of every complete subtree are kept in memory, so roots and
+    # proofs for any tree size only hash O(log n) incomplete subtrees.
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.levels: List[List[bytes]] = [[]]
+        self.offsets: List[int] = []
+        self.covered = 0
+        self.consumed = 0
+
+    @classmethod
+    def load(cls, path: str) -> "MerkleTree":
+        tree = cls(path)
+        tree.refresh()
+        return tree
+
+    @property
+    def size(self) -> int:
+        return len(self.levels[0])
+
+    def refresh(self) -> None:
+        # Reads entries appended (possibly by another process) since the
+        # last load.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.consumed)
+            data = f.read()
+        whole = len(data) - len(data) % _ENTRY.size
+        if whole != len(data):
+            # Torn trailing write; drop it and let the log catch-up refill.
+            os.truncate(self.path, self.consumed + whole)
+        for offset, leaf in _ENTRY.iter_unpack(data[:whole]):
+            self._push(offset, leaf)
+        self.consumed += whole
+
+    def in_sync(self) -> bool:
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return size == self.consumed
+
+    def _push(self, offset: int, leaf: bytes) -> None:
+        self.offsets.append(offset)
+        self.levels[0].append(leaf)
+        level = 0
+        while len(self.levels[level]) % 2 == 0:
+            left, right = self.levels[level][-2:]
+            if len(self.levels) == level + 1:
+                self.levels.append([])
+            self.levels[level + 1].append(node_hash(left, right))
+            level += 1
+
+    def append(self, entries: List[Tuple[int, int, bytes]]) -> None:
+        # entries are (offset, end, leaf_hash) for records past `covered`.
+        if not entries:
+            return
+        raw = b"".join(_ENTRY.pack(offset, leaf) for offset, _, leaf in entries)
+        with open(self.path, "ab") as f:
+            f.write(raw)
+        self.consumed += len(raw)
+        for offset, end, leaf in entries:
+            self._push(offset, leaf)
+            self.covered = max(self.covered, end)
+
+    def clear(self) -> None:
+        self.levels = [[]]
+        self.offsets = []
+        self.covered = 0
+        self.consumed = 0
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb"):
+            pass
+        os.replace(tmp, self.path)
+
+    def _check_size(self, size: Optional[int]) -> int:
+        if size is None:
+            return self.size
+        if size < 0 or size > self.size:
+            raise ValueError(f"Tree size {size} out of range (0..{self.size})")
+        return size
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        # MTH(D[start:end]); complete aligned subtrees are looked up.
+        n = end - start
+        if n == 0:
+            return EMPTY_ROOT
+        if n & (n - 1) == 0:
+            level = n.bit_length() - 1
+            return self.levels[level][start >> level]
+        k = _split(n)
+        return node_hash(self._subtree(start, start + k), self._subtree(start + k, end))
+
+    def root(self, size: Optional[int] = None) -> bytes:
+        return self._subtree(0, self._check_size(size))
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> List[bytes]:
+        size = self._check_size(size)
+        if not 0 <= index < size:
+            raise ValueError(f"Leaf {index} is not in a tree of size {size}")
+        proof: List[bytes] = []
+        start, end = 0, size
+        while end - start > 1:
+            k = _split(end - start)
+            if index < start + k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                start += k
+        return proof[::-1]
+
+    def consistency_proof(self, first: int, second: Optional[int] = None) -> List[bytes]:
+        second = self._check_size(second)
+        if not 0 <= first <= second:
+            raise ValueError(f"Tree size {first} is not within 0..{second}")
+        if first == 0 or first == second:
+            return []
+        proof: List[bytes] = []
+        start, end, m, complete = 0, second, first, True
+        while m != end - start:
+            k = _split(end - start)
+            if m <= k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                start += k
+                m -= k
+                complete = False
+        if not complete:
+            proof.append(self._subtree(start, end))
+        return proof[::-1]
+
+
+def verify_inclusion(leaf: bytes, index: int, size: int, proof: Sequence[bytes], root: bytes) -> bool:
+    # RFC 9162 section 2.1.3.2.
+    if not 0 <= index < size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(
+    first: int,
+    second: int,
+    first_root: bytes,
+    second_root: bytes,
+    proof: Sequence[bytes],
+) -> bool:
+    # RFC 9162 section 2.1.4.2.
+    if not 0 <= first <= second:
+        return False
+    if first == second:
+        return not proof and first_root == second_root
+    if first == 0:
+        return not proof
+    if not proof:
+        return False
+    path = list(proof)
+    if first & (first - 1) == 0:
+        path.insert(0, first_root)
+    fn, sn = first - 1, second - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = path[0]
+    for c in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return fr == first_root and sr == second_root and sn == 0
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .archive import archive_block_bounds, is_archive, iter_file_lines
+from .hashing import compute_canonical_hash
+from .ledger import (
+    GENESIS_HASH,
+    _check_link,
+    _log_lock,
+    _pieces,
+    _require_jsonl,
+    ensure_log_exists,
+    storage_backend,
+    verify_ledger,
+)
+
+MIN_CHUNK_BYTES = 1 << 20
+
+
+@dataclass
+class _ChunkResult:
+    count: int = 0
+    # Leading records whose linkage depends on the previous chunk, as
+    # (local_line, integrity, recomputed_canon); integrity is None when the
+    # line did not parse.
+    head: List[Tuple[int, Optional[Dict[str, Any]], str]] = field(default_factory=list)
+    # (local_line, message without its "Line N: " prefix) for the remaining
+    # records, already linked locally.
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    # prev_hash carried out of the chunk; None if it still depends on the head.
+    tail_prev: Optional[str] = None
+
+
+def _chunk_bounds(path: str, size: int, chunks: int) -> List[Tuple[int, int]]:
+    if is_archive(path):
+        return archive_block_bounds(path, chunks)
+    starts = [0]
+    with open(path, "rb") as f:
+        for k in range(1, chunks):
+            f.seek(size * k // chunks)
+            f.readline()
+            pos = f.tell()
+            if starts[-1] < pos < size:
+                starts.append(pos)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def ledger_chunks(workers: int, chunk_bytes: int = MIN_CHUNK_BYTES) -> List[Tuple[str, int, int, int]]:
+    # Splits every segment plus the active file into line-aligned byte
+    # ranges, in ledger order, sized for `workers` processes. Each job is
+    # (path, logical base of the file, start, end).
+    _require_jsonl("Parallel workers")
+    ensure_log_exists()
+    with _log_lock:
+        pieces = [(os.path.abspath(p.path), p.base, p.size) for p in _pieces() if p.size]
+    total = sum(size for _, _, size in pieces)
+    chunks = max(1, min(workers * 4, total // max(1, chunk_bytes)))
+    jobs: List[Tuple[str, int, int, int]] = []
+    for path, base, size in pieces:
+        n = max(1, chunks * size // max(1, total))
+        jobs.extend((path, base, s, e) for s, e in _chunk_bounds(path, size, n))
+    return jobs
+
+
+def _verify_chunk(path: str, start: int, end: int, max_errors: Optional[int] = None) -> _ChunkResult:
+    # Stops after `max_errors` local errors: the stitched result is cut at
+    # that chunk anyway, so later lines and chunks are never reported.
+    out = _ChunkResult()
+    prev: Optional[str] = None
+    local_errors: List[str] = []
+    for _, line in iter_file_lines(path, start, end):
+        if not line.strip():
+            continue
+        out.count += 1
+        try:
+            r = json.loads(line)
+        except ValueError:
+            if prev is None:
+                out.head.append((out.count, None, ""))
+            else:
+                out.errors.append((out.count, "unparseable JSON"))
+                if max_errors is not None and len(out.errors) >= max_errors:
+                    break
+            continue
+        integ = r.get("integrity") or {}
+        canon = compute_canonical_hash(r)
+        if prev is None:
+            out.head.append((out.count, integ, canon))
+            prev = integ.get("this_hash") or None
+            continue
+        local_errors.clear()
+        prev = _check_link(0, prev, integ, canon, local_errors)
+        out.errors.extend((out.count, e.split(": ", 1)[1]) for e in local_errors)
+        if max_errors is not None and len(out.errors) >= max_errors:
+            break
+    out.tail_prev = prev
+    return out
+
+
+def verify_ledger_parallel(
+    workers: Optional[int] = None,
+    chunk_bytes: int = MIN_CHUNK_BYTES,
+    max_errors: Optional[int] = None,
+) -> Tuple[bool, List[str]]:
+    # Same result as verify_ledger(full=True, trust_sealed=False): canonical
+    # hashes are recomputed per byte range (of every segment) in a process
+    # pool, then linkage is stitched in order. Other storage backends have
+    # no files to split, so they are verified in this process.
+    if storage_backend() is not None:
+        return verify_ledger(full=True, max_errors=max_errors)
+    workers = workers or os.cpu_count() or 1
+    jobs = [(path, start, end, max_errors) for path, _base, start, end in ledger_chunks(workers, chunk_bytes)]
+
+    if len(jobs) <= 1 or workers == 1:
+        results = [_verify_chunk(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_verify_chunk, *zip(*jobs)))
+
+    errors: List[str] = []
+    prev = GENESIS_HASH
+    base = 0
+    for res in results:
+        for local_line, integ, canon in res.head:
+            if integ is None:
+                errors.append(f"Line {base + local_line}: unparseable JSON")
+                continue
+            prev = _check_link(base + local_line, prev, integ, canon, errors)
+        errors.extend(f"Line {base + local_line}: {msg}" for local_line, msg in res.errors)
+        if res.tail_prev is not None:
+            prev = res.tail_prev
+        base += res.count
+        if max_errors is not None and len(errors) >= max_errors:
+            del errors[max_errors:]
+            break
+    return (len(errors) == 0), errors
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import functools
 import re
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
 
 from .config import ALL_ACTIONS, PolicyRuleSet
+from .hashing import compute_rules_hash
+
+_CONFIDENCE_RE = re.compile(r"confidence\s*[:=]\s*([0-9]*\.?[0-9]+)\s*%?")
 
 
 def extract_confidence(model_output_raw: str) -> Optional[float]:
     s = (model_output_raw or "").lower()
-    m = re.search(r"confidence\s*[:=]\s*([0-9]*\.?[0-9]+)\s*%?", s)
+    m = _CONFIDENCE_RE.search(s)
     if not m:
         return None
     val = float(m.group(1))
@@ -18,71 +23,109 @@ def extract_confidence(model_output_raw: str) -> Optional[float]:
     return max(0.0, min(1.0, val))
 
 
-def run_policy_checks(
-    proposed_action_type: str,
-    confidence: Optional[float],
-    approval_present: bool,
-    policy: PolicyRuleSet,
-) -> Tuple[List[Dict[str, Any]], str, str, bool]:
-    checks: List[Dict[str, Any]] = []
-    action_type = (proposed_action_type or "").strip().upper()
-
-    approval_required = action_type in set(policy.high_stakes_actions)
-
-    allowed = action_type in ALL_ACTIONS
-    checks.append(
-        {
-            "check_id": "ALLOWED_ACTIONS",
-            "result": "PASS" if allowed else "FAIL",
-            "details": {"action_type": action_type, "allowed": allowed},
-        }
-    )
-    if not allowed:
-        return checks, "BLOCKED", "Action not in allowed list", approval_required
+@dataclass(frozen=True)
+class CompiledPolicy:
+    # A PolicyRuleSet with everything that does not depend on the receipt
+    # worked out once: rules_hash, action frozensets and the threshold.
+    rules: PolicyRuleSet
+    rules_hash: str
+    high_stakes: FrozenSet[str]
+    allowed_actions: FrozenSet[str]
+    threshold: float
 
-    if confidence is None:
-        checks.append(
-            {
-                "check_id": "CONFIDENCE_PRESENT",
-                "result": "FAIL",
-                "details": {"confidence": None, "note": "No confidence provided/parsed"},
-            }
-        )
-    else:
-        checks.append(
-            {
-                "check_id": "CONFIDENCE_THRESHOLD",
-                "result": "PASS" if confidence >= policy.confidence_threshold else "FAIL",
-                "details": {"confidence": confidence, "threshold": policy.confidence_threshold},
-            }
-        )
+    def check(
+        self,
+        proposed_action_type: str,
+        confidence: Optional[float],
+        approval_present: bool,
+    ) -> Tuple[List[Dict[str, Any]], str, str, bool]:
+        checks: List[Dict[str, Any]] = []
+        action_type = (proposed_action_type or "").strip().upper()
+        threshold = self.threshold
 
-    if approval_required:
-        checks.append(
-            {
-                "check_id": "HUMAN_AUTH_REQUIRED",
-                "result": "PASS" if approval_present else "FAIL",
-                "details": {"required": True, "present": approval_present},
-            }
-        )
-    else:
+        approval_required = action_type in self.high_stakes
+
+        allowed = action_type in self.allowed_actions
         checks.append(
             {
-                "check_id": "HUMAN_AUTH_NOT_REQUIRED",
-                "result": "PASS",
-                "details": {"required": False, "present": approval_present},
+                "check_id": "ALLOWED_ACTIONS",
+                "result": "PASS" if allowed else "FAIL",
+                "details": {"action_type": action_type, "allowed": allowed},
             }
         )
+        if not allowed:
+            return checks, "BLOCKED", "Action not in allowed list", approval_required
+
+        if confidence is None:
+            checks.append(
+                {
+                    "check_id": "CONFIDENCE_PRESENT",
+                    "result": "FAIL",
+                    "details": {"confidence": None, "note": "No confidence provided/parsed"},
+                }
+            )
+        else:
+            checks.append(
+                {
+                    "check_id": "CONFIDENCE_THRESHOLD",
+                    "result": "PASS" if confidence >= threshold else "FAIL",
+                    "details": {"confidence": confidence, "threshold": threshold},
+                }
+            )
+
+        if approval_required:
+            checks.append(
+                {
+                    "check_id": "HUMAN_AUTH_REQUIRED",
+                    "result": "PASS" if approval_present else "FAIL",
+                    "details": {"required": True, "present": approval_present},
+                }
+            )
+        else:
+            checks.append(
+                {
+                    "check_id": "HUMAN_AUTH_NOT_REQUIRED",
+                    "result": "PASS",
+                    "details": {"required": False, "present": approval_present},
+                }
+            )
+
+        if approval_required:
+            if not approval_present:
+                return checks, "BLOCKED", "High-stakes action requires human authorization", approval_required
+            if confidence is None or confidence < threshold:
+                return checks, "BLOCKED", "Confidence < threshold for high-stakes action", approval_required
+            return checks, "PERMITTED", "Approved + confidence >= threshold", approval_required
+
+        if confidence is None:
+            return checks, "BLOCKED", "No confidence available", approval_required
+        if confidence < threshold:
+            return checks, "BLOCKED", "Confidence < threshold", approval_required
+        return checks, "PERMITTED", "Confidence >= threshold", approval_required
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(policy: PolicyRuleSet) -> CompiledPolicy:
+    return CompiledPolicy(
+        rules=policy,
+        rules_hash=compute_rules_hash(policy.as_text()),
+        high_stakes=frozenset(policy.high_stakes_actions),
+        allowed_actions=frozenset(ALL_ACTIONS),
+        threshold=policy.confidence_threshold,
+    )
 
-    if approval_required:
-        if not approval_present:
-            return checks, "BLOCKED", "High-stakes action requires human authorization", approval_required
-        if confidence is None or confidence < policy.confidence_threshold:
-            return checks, "BLOCKED", "Confidence < threshold for high-stakes action", approval_required
-        return checks, "PERMITTED", "Approved + confidence >= threshold", approval_required
-
-    if confidence is None:
-        return checks, "BLOCKED", "No confidence available", approval_required
-    if confidence < policy.confidence_threshold:
-        return checks, "BLOCKED", "Confidence < threshold", approval_required
-    return checks, "PERMITTED", "Confidence >= threshold", approval_required
+
+def compile_policy(policy: Union[PolicyRuleSet, CompiledPolicy]) -> CompiledPolicy:
+    # Compiled once per distinct rule set and shared by receipt building and replay.
+    if isinstance(policy, CompiledPolicy):
+        return policy
+    return _compile(policy)
+
+
+def run_policy_checks(
+    proposed_action_type: str,
+    confidence: Optional[float],
+    approval_present: bool,
+    policy: Union[PolicyRuleSet, CompiledPolicy],
+) -> Tuple[List[Dict[str, Any]], str, str, bool]:
+    return compile_policy(policy).check(proposed_action_type, confidence, approval_present)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .columns import TS_MISSING, _epoch
+
+_TRUE = ("1", "true", "yes")
+_FALSE = ("0", "false", "no")
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    # Filters for event listings; None matches anything. since/until are
+    # normalized ts_utc strings (until exclusive), so they compare as text
+    # against stored ts_utc values and convert to epoch seconds for the
+    # column sidecar.
+    decision: Optional[str] = None
+    action_type: Optional[str] = None
+    approver_id: Optional[str] = None
+    approval_required: Optional[bool] = None
+    approved: Optional[bool] = None
+    policy_version: Optional[str] = None
+    since: Optional[str] = None
+    until: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return all(v is None for v in asdict(self).values())
+
+    def column_equals(self) -> Dict[str, Any]:
+        # Keyword filters for ColumnStore.select.
+        pairs = (
+            ("decision", self.decision),
+            ("action", self.action_type),
+            ("approver", self.approver_id),
+            ("policy", self.policy_version),
+            ("approved", self.approved),
+            ("required", self.approval_required),
+        )
+        return {name: int(v) if isinstance(v, bool) else v for name, v in pairs if v is not None}
+
+    def epoch_range(self) -> Tuple[Optional[int], Optional[int]]:
+        return (
+            None if self.since is None else _epoch(self.since),
+            None if self.until is None else _epoch(self.until),
+        )
+
+    def as_params(self) -> Dict[str, str]:
+        # Inverse of from_params, for next-page links.
+        out: Dict[str, str] = {}
+        for name, value in zip(_PARAMS, asdict(self).values()):
+            if value is not None:
+                out[name] = ("1" if value else "0") if isinstance(value, bool) else value
+        return out
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, str]) -> "EventFilter":
+        # Query-string form: decision, action, approver, required, approved,
+        # policy, since, until. Blank values are ignored.
+        raw = {name: (params.get(name) or "").strip() for name in _PARAMS}
+        values: Dict[str, Any] = {}
+        for name, field in zip(_PARAMS, _FIELDS):
+            value = raw[name]
+            if not value:
+                continue
+            if name in ("decision", "action"):
+                value = value.upper()
+            elif name in ("required", "approved"):
+                if value.lower() not in _TRUE + _FALSE:
+                    raise ValueError(f"{name} must be 1 or 0")
+                value = value.lower() in _TRUE
+            elif name in ("since", "until"):
+                value = normalize_ts(value)
+            values[field] = value
+        return cls(**values)
+
+
+_PARAMS = ("decision", "action", "approver", "required", "approved", "policy", "since", "until")
+_FIELDS = tuple(EventFilter.__dataclass_fields__)
+
+
+def event_summary(offset: int, r: Dict[str, Any]) -> Dict[str, Any]:
+    # One row of an event listing, as /api/events (app.py and asgi.py) sends it.
+    approval = r.get("approval") or {}
+    return {
+        "offset": offset,
+        "event_id": r.get("event_id"),
+        "ts_utc": r.get("ts_utc"),
+        "decision": (r.get("decision") or {}).get("result", "?"),
+        "action": (r.get("proposed_action") or {}).get("type", ""),
+        "approval_required": bool(approval.get("required", False)),
+        "approved": bool(approval.get("approved", False)),
+        "approver_id": approval.get("approver_id"),
+        "policy_version": (r.get("policy") or {}).get("version"),
+    }
+
+
+def normalize_ts(value: str) -> str:
+    # Any ISO date or time (UTC unless it has an offset) as a ts_utc string.
+    epoch = _epoch(value)
+    if epoch == TS_MISSING:
+        raise ValueError(f"Invalid time {value!r} (expected ISO 8601)")
+    return dt.datetime.fromtimestamp(epoch, dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -1,29 +1,52 @@
 from __future__ import annotations
 
 import datetime as dt
-import json
-from typing import Any, Dict, Optional
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
 
 from .config import PolicyRuleSet
-from .hashing import compute_canonical_hash, compute_rules_hash, compute_this_hash, canonical_json
-from .ledger import read_all_receipts, get_last_hash
+from .hashing import CanonicalReceipt, compute_this_hash
+from .ledger import LedgerHead, ReceiptBuilder, append_chained, append_chained_batch, get_ledger_head
 from .keys import get_public_key_b64, sign_with_approver
-from .policy import extract_confidence, run_policy_checks
+from .policy import CompiledPolicy, compile_policy, extract_confidence
 
-import threading
+_event_id_lock = threading.Lock()
+_writer_id = ""
+_last_us = 0
+_seq = 0
 
-_event_counter_lock = threading.Lock()
 
+def _new_writer() -> None:
+    # A random id per process (and per forked child) keeps concurrent
+    # writers apart without coordinating through the ledger.
+    global _writer_id, _last_us, _seq
+    _writer_id = os.urandom(4).hex()
+    _last_us = 0
+    _seq = 0
 
-def next_event_id() -> str:
-    now = dt.datetime.utcnow().replace(microsecond=0)
-    ts = now.isoformat() + "Z"
-    with _event_counter_lock:
-        n = len(read_all_receipts()) + 1
-    return f"{ts}_{n:05d}"
 
+_new_writer()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_new_writer)
 
-def build_new_receipt(
+
+def next_event_id() -> str:
+    # "<UTC time to the microsecond>Z_<writer>-<seq>". IDs sort by time; a
+    # writer's clock never steps back, so its own IDs are strictly
+    # increasing. The first 19 characters are the second-resolution
+    # ts_utc, as in the older "<ts>Z_<count>" IDs, which still resolve.
+    global _last_us, _seq
+    with _event_id_lock:
+        _last_us = max(time.time_ns() // 1000, _last_us + 1)
+        _seq += 1
+        us, seq = _last_us, _seq
+    t = dt.datetime.fromtimestamp(us // 1_000_000, dt.timezone.utc)
+    return f"{t:%Y-%m-%dT%H:%M:%S}.{us % 1_000_000:06d}Z_{_writer_id}-{seq:06d}"
+
+
+def _encode_new_receipt(
     prompt: str,
     model_output_raw: str,
     proposed_action_type: str,
@@ -31,25 +54,24 @@ def build_new_receipt(
     proposed_action_params: Dict[str, Any],
     confidence_override: Optional[float],
     policy: PolicyRuleSet,
-) -> Dict[str, Any]:
-    receipts = read_all_receipts()
-    prev_hash = get_last_hash(receipts)
+    head: Optional[LedgerHead] = None,
+) -> CanonicalReceipt:
+    head = head or get_ledger_head()
+    prev_hash = head.last_hash
 
     event_id = next_event_id()
-    ts_utc = event_id.split("_")[0]
+    ts_utc = event_id[:19] + "Z"
 
     parsed_conf = extract_confidence(model_output_raw)
     confidence = confidence_override if confidence_override is not None else parsed_conf
 
-    checks, decision, reason, approval_required = run_policy_checks(
+    compiled = compile_policy(policy)
+    checks, decision, reason, approval_required = compiled.check(
         proposed_action_type=proposed_action_type,
         confidence=confidence,
         approval_present=False,
-        policy=policy,
     )
 
-    rules_hash = compute_rules_hash(policy.as_text())
-
     receipt: Dict[str, Any] = {
         "event_id": event_id,
         "ts_utc": ts_utc,
@@ -67,9 +89,9 @@ def build_new_receipt(
             "params": proposed_action_params or {},
         },
         "policy": {
-            "policy_id": policy.policy_id,
-            "version": policy.version,
-            "rules_hash": rules_hash,
+            "policy_id": compiled.rules.policy_id,
+            "version": compiled.rules.version,
+            "rules_hash": compiled.rules_hash,
         },
         "policy_checks": checks,
         "decision": {"result": decision, "reason": reason, "decision_by": "policy_engine"},
@@ -86,18 +108,46 @@ def build_new_receipt(
         "integrity": {"prev_hash": prev_hash, "canonical_hash": None, "this_hash": None},
     }
 
-    canonical_hash = compute_canonical_hash(receipt)
+    enc = CanonicalReceipt(receipt)
+    canonical_hash = enc.canonical_hash()
     receipt["integrity"]["canonical_hash"] = canonical_hash
     receipt["integrity"]["this_hash"] = compute_this_hash(prev_hash, canonical_hash)
-    return receipt
+    return enc
 
 
-def build_approval_transition(
+def build_new_receipt(
+    prompt: str,
+    model_output_raw: str,
+    proposed_action_type: str,
+    proposed_action_target: str,
+    proposed_action_params: Dict[str, Any],
+    confidence_override: Optional[float],
+    policy: PolicyRuleSet,
+    head: Optional[LedgerHead] = None,
+) -> Dict[str, Any]:
+    return _encode_new_receipt(
+        prompt=prompt,
+        model_output_raw=model_output_raw,
+        proposed_action_type=proposed_action_type,
+        proposed_action_target=proposed_action_target,
+        proposed_action_params=proposed_action_params,
+        confidence_override=confidence_override,
+        policy=policy,
+        head=head,
+    ).receipt
+
+
+def _encode_approval_transition(
     receipt_latest: Dict[str, Any],
     approver_id: str,
     policy: PolicyRuleSet,
-) -> Dict[str, Any]:
-    base = json.loads(canonical_json(receipt_latest))
+    head: Optional[LedgerHead] = None,
+) -> CanonicalReceipt:
+    # Only the sections rewritten below are copied; the rest are shared
+    # with receipt_latest and must not be mutated through the result.
+    base = dict(receipt_latest)
+    for section in ("approval", "decision", "actuation", "integrity"):
+        base[section] = dict(base[section])
 
     base["approval"]["required"] = True
     base["approval"]["approved"] = True
@@ -109,11 +159,10 @@ def build_approval_transition(
     confidence = base.get("model_output", {}).get("effective_confidence", None)
     action_type = base.get("proposed_action", {}).get("type", "")
 
-    checks, decision, reason, _approval_required = run_policy_checks(
+    checks, decision, reason, _approval_required = compile_policy(policy).check(
         proposed_action_type=action_type,
         confidence=confidence,
         approval_present=True,
-        policy=policy,
     )
     base["policy_checks"] = checks
     base["decision"]["result"] = decision
@@ -123,14 +172,71 @@ def build_approval_transition(
     base["actuation"]["executed"] = False
     base["actuation"]["actuation_event_id"] = None
 
-    receipts = read_all_receipts()
-    prev_hash = get_last_hash(receipts)
+    prev_hash = (head or get_ledger_head()).last_hash
     base["integrity"]["prev_hash"] = prev_hash
 
-    canonical_hash = compute_canonical_hash(base)
+    enc = CanonicalReceipt(base)
+    canonical_hash = enc.canonical_hash()
     base["integrity"]["canonical_hash"] = canonical_hash
 
     base["approval"]["signature"] = sign_with_approver(approver_id, canonical_hash)
 
     base["integrity"]["this_hash"] = compute_this_hash(prev_hash, canonical_hash)
-    return base
+    return enc
+
+
+def build_approval_transition(
+    receipt_latest: Dict[str, Any],
+    approver_id: str,
+    policy: PolicyRuleSet,
+    head: Optional[LedgerHead] = None,
+) -> Dict[str, Any]:
+    return _encode_approval_transition(receipt_latest, approver_id=approver_id, policy=policy, head=head).receipt
+
+
+def append_new_receipt(
+    prompt: str,
+    model_output_raw: str,
+    proposed_action_type: str,
+    proposed_action_target: str,
+    proposed_action_params: Dict[str, Any],
+    confidence_override: Optional[float],
+    policy: PolicyRuleSet,
+) -> Dict[str, Any]:
+    # build_new_receipt + append_receipt as one ledger critical section, so
+    # concurrent writers (threads or processes) never chain off the same head.
+    return append_chained(
+        lambda head: _encode_new_receipt(
+            prompt=prompt,
+            model_output_raw=model_output_raw,
+            proposed_action_type=proposed_action_type,
+            proposed_action_target=proposed_action_target,
+            proposed_action_params=proposed_action_params,
+            confidence_override=confidence_override,
+            policy=policy,
+            head=head,
+        )
+    )
+
+
+def _new_receipt_builder(item: Dict[str, Any], policy: Union[PolicyRuleSet, CompiledPolicy]) -> ReceiptBuilder:
+    return lambda head: _encode_new_receipt(**item, policy=policy, head=head)
+
+
+def append_new_receipts(items: List[Dict[str, Any]], policy: PolicyRuleSet) -> List[Any]:
+    # Batch append_new_receipt: each item holds build_new_receipt's keyword
+    # arguments (without policy/head). All receipts are built and chained in
+    # order inside one ledger critical section and written with one append.
+    # Returns the receipt, or the exception its build raised, per item.
+    compiled = compile_policy(policy)
+    return append_chained_batch([_new_receipt_builder(item, compiled) for item in items])
+
+
+def append_approval_transition(
+    receipt_latest: Dict[str, Any],
+    approver_id: str,
+    policy: PolicyRuleSet,
+) -> Dict[str, Any]:
+    return append_chained(
+        lambda head: _encode_approval_transition(receipt_latest, approver_id=approver_id, policy=policy, head=head)
+    )
@@ -1,22 +1,28 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
+from .archive import iter_file_lines
 from .config import PolicyRuleSet
-from .hashing import canonical_json, sha256_hex
-from .policy import run_policy_checks
+from .hashing import canonical_json
+from .ledger import _iter_lines, _logical_end, ensure_log_exists, storage_backend
+from .parallel import MIN_CHUNK_BYTES, ledger_chunks
+from .policy import CompiledPolicy, compile_policy
 
 
-def replay_and_compare(receipt: Dict[str, Any], policy: PolicyRuleSet) -> Dict[str, Any]:
+def replay_and_compare(receipt: Dict[str, Any], policy: Union[PolicyRuleSet, CompiledPolicy]) -> Dict[str, Any]:
     action_type = receipt.get("proposed_action", {}).get("type", "")
     confidence = receipt.get("model_output", {}).get("effective_confidence", None)
     approved = bool(receipt.get("approval", {}).get("approved", False))
 
-    checks, decision, reason, approval_required = run_policy_checks(
+    checks, decision, reason, approval_required = compile_policy(policy).check(
         proposed_action_type=action_type,
         confidence=confidence,
         approval_present=approved,
-        policy=policy,
     )
 
     stored_checks = receipt.get("policy_checks", [])
@@ -29,5 +35,137 @@ def replay_and_compare(receipt: Dict[str, Any], policy: PolicyRuleSet) -> Dict[s
     return {
         "recomputed": {"policy_checks": checks, "decision": decision, "reason": reason, "approval_required": approval_required},
         "stored": {"policy_checks": stored_checks, "decision": stored_decision, "reason": stored_reason},
-        "match": sha256_hex(recomputed_blob.encode("utf-8")) == sha256_hex(stored_blob.encode("utf-8")),
+        "match": recomputed_blob == stored_blob,
     }
+
+
+DEFAULT_MAX_MISMATCHES = 20
+
+# (action_type, type of effective_confidence, effective_confidence, approved).
+# The confidence's type is part of the key because 1 and 1.0 encode differently.
+_DecisionKey = Tuple[Any, str, Any, bool]
+
+
+@dataclass
+class ReplayReport:
+    total: int = 0
+    matched: int = 0
+    mismatched: int = 0
+    malformed: int = 0  # unparseable lines or unusable decision inputs
+    distinct_inputs: int = 0
+    # First mismatches in ledger order: line, offset, event_id and the
+    # stored vs recomputed decision/reason.
+    mismatches: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatched == 0 and self.malformed == 0
+
+
+def _decision_key(receipt: Dict[str, Any]) -> _DecisionKey:
+    action_type = receipt.get("proposed_action", {}).get("type", "")
+    confidence = receipt.get("model_output", {}).get("effective_confidence", None)
+    approved = bool(receipt.get("approval", {}).get("approved", False))
+    return action_type, type(confidence).__name__, confidence, approved
+
+
+def _replay_lines(
+    lines: Iterable[Tuple[int, bytes]],
+    base: int,
+    policy: Union[PolicyRuleSet, CompiledPolicy],
+    max_mismatches: int,
+) -> Tuple[ReplayReport, Set[_DecisionKey]]:
+    # Replays (offset, line) pairs. Lines in mismatches are counted from the
+    # first pair; offsets are rebased by `base`.
+    compiled = compile_policy(policy)
+    memo: Dict[_DecisionKey, Tuple[str, str, str]] = {}
+    out = ReplayReport()
+    for offset, line in lines:
+        if not line.strip():
+            continue
+        out.total += 1
+        try:
+            r = json.loads(line)
+            key = _decision_key(r)
+            hash(key)
+        except (ValueError, AttributeError, TypeError):
+            out.malformed += 1
+            continue
+        hit = memo.get(key)
+        if hit is None:
+            action_type, _, confidence, approved = key
+            checks, decision, reason, _ = compiled.check(action_type, confidence, approved)
+            hit = memo[key] = (
+                canonical_json({"checks": checks, "decision": decision, "reason": reason}),
+                decision,
+                reason,
+            )
+        stored_decision = r.get("decision", {}).get("result")
+        stored_reason = r.get("decision", {}).get("reason")
+        stored_blob = canonical_json(
+            {"checks": r.get("policy_checks", []), "decision": stored_decision, "reason": stored_reason}
+        )
+        if stored_blob == hit[0]:
+            out.matched += 1
+            continue
+        out.mismatched += 1
+        if len(out.mismatches) < max_mismatches:
+            out.mismatches.append({
+                "line": out.total,
+                "offset": base + offset,
+                "event_id": r.get("event_id"),
+                "stored": {"decision": stored_decision, "reason": stored_reason},
+                "recomputed": {"decision": hit[1], "reason": hit[2]},
+            })
+    return out, set(memo)
+
+
+def _replay_chunk(
+    path: str,
+    base: int,
+    start: int,
+    end: int,
+    policy: Union[PolicyRuleSet, CompiledPolicy],
+    max_mismatches: int,
+) -> Tuple[ReplayReport, Set[_DecisionKey]]:
+    # Replays one byte range. Lines in mismatches are local to the chunk;
+    # the caller rebases them.
+    return _replay_lines(iter_file_lines(path, start, end), base, policy, max_mismatches)
+
+
+def replay_all(
+    policy: Union[PolicyRuleSet, CompiledPolicy],
+    workers: Optional[int] = None,
+    max_mismatches: int = DEFAULT_MAX_MISMATCHES,
+    chunk_bytes: int = MIN_CHUNK_BYTES,
+) -> ReplayReport:
+    # Replays every receipt in the ledger (all segments) against `policy`.
+    # Policy checks depend only on _decision_key, so each process evaluates
+    # every distinct key once and only re-encodes the stored result. With
+    # one worker, or a storage backend other than JSONL files, it is a
+    # single pass in this process.
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or storage_backend() is not None:
+        ensure_log_exists()
+        results = [_replay_lines(_iter_lines(0, _logical_end()), 0, policy, max_mismatches)]
+    else:
+        args = [job + (policy, max_mismatches) for job in ledger_chunks(workers, chunk_bytes)]
+        if len(args) <= 1:
+            results = [_replay_chunk(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_replay_chunk, *zip(*args)))
+
+    report = ReplayReport()
+    keys: Set[_DecisionKey] = set()
+    for res, res_keys in results:
+        for m in res.mismatches:
+            if len(report.mismatches) < max_mismatches:
+                report.mismatches.append(dict(m, line=report.total + m["line"]))
+        report.total += res.total
+        report.matched += res.matched
+        report.mismatched += res.mismatched
+        report.malformed += res.malformed
+        keys |= res_keys
+    report.distinct_inputs = len(keys)
+    return report
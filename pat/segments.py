@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from .archive import ARCHIVE_SUFFIX, DEFAULT_BLOCK_BYTES, write_archive
+
+
+@dataclass(frozen=True)
+class SegmentManifest:
+    # A sealed, immutable slice of the ledger. Offsets are logical: the
+    # segment holds ledger bytes [base_offset, base_offset + size).
+    segment: int
+    path: str
+    base_offset: int
+    size: int
+    base_count: int
+    count: int
+    prev_hash: str
+    first_hash: str
+    last_hash: str
+    last_offset: int
+    sha256: str
+    sealed_utc: str
+    # Set once the segment is archived: `path` then names the compressed
+    # archive and `sha256` still covers the uncompressed bytes.
+    compression: Optional[str] = None
+    archive_sha256: Optional[str] = None
+
+    @property
+    def end_offset(self) -> int:
+        return self.base_offset + self.size
+
+
+def segment_name(n: int) -> str:
+    return f"seg-{n:06d}"
+
+
+def manifest_path(segments_dir: str, n: int) -> str:
+    return os.path.join(segments_dir, segment_name(n) + ".manifest.json")
+
+
+_cache: Dict[str, Tuple[int, List[SegmentManifest]]] = {}
+
+
+def load_manifests(segments_dir: str, force: bool = False) -> List[SegmentManifest]:
+    # Cached on the directory's mtime; manifests are only ever replaced
+    # atomically inside it.
+    key = os.path.abspath(segments_dir)
+    try:
+        mtime = os.stat(segments_dir).st_mtime_ns
+    except FileNotFoundError:
+        _cache.pop(key, None)
+        return []
+    hit = _cache.get(key)
+    if hit is not None and hit[0] == mtime and not force:
+        return hit[1]
+    out: List[SegmentManifest] = []
+    for name in sorted(os.listdir(segments_dir)):
+        if not name.endswith(".manifest.json"):
+            continue
+        with open(os.path.join(segments_dir, name), "r", encoding="utf-8") as f:
+            out.append(SegmentManifest(**json.loads(f.read())))
+    out.sort(key=lambda m: m.segment)
+    _cache[key] = (mtime, out)
+    return out
+
+
+def _write_manifest(segments_dir: str, m: SegmentManifest) -> None:
+    path = manifest_path(segments_dir, m.segment)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(asdict(m), sort_keys=True, separators=(",", ":"), ensure_ascii=False))
+    os.replace(tmp, path)
+    _cache.pop(os.path.abspath(segments_dir), None)
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return "sha256:" + h.hexdigest()
+
+
+def seal_segment(
+    active_path: str,
+    segments_dir: str,
+    base_offset: int,
+    base_count: int,
+    prev_hash: str,
+) -> Optional[SegmentManifest]:
+    # Moves the active file into the segments directory and writes its
+    # manifest. The caller holds the ledger lock and starts a new active file.
+    size = os.path.getsize(active_path)
+    if size == 0:
+        return None
+
+    h = hashlib.sha256()
+    count = 0
+    first_line = last_line = b""
+    last_offset = 0
+    pos = 0
+    with open(active_path, "rb") as f:
+        for line in f:
+            h.update(line)
+            if line.strip():
+                count += 1
+                if not first_line:
+                    first_line = line
+                last_line = line
+                last_offset = pos
+            pos += len(line)
+
+    def this_hash(line: bytes) -> str:
+        return ((json.loads(line) if line else {}).get("integrity") or {}).get("this_hash") or ""
+
+    existing = load_manifests(segments_dir)
+    n = existing[-1].segment + 1 if existing else 1
+    os.makedirs(segments_dir, exist_ok=True)
+    seg_path = os.path.join(segments_dir, segment_name(n) + ".jsonl")
+    m = SegmentManifest(
+        segment=n,
+        path=seg_path,
+        base_offset=base_offset,
+        size=size,
+        base_count=base_count,
+        count=count,
+        prev_hash=prev_hash,
+        first_hash=this_hash(first_line),
+        last_hash=this_hash(last_line),
+        last_offset=base_offset + last_offset,
+        sha256="sha256:" + h.hexdigest(),
+        sealed_utc=dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+    )
+    os.replace(active_path, seg_path)
+    _write_manifest(segments_dir, m)
+    return m
+
+
+def relocate_segment(segments_dir: str, n: int, dest_dir: str) -> SegmentManifest:
+    # Moves a sealed segment file (e.g. to cheaper storage); its manifest
+    # stays in `segments_dir` and records the new location.
+    m = next((m for m in load_manifests(segments_dir) if m.segment == n), None)
+    if m is None:
+        raise ValueError(f"Unknown segment {n}")
+    os.makedirs(dest_dir, exist_ok=True)
+    dest = os.path.join(dest_dir, os.path.basename(m.path))
+    shutil.move(m.path, dest)
+    m = replace(m, path=dest)
+    _write_manifest(segments_dir, m)
+    return m
+
+
+def archive_segment(
+    segments_dir: str,
+    n: int,
+    codec: str = "zlib",
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> SegmentManifest:
+    # Replaces sealed segment `n` with a block-compressed archive next to it.
+    # The archive must reproduce the sealed bytes before the original goes.
+    m = next((m for m in load_manifests(segments_dir) if m.segment == n), None)
+    if m is None:
+        raise ValueError(f"Unknown segment {n}")
+    if m.compression is not None:
+        return m
+    dest = os.path.splitext(m.path)[0] + ARCHIVE_SUFFIX
+    index = write_archive(m.path, dest, codec=codec, block_bytes=block_bytes)
+    if index.sha256 != m.sha256:
+        os.remove(dest)
+        raise ValueError(f"Segment {n}: sha256 mismatch (expected {m.sha256}, got {index.sha256})")
+    old = m.path
+    m = replace(m, path=dest, compression=codec, archive_sha256=file_sha256(dest))
+    _write_manifest(segments_dir, m)
+    os.remove(old)
+    return m
+
+
+def remove_segments(segments_dir: str) -> None:
+    for m in load_manifests(segments_dir):
+        if os.path.exists(m.path):
+            os.remove(m.path)
+        os.remove(manifest_path(segments_dir, m.segment))
+    _cache.pop(os.path.abspath(segments_dir), None)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install numpy
+    np = None  # type: ignore[assignment]
+
+from .archive import iter_file_lines
+from .config import PolicyRuleSet
+from .ledger import column_store, ledger_lock
+from .parallel import MIN_CHUNK_BYTES, ledger_chunks
+from .policy import CompiledPolicy, compile_policy
+
+# What-if policy simulation: the decision inputs of every receipt are loaded
+# into NumPy columns once (from the columnar sidecar, or by parsing the
+# ledger), then each candidate rule set is evaluated with a handful of array
+# operations instead of a run_policy_checks call per receipt.
+
+DEFAULT_BUCKET_S = 86400
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("pat.simulate needs numpy (pip install numpy)")
+
+
+@dataclass
+class DecisionColumns:
+    actions: List[str]  # vocabulary; action_code indexes into it
+    action_code: Any  # int32
+    confidence: Any  # float64, meaningful where has_confidence
+    has_confidence: Any  # bool
+    approved: Any  # bool
+    permitted: Any  # bool, the stored decision
+    ts: Any  # datetime64[s], NaT if missing
+
+    def __len__(self) -> int:
+        return len(self.action_code)
+
+
+def _load_chunk(path: str, start: int, end: int) -> Tuple[List[str], Dict[str, Any]]:
+    vocab: Dict[str, int] = {}
+    codes: List[int] = []
+    conf: List[float] = []
+    has_conf: List[bool] = []
+    approved: List[bool] = []
+    permitted: List[bool] = []
+    ts: List[str] = []
+    for _, line in iter_file_lines(path, start, end):
+        if not line.strip():
+            continue
+        try:
+            r = json.loads(line)
+        except ValueError:
+            continue
+        # Same inputs and normalization as replay_and_compare.
+        action = ((r.get("proposed_action") or {}).get("type") or "").strip().upper()
+        codes.append(vocab.setdefault(action, len(vocab)))
+        c = (r.get("model_output") or {}).get("effective_confidence")
+        ok = isinstance(c, (int, float))
+        has_conf.append(ok)
+        conf.append(float(c) if ok else 0.0)
+        approved.append(bool((r.get("approval") or {}).get("approved", False)))
+        permitted.append((r.get("decision") or {}).get("result") == "PERMITTED")
+        t = r.get("ts_utc")
+        ts.append(t[:-1] if isinstance(t, str) and t.endswith("Z") else "NaT")
+    try:
+        ts_arr = np.array(ts, dtype="datetime64[s]")
+    except ValueError:
+        ts_arr = np.array([_parse_ts(t) for t in ts], dtype="datetime64[s]")
+    cols = {
+        "action_code": np.array(codes, dtype=np.int32),
+        "confidence": np.array(conf, dtype=np.float64),
+        "has_confidence": np.array(has_conf, dtype=bool),
+        "approved": np.array(approved, dtype=bool),
+        "permitted": np.array(permitted, dtype=bool),
+        "ts": ts_arr,
+    }
+    return list(vocab), cols
+
+
+def _parse_ts(t: str) -> Any:
+    try:
+        return np.datetime64(t, "s")
+    except ValueError:
+        return "NaT"
+
+
+def load_decision_columns(workers: Optional[int] = None, chunk_bytes: int = MIN_CHUNK_BYTES) -> DecisionColumns:
+    # Parses the ledger (all segments) in a process pool and concatenates
+    # the per-range columns in ledger order.
+    _require_numpy()
+    workers = workers or os.cpu_count() or 1
+    jobs = [(path, start, end) for path, _base, start, end in ledger_chunks(workers, chunk_bytes)]
+    if len(jobs) <= 1 or workers == 1:
+        parts = [_load_chunk(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_load_chunk, *zip(*jobs)))
+
+    vocab: Dict[str, int] = {}
+    merged: Dict[str, List[Any]] = {}
+    for local_vocab, cols in parts:
+        remap = np.array([vocab.setdefault(a, len(vocab)) for a in local_vocab] or [0], dtype=np.int32)
+        cols = dict(cols, action_code=remap[cols["action_code"]])
+        for name, arr in cols.items():
+            merged.setdefault(name, []).append(arr)
+
+    def cat(name: str, dtype: str) -> Any:
+        return np.concatenate(merged[name]) if merged.get(name) else np.array([], dtype=dtype)
+
+    return DecisionColumns(
+        actions=list(vocab),
+        action_code=cat("action_code", "int32"),
+        confidence=cat("confidence", "float64"),
+        has_confidence=cat("has_confidence", "bool"),
+        approved=cat("approved", "bool"),
+        permitted=cat("permitted", "bool"),
+        ts=cat("ts", "datetime64[s]"),
+    )
+
+
+def decision_columns() -> DecisionColumns:
+    # Zero-copy views over the columnar sidecar (pat.columns); no JSON is
+    # parsed except for records appended since it was last caught up. A
+    # stored NaN confidence counts as missing here.
+    _require_numpy()
+    with ledger_lock():
+        store = column_store()
+        permitted = store.dicts["decision"].index("PERMITTED") if "PERMITTED" in store.dicts["decision"] else -1
+        conf = np.frombuffer(store.column("confidence"), dtype=np.float64)
+        return DecisionColumns(
+            actions=list(store.dicts["action"]),
+            action_code=np.frombuffer(store.column("action"), dtype=np.uint32),
+            confidence=conf,
+            has_confidence=~np.isnan(conf),
+            approved=np.frombuffer(store.column("approved"), dtype=np.uint8).view(bool),
+            permitted=np.frombuffer(store.column("decision"), dtype=np.uint32) == permitted,
+            ts=np.frombuffer(store.column("ts"), dtype=np.int64).view("datetime64[s]"),
+        )
+
+
+def evaluate(columns: DecisionColumns, policy: Union[PolicyRuleSet, CompiledPolicy]) -> Any:
+    # Vectorized CompiledPolicy.check decision: permitted iff the action is
+    # allowed, a confidence is present and not below the threshold, and the
+    # action is not high-stakes or was approved.
+    _require_numpy()
+    compiled = compile_policy(policy)
+    # Per-vocabulary lookups, gathered by action code below.
+    allowed = np.array([a in compiled.allowed_actions for a in columns.actions] or [False], dtype=bool)
+    required = np.array([a in compiled.high_stakes for a in columns.actions] or [False], dtype=bool)
+    # ~(c < t) rather than c >= t so NaN passes, as it does in check().
+    conf_ok = columns.has_confidence & ~(columns.confidence < compiled.threshold)
+    return allowed[columns.action_code] & conf_ok & (columns.approved | ~required[columns.action_code])
+
+
+@dataclass
+class WhatIfReport:
+    policy_id: str
+    version: str
+    confidence_threshold: float
+    high_stakes_actions: Tuple[str, ...]
+    total: int = 0
+    permitted: int = 0
+    to_blocked: int = 0  # stored PERMITTED, would now be BLOCKED
+    to_permitted: int = 0  # stored BLOCKED, would now be PERMITTED
+    # action / bucket start (ISO, UTC) -> [to_blocked, to_permitted]; only
+    # entries with at least one flip are listed.
+    by_action: Dict[str, List[int]] = field(default_factory=dict)
+    by_bucket: Dict[str, List[int]] = field(default_factory=dict)
+
+
+def _flip_table(keys: Any, n_keys: int, to_blocked: Any, to_permitted: Any) -> List[Tuple[int, int, int]]:
+    blocked = np.bincount(keys[to_blocked], minlength=n_keys)
+    permitted = np.bincount(keys[to_permitted], minlength=n_keys)
+    return [(k, int(blocked[k]), int(permitted[k])) for k in np.flatnonzero(blocked + permitted)]
+
+
+def simulate(
+    candidates: Sequence[PolicyRuleSet],
+    columns: Optional[DecisionColumns] = None,
+    bucket_s: int = DEFAULT_BUCKET_S,
+) -> List[WhatIfReport]:
+    # Decision flips against the stored decisions, per candidate rule set,
+    # broken down by action and by time bucket of `bucket_s` seconds.
+    _require_numpy()
+    if bucket_s <= 0:
+        raise ValueError("bucket_s must be positive")
+    cols = columns if columns is not None else decision_columns()
+
+    has_ts = ~np.isnat(cols.ts)
+    secs = cols.ts[has_ts].astype(np.int64)
+    origin = int(secs.min()) // bucket_s * bucket_s if len(secs) else 0
+    bucket = (secs - origin) // bucket_s
+    n_buckets = int(bucket.max()) + 1 if len(bucket) else 0
+
+    reports: List[WhatIfReport] = []
+    for policy in candidates:
+        now = evaluate(cols, policy)
+        to_blocked = cols.permitted & ~now
+        to_permitted = ~cols.permitted & now
+        rep = WhatIfReport(
+            policy_id=policy.policy_id,
+            version=policy.version,
+            confidence_threshold=policy.confidence_threshold,
+            high_stakes_actions=tuple(policy.high_stakes_actions),
+            total=len(cols),
+            permitted=int(now.sum()),
+            to_blocked=int(to_blocked.sum()),
+            to_permitted=int(to_permitted.sum()),
+        )
+        for code, b, p in _flip_table(cols.action_code, len(cols.actions), to_blocked, to_permitted):
+            rep.by_action[cols.actions[code] or "(none)"] = [b, p]
+        for k, b, p in _flip_table(bucket, n_buckets, to_blocked[has_ts], to_permitted[has_ts]):
+            start = dt.datetime.fromtimestamp(origin + k * bucket_s, dt.timezone.utc)
+            rep.by_bucket[start.replace(tzinfo=None).isoformat() + "Z"] = [b, p]
+        reports.append(rep)
+    return reports
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from .query import EventFilter
+
+if TYPE_CHECKING:
+    from .ledger import LedgerHead
+
+# Items as _write_batch produces them: the receipt and its exact line bytes.
+Item = Tuple[Dict[str, Any], bytes]
+
+
+class LedgerBackend(ABC):
+    # Storage behind pat.ledger once installed with configure_storage(); the
+    # default (no backend) is the JSONL file plus sealed segments. Records
+    # are addressed by logical byte offset: where the record's line starts
+    # in the JSONL export, so cursors and sidecars work the same everywhere.
+    # Every method is called with the ledger lock held except the reads.
+
+    name = "backend"
+    path = ""
+
+    @abstractmethod
+    def head(self) -> "LedgerHead":
+        ...
+
+    @abstractmethod
+    def end(self) -> int:
+        # Logical end (size of the JSONL export).
+        ...
+
+    @abstractmethod
+    def append(self, head: "LedgerHead", items: List[Item]) -> None:
+        # Stores `items` after `head`, all or nothing.
+        ...
+
+    @abstractmethod
+    def scan(self, start: int = 0, end: Optional[int] = None, reverse: bool = False) -> Iterator[Tuple[int, bytes]]:
+        # (offset, line) for records starting in [start, end).
+        ...
+
+    @abstractmethod
+    def line_at(self, offset: int) -> bytes:
+        # The line starting at `offset`, b"" if none does.
+        ...
+
+    @abstractmethod
+    def offsets_of(self, event_id: str) -> List[int]:
+        # Offsets of every record of `event_id`, oldest first.
+        ...
+
+    @abstractmethod
+    def replace_last(self, line: bytes) -> bool:
+        # Rewrites the newest record (the demo's tamper button).
+        ...
+
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def is_boundary(self, offset: int) -> bool:
+        return offset == 0 or offset == self.end() or bool(self.line_at(offset))
+
+
+def _fields(r: Dict[str, Any]) -> Tuple[Any, ...]:
+    def get(section: str, key: str) -> Any:
+        value = (r.get(section) or {}) if isinstance(r.get(section), dict) else {}
+        return value.get(key)
+
+    return (
+        r.get("event_id"),
+        r.get("ts_utc"),
+        get("decision", "result"),
+        get("proposed_action", "type"),
+        get("approval", "approver_id"),
+        1 if get("approval", "required") else 0,
+        1 if get("approval", "approved") else 0,
+        get("policy", "version"),
+        get("integrity", "this_hash"),
+    )
+
+
+# Indexed columns, in _fields order.
+_FIELD_NAMES = (
+    "event_id",
+    "ts_utc",
+    "decision",
+    "action_type",
+    "approver_id",
+    "approval_required",
+    "approved",
+    "policy_version",
+    "this_hash",
+)
+
+
+def _fields_of_line(line: bytes) -> Tuple[Any, ...]:
+    try:
+        r = json.loads(line)
+    except ValueError:
+        r = None
+    return _fields(r) if isinstance(r, dict) else (None,) * len(_FIELD_NAMES)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    seq INTEGER PRIMARY KEY,        -- record number, 1-based
+    offset INTEGER NOT NULL UNIQUE, -- logical offset in the JSONL export
+    event_id TEXT,
+    ts_utc TEXT,
+    decision TEXT,
+    action_type TEXT,
+    approver_id TEXT,
+    approval_required INTEGER,
+    approved INTEGER,
+    policy_version TEXT,
+    this_hash TEXT,
+    line BLOB NOT NULL              -- exact canonical line, newline included
+);
+CREATE INDEX IF NOT EXISTS receipts_event_id ON receipts (event_id, seq);
+CREATE INDEX IF NOT EXISTS receipts_ts_utc ON receipts (ts_utc, seq);
+CREATE INDEX IF NOT EXISTS receipts_decision ON receipts (decision, seq);
+CREATE INDEX IF NOT EXISTS receipts_action_type ON receipts (action_type, seq);
+CREATE INDEX IF NOT EXISTS receipts_approver_id ON receipts (approver_id, seq);
+CREATE INDEX IF NOT EXISTS receipts_policy_version ON receipts (policy_version, seq);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    stamp INTEGER NOT NULL          -- bumped in every write transaction
+);
+INSERT OR IGNORE INTO changes (id, stamp) VALUES (0, 0);
+"""
+
+_BUMP = "UPDATE changes SET stamp = stamp + 1"
+
+SCAN_BATCH = 512
+
+
+class SqliteBackend(LedgerBackend):
+    # One row per receipt in a WAL-mode database. The stored line is the
+    # exact bytes the JSONL backend would have written, so hashes verify and
+    # the export is byte-identical; the other columns exist for the indexes.
+
+    name = "sqlite"
+
+    def __init__(self, path: str, synchronous: str = "FULL") -> None:
+        self.path = os.path.abspath(path)
+        self.synchronous = synchronous
+        self._local = threading.local()
+        # Every connection this process opened, from any thread, for close().
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_pid = os.getpid()
+        self._generation = 0
+        self._conns_lock = threading.Lock()
+        self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (and per process after a fork), until
+        # close().
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid() and self._local.generation == self._generation:
+            return conn
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.executescript(_SCHEMA)
+        with self._conns_lock:
+            if self._conns_pid != os.getpid():
+                self._conns, self._conns_pid = [], os.getpid()  # the parent's, after a fork
+            self._conns.append(conn)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.generation = self._generation
+        return conn
+
+    def head(self) -> "LedgerHead":
+        # The change stamp stands in for the file's mtime_ns: a rewrite that
+        # keeps the size and this_hash (replace_last) still moves it.
+        from .ledger import GENESIS_HASH, LedgerHead
+
+        row = self._conn().execute(
+            "SELECT r.seq, r.offset + length(r.line), r.this_hash, c.stamp FROM changes AS c"
+            " LEFT JOIN (SELECT seq, offset, line, this_hash FROM receipts ORDER BY seq DESC LIMIT 1) AS r"
+        ).fetchone()
+        seq, size, last_hash, stamp = row
+        return LedgerHead(self.path, os.stat(self.path).st_ino, size or 0, stamp, seq or 0, last_hash or GENESIS_HASH)
+
+    def end(self) -> int:
+        row = self._conn().execute("SELECT offset + length(line) FROM receipts ORDER BY seq DESC LIMIT 1").fetchone()
+        return row[0] if row else 0
+
+    def append(self, head: "LedgerHead", items: List[Item]) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.end() != head.size:
+                raise ValueError("Ledger changed under the reserved head")
+            rows = []
+            seq, offset = head.count, head.size
+            for receipt, line in items:
+                seq += 1
+                rows.append((seq, offset) + _fields(receipt) + (line,))
+                offset += len(line)
+            conn.executemany(
+                f"INSERT INTO receipts (seq, offset, {', '.join(_FIELD_NAMES)}, line)"
+                f" VALUES ({', '.join('?' * (len(_FIELD_NAMES) + 3))})",
+                rows,
+            )
+            conn.execute(_BUMP)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def scan(self, start: int = 0, end: Optional[int] = None, reverse: bool = False) -> Iterator[Tuple[int, bytes]]:
+        # Keyset pages over the offset index, so no cursor stays open
+        # between pages.
+        lo, hi = start, end if end is not None else self.end()
+        conn = self._conn()
+        while lo < hi:
+            if reverse:
+                rows = conn.execute(
+                    "SELECT offset, line FROM receipts WHERE offset >= ? AND offset < ? ORDER BY offset DESC LIMIT ?",
+                    (lo, hi, SCAN_BATCH),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT offset, line FROM receipts WHERE offset >= ? AND offset < ? ORDER BY offset LIMIT ?",
+                    (lo, hi, SCAN_BATCH),
+                ).fetchall()
+            for offset, line in rows:
+                yield offset, bytes(line)
+            if len(rows) < SCAN_BATCH:
+                return
+            if reverse:
+                hi = rows[-1][0]
+            else:
+                lo = rows[-1][0] + 1
+
+    def line_at(self, offset: int) -> bytes:
+        row = self._conn().execute("SELECT line FROM receipts WHERE offset = ?", (offset,)).fetchone()
+        return bytes(row[0]) if row else b""
+
+    def offsets_of(self, event_id: str) -> List[int]:
+        rows = self._conn().execute("SELECT offset FROM receipts WHERE event_id = ? ORDER BY seq", (event_id,))
+        return [r[0] for r in rows]
+
+    def select(
+        self,
+        limit: int,
+        before: Optional[int] = None,
+        filters: Optional[EventFilter] = None,
+    ) -> List[Tuple[int, bytes]]:
+        # Newest-first filtered page ending before offset `before`; SQLite
+        # picks an index per query. ts_utc bounds compare as strings.
+        f = filters or EventFilter()
+        where: List[str] = []
+        args: List[Any] = []
+        for column, value in (
+            ("decision", f.decision),
+            ("action_type", f.action_type),
+            ("approver_id", f.approver_id),
+            ("approval_required", f.approval_required),
+            ("approved", f.approved),
+            ("policy_version", f.policy_version),
+        ):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(int(value) if isinstance(value, bool) else value)
+        if f.since is not None:
+            where.append("ts_utc >= ?")
+            args.append(f.since)
+        if f.until is not None:
+            where.append("ts_utc < ?")
+            args.append(f.until)
+        if before is not None:
+            where.append("offset < ?")
+            args.append(before)
+        sql = "SELECT offset, line FROM receipts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY seq DESC LIMIT ?"
+        return [(o, bytes(line)) for o, line in self._conn().execute(sql, args + [limit])]
+
+    def replace_last(self, line: bytes) -> bool:
+        conn = self._conn()
+        row = conn.execute("SELECT seq FROM receipts ORDER BY seq DESC LIMIT 1").fetchone()
+        if row is None:
+            return False
+        assign = ", ".join(f"{name} = ?" for name in _FIELD_NAMES)
+        self._write(
+            (f"UPDATE receipts SET {assign}, line = ? WHERE seq = ?", _fields_of_line(line) + (line, row[0])),
+        )
+        return True
+
+    def reset(self) -> None:
+        self._write(("DELETE FROM receipts", ()))
+
+    def _write(self, *statements: Tuple[str, Tuple[Any, ...]]) -> None:
+        # Runs the statements and bumps the change stamp in one transaction.
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, args in statements:
+                conn.execute(sql, args)
+            conn.execute(_BUMP)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        # Closes the connections of every thread; a thread that uses the
+        # backend again opens a new one.
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+            self._generation += 1
+        for conn in conns:
+            conn.close()
+
+
+def open_backend(spec: str) -> Optional[LedgerBackend]:
+    # "jsonl" (the default file ledger, i.e. no backend) or "sqlite:<path>".
+    kind, _, arg = spec.partition(":")
+    kind = kind.strip().lower()
+    if kind == "jsonl" and not arg:
+        return None
+    if kind == "sqlite" and arg:
+        return SqliteBackend(arg)
+    raise ValueError(f"Unknown storage {spec!r} (expected 'jsonl' or 'sqlite:<path>')")
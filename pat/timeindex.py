@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from typing import List, Optional, Tuple
+
+from .columns import TS_MISSING
+
+# One closed block: (offset, end, last_offset, min_ts, max_ts), ts_utc as
+# epoch seconds. A block without any timestamp has min_ts > max_ts.
+Block = Tuple[int, int, int, int, int]
+
+_NO_TS = ((1 << 63) - 1, TS_MISSING)
+
+
+class TimeIndex:
+    # Sparse sidecar from time to logical ledger offsets. The ledger is cut
+    # into blocks of about `block_bytes`; each closed block is one JSONL
+    # entry. ts_utc is not monotonic in the log (an approval transition
+    # keeps its event's time), so seeking uses the running maximum of the
+    # block maxima, which is. Records past the last closed block (the open
+    # block) are only held in memory and re-read from the log when needed.
+
+    def __init__(self, path: str, block_bytes: int) -> None:
+        self.path = path
+        self.block_bytes = block_bytes
+        self.blocks: List[Block] = []
+        self._peaks: List[int] = []  # max ts of blocks[0..i]
+        self.consumed = 0
+        self._open: Optional[List[int]] = None
+        self._pending: List[Block] = []
+
+    @classmethod
+    def load(cls, path: str, block_bytes: int) -> "TimeIndex":
+        idx = cls(path, block_bytes)
+        idx.refresh()
+        return idx
+
+    @property
+    def covered(self) -> int:
+        # End of the last closed block.
+        return self.blocks[-1][1] if self.blocks else 0
+
+    @property
+    def scanned(self) -> int:
+        # End of the last record fed to add().
+        return self._open[1] if self._open is not None else self.covered
+
+    @property
+    def last(self) -> Optional[Block]:
+        return self.blocks[-1] if self.blocks else None
+
+    def refresh(self) -> None:
+        # Reads blocks appended (possibly by another process) since the last
+        # load. New blocks supersede the in-memory open block.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.consumed)
+            for line in f:
+                try:
+                    block = tuple(json.loads(line))
+                except (ValueError, TypeError):
+                    # Torn trailing write; drop it and let the log catch-up refill.
+                    os.truncate(self.path, self.consumed)
+                    break
+                if len(block) != 5:
+                    os.truncate(self.path, self.consumed)
+                    break
+                self.consumed += len(line)
+                self._close(block)  # type: ignore[arg-type]
+                self._open = None
+
+    def in_sync(self) -> bool:
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return size == self.consumed
+
+    def _close(self, block: Block) -> None:
+        self.blocks.append(block)
+        self._peaks.append(max(block[4], self._peaks[-1]) if self._peaks else block[4])
+
+    def add(self, offset: int, length: int, ts: int) -> None:
+        # Feeds the next record of the log (ts = TS_MISSING if it has none).
+        lo, hi = (ts, ts) if ts != TS_MISSING else _NO_TS
+        b = self._open
+        if b is None:
+            b = self._open = [offset, offset + length, offset, lo, hi]
+        else:
+            b[1], b[2], b[3], b[4] = offset + length, offset, min(b[3], lo), max(b[4], hi)
+        if b[1] - b[0] >= self.block_bytes:
+            block: Block = (b[0], b[1], b[2], b[3], b[4])
+            self._close(block)
+            self._pending.append(block)
+            self._open = None
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        data = "".join(json.dumps(list(b), separators=(",", ":")) + "\n" for b in self._pending)
+        raw = data.encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(raw)
+        self.consumed += len(raw)
+        self._pending = []
+
+    def clear(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb"):
+            pass
+        os.replace(tmp, self.path)
+        self.blocks, self._peaks, self._pending = [], [], []
+        self.consumed = 0
+        self._open = None
+
+    def seek(self, since: int) -> int:
+        # Offset of the first closed block that can hold a record with
+        # ts >= since (every record before it is older); `covered` if none.
+        i = bisect.bisect_left(self._peaks, since)
+        return self.blocks[i][0] if i < len(self.blocks) else self.covered
+
+    def ranges(self, since: Optional[int], until: Optional[int]) -> List[Tuple[int, int]]:
+        # Merged [start, end) ranges of the closed blocks that can hold a
+        # record with since <= ts < until. The open block is not included.
+        first = bisect.bisect_left(self._peaks, since) if since is not None else 0
+        out: List[Tuple[int, int]] = []
+        for offset, end, _, lo, hi in self.blocks[first:]:
+            if lo > hi or (since is not None and hi < since) or (until is not None and lo >= until):
+                continue
+            if out and out[-1][1] == offset:
+                out[-1] = (out[-1][0], end)
+            else:
+                out.append((offset, end))
+        return out
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+DEFAULT_BATCH_MS = 2.0
+DEFAULT_BATCH_SIZE = 256
+
+
+@dataclass(frozen=True)
+class FsyncPolicy:
+    fsync: bool
+    window_ms: float = 0.0
+    max_batch: int = 4096
+
+    @classmethod
+    def parse(cls, text: str) -> "FsyncPolicy":
+        # "always" | "none" | "batch" | "batch(5ms)" | "batch(64)" | "batch(5ms,64)"
+        t = (text or "").strip().lower().replace(" ", "")
+        if t == "always":
+            return cls(fsync=True)
+        if t == "none":
+            return cls(fsync=False)
+        m = re.fullmatch(r"batch(?:\((.*)\))?", t)
+        if not m:
+            raise ValueError(f"Unknown fsync policy: {text!r}")
+        window_ms, max_batch = DEFAULT_BATCH_MS, DEFAULT_BATCH_SIZE
+        try:
+            for part in filter(None, (m.group(1) or "").split(",")):
+                if part.endswith("ms"):
+                    window_ms = float(part[:-2])
+                else:
+                    max_batch = int(part)
+        except ValueError:
+            raise ValueError(f"Unknown fsync policy: {text!r}") from None
+        if window_ms < 0 or max_batch < 1:
+            raise ValueError(f"Unknown fsync policy: {text!r}")
+        return cls(fsync=True, window_ms=window_ms, max_batch=max_batch)
+
+
+class _Pending:
+    __slots__ = ("item", "done", "result", "error")
+
+    def __init__(self, item: Any) -> None:
+        self.item = item
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommitWriter:
+    # Background thread that drains submitted items in batches. `write_batch`
+    # appends a batch and returns one outcome per item (a result, or the
+    # exception that item raised) plus the fd it wrote to (-1 if the storage
+    # commits durably itself); the writer then fsyncs it once per batch (per
+    # the policy) and releases every waiter.
+
+    def __init__(self, policy: FsyncPolicy, write_batch: Callable[[List[Any]], Tuple[List[Any], int]]) -> None:
+        self.policy = policy
+        self._write_batch = write_batch
+        self._cond = threading.Condition()
+        self._queue: List[_Pending] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="pat-ledger-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Any:
+        p = _Pending(item)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Ledger writer is closed")
+            self._queue.append(p)
+            self._cond.notify()
+        p.done.wait()
+        if p.error is not None:
+            raise p.error
+        return p.result
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _next_batch(self) -> Optional[List[_Pending]]:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            if self.policy.window_ms > 0:
+                deadline = time.monotonic() + self.policy.window_ms / 1000.0
+                while len(self._queue) < self.policy.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            batch = self._queue[: self.policy.max_batch]
+            del self._queue[: self.policy.max_batch]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                outcomes, fd = self._write_batch([p.item for p in batch])
+                if self.policy.fsync and fd >= 0:
+                    os.fsync(fd)
+                for p, outcome in zip(batch, outcomes):
+                    if isinstance(outcome, BaseException):
+                        p.error = outcome
+                    else:
+                        p.result = outcome
+            except BaseException as e:
+                for p in batch:
+                    p.error = e
+            for p in batch:
+                p.done.set()
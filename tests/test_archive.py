@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+import pat.archive as archive
+from pat.config import DEFAULT_POLICY, SEGMENTS_DIR
+from pat.ledger import (
+    archive_segments,
+    find_latest_by_event_id,
+    merkle_root,
+    read_all_receipts,
+    rebuild_event_index,
+    rebuild_merkle_tree,
+    reset_log,
+    rotate_segment,
+    tail_receipts,
+    verify_ledger,
+)
+from pat.parallel import verify_ledger_parallel
+from pat.receipt import append_new_receipts
+from pat.replay import replay_all
+from pat.segments import load_manifests
+
+
+def _items(n: int, tag: str):
+    return [
+        {
+            "prompt": f"{tag} {i} " + "repeated context " * 20,
+            "model_output_raw": f"confidence: 0.{80 + i % 20}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN")[i % 2],
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(n)
+    ]
+
+
+def _pages():
+    seen, cursor = [], None
+    while True:
+        page, cursor = tail_receipts(7, before=cursor)
+        seen.extend(page)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_archived_segments_read_and_verify_by_block(tmp_path, monkeypatch, codec):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    first = append_new_receipts(_items(30, "a"), policy=DEFAULT_POLICY)
+    rotate_segment()
+    append_new_receipts(_items(20, "b"), policy=DEFAULT_POLICY)
+    rotate_segment()
+    append_new_receipts(_items(5, "c"), policy=DEFAULT_POLICY)
+
+    receipts = read_all_receipts()
+    pages = _pages()
+    root = merkle_root()
+    plain = sum(m.size for m in load_manifests(SEGMENTS_DIR))
+
+    archived = archive_segments(codec=codec, block_bytes=4096)
+    assert [m.compression for m in archived] == [codec, codec]
+    assert sum(os.path.getsize(m.path) for m in archived) < plain / 3
+    assert not any(name.endswith(".jsonl") for name in os.listdir(SEGMENTS_DIR))
+
+    decompressed = []
+    real = archive._decompress
+    monkeypatch.setattr(archive, "_decompress", lambda c, data: decompressed.append(c) or real(c, data))
+
+    archive._blocks.clear()
+    rebuild_event_index()
+    assert decompressed == []  # answered from the archive's block index
+    assert find_latest_by_event_id(first[17]["event_id"]) == first[17]
+    assert len(decompressed) == 1
+    assert verify_ledger(full=True, trust_sealed=True) == (True, [])
+    assert len(decompressed) == 1  # trusted archives are checked by file hash
+
+    assert read_all_receipts() == receipts
+    assert _pages() == pages
+    rebuild_merkle_tree()
+    assert merkle_root() == root
+    assert verify_ledger(full=True, trust_sealed=False) == (True, [])
+    assert verify_ledger_parallel(workers=2, chunk_bytes=4096) == (True, [])
+    assert replay_all(DEFAULT_POLICY, workers=1).matched == len(receipts)
+
+    path = archived[0].path
+    with open(path, "r+b") as f:
+        f.seek(100)
+        byte = f.read(1)
+        f.seek(100)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    ok, errors = verify_ledger(full=True, trust_sealed=True)
+    assert not ok and errors[0].startswith("Segment 1: sha256 mismatch")
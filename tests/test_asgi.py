@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import asgi
+from pat.config import DEFAULT_POLICY
+from pat.ledger import reset_log
+from pat.receipt import append_new_receipts
+
+
+async def _get(path: str, query: bytes = b""):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app({"type": "http", "method": "GET", "path": path, "query_string": query}, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_read_endpoints_concurrently(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    item = {
+        "prompt": "p",
+        "model_output_raw": "confidence: 0.92",
+        "proposed_action_type": "NOTIFY",
+        "proposed_action_target": "X",
+        "proposed_action_params": {},
+        "confidence_override": None,
+    }
+    receipts = append_new_receipts([item] * 5, policy=DEFAULT_POLICY)
+    eid = receipts[2]["event_id"]
+
+    async def run():
+        return await asyncio.gather(
+            *[_get("/verify") for _ in range(20)],
+            _get("/events"),
+            _get(f"/event/{eid}"),
+            _get(f"/receipt/{eid}.json"),
+            _get("/event/nope"),
+            _get("/events", b"before=3"),
+        )
+
+    results = asyncio.run(run())
+    assert all(r == (200, {"ok": True, "errors": [], "truncated": False, "records": 5, "full": False}) for r in results[:20])
+    status, events = results[20]
+    assert status == 200 and [e["event_id"] for e in events["events"]] == [r["event_id"] for r in receipts[::-1]]
+    assert results[21] == (200, {"receipt": receipts[2], "signature_verified": False})
+    assert results[22] == (200, receipts[2])
+    assert results[23][0] == 404
+    assert results[24] == (400, {"error": "Invalid cursor."})
+    assert not asgi._inflight
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pytest
+
+from pat.config import DEFAULT_POLICY
+from pat.ledger import configure_writer, get_ledger_head, read_all_receipts, reset_log, verify_ledger
+from pat.receipt import append_new_receipt, append_new_receipts
+
+
+def _item(i: int):
+    return {
+        "prompt": f"p{i}",
+        "model_output_raw": "confidence: 0.92",
+        "proposed_action_type": "NOTIFY",
+        "proposed_action_target": "X",
+        "proposed_action_params": {"i": i},
+        "confidence_override": None,
+    }
+
+
+@pytest.mark.parametrize("policy", [None, "batch(1ms)"])
+def test_batch_is_chained_in_order_in_one_append(tmp_path, monkeypatch, policy):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    configure_writer(policy)
+    try:
+        first = append_new_receipt(**_item(0), policy=DEFAULT_POLICY)
+        items = [_item(i) for i in range(1, 6)]
+        items[2]["bogus"] = True  # this builder raises; the rest still chain
+        out = append_new_receipts(items, policy=DEFAULT_POLICY)
+    finally:
+        configure_writer(None)
+
+    assert isinstance(out[2], TypeError)
+    written = [first] + [r for r in out if isinstance(r, dict)]
+    assert read_all_receipts() == written
+    ids = [r["event_id"] for r in written]
+    assert ids == sorted(ids) and len(set(ids)) == 5
+    assert get_ledger_head().count == 5
+    assert verify_ledger(full=True) == (True, [])
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import copy
+
+from pat.config import DEFAULT_POLICY
+from pat.hashing import CanonicalReceipt, canonical_json, receipt_canonical_payload, sha256_hex
+from pat.keys import ensure_demo_approver
+from pat.receipt import build_approval_transition, build_new_receipt
+
+
+def _legacy_hash(r):
+    return "sha256:" + sha256_hex(canonical_json(receipt_canonical_payload(r)).encode("utf-8"))
+
+
+def test_single_pass_encoding_matches_canonical_json(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    r = build_new_receipt(
+        prompt="ünïcødé \"quoted\" \n line",
+        model_output_raw="confidence: 0.92",
+        proposed_action_type="LOCKDOWN",
+        proposed_action_target="SCHOOL_12",
+        proposed_action_params={"b": [1, 2.5, None], "a": {"z": True}},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+    )
+    before = copy.deepcopy(r)
+    approved = build_approval_transition(r, approver_id=ensure_demo_approver(), policy=DEFAULT_POLICY)
+    assert r == before  # the transition copies what it rewrites
+
+    odd = dict(r, integrity="not-a-dict", approval=None, extra={"verified_at": 1})
+    odd["integrity_verified_at"] = 2
+    for receipt in (r, approved, odd, {}):
+        enc = CanonicalReceipt(receipt)
+        assert enc.canonical_hash() == _legacy_hash(receipt)
+        assert enc.line() == (canonical_json(receipt) + "\n").encode("utf-8")
+
+    assert r["integrity"]["canonical_hash"] == _legacy_hash(r)
+    assert approved["integrity"]["canonical_hash"] == _legacy_hash(approved)
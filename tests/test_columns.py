@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import math
+
+from pat.cli import main
+from pat.columns import ColumnStore
+from pat.config import COLUMNS_DIR, DEFAULT_POLICY, LOG_PATH
+from pat.ledger import (
+    _invalidate_column_store,
+    column_store,
+    count_receipts,
+    invalidate_ledger_head,
+    iter_receipts,
+    reset_log,
+    rotate_segment,
+)
+from pat.receipt import append_new_receipts
+
+
+def _items(n: int):
+    return [
+        {
+            "prompt": "x" * 500,
+            "model_output_raw": "no score" if i % 5 == 0 else f"confidence: 0.{70 + i % 30}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN", "LOG_ONLY")[i % 3],
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(n)
+    ]
+
+
+def _expected(**equals):
+    counts = {}
+    for r in iter_receipts():
+        if any(r[k]["type" if k == "proposed_action" else "result"] != v for k, v in equals.items()):
+            continue
+        key = (r["proposed_action"]["type"], r["decision"]["result"])
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def test_columns_follow_appends_and_other_processes(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    append_new_receipts(_items(20), policy=DEFAULT_POLICY)
+    rotate_segment()
+    append_new_receipts(_items(10), policy=DEFAULT_POLICY)
+
+    store = column_store()
+    assert store.rows == 30
+    receipts = list(iter_receipts(with_offsets=True))
+    assert list(store.column("offset")) == [o for o, _ in receipts]
+    conf = [r["model_output"]["effective_confidence"] for _, r in receipts]
+    assert [None if math.isnan(c) else c for c in store.column("confidence")] == conf
+    assert count_receipts() == _expected()
+    assert count_receipts(by=("decision",), action="LOCKDOWN") == {
+        (k[1],): v for k, v in _expected().items() if k[0] == "LOCKDOWN"
+    }
+    assert count_receipts(action="DISPATCH_POLICE") == {}
+    assert count_receipts(since=2**40) == {}
+
+    # Another process's view: it loads the sidecar from disk, catches up the
+    # rows it does not have, and appends through the shared files.
+    _invalidate_column_store()
+    append_new_receipts(_items(5), policy=DEFAULT_POLICY)
+    assert column_store().rows == 35 and count_receipts() == _expected()
+    other = ColumnStore.load(COLUMNS_DIR)
+    assert other.rows == 35 and other.dicts == column_store().dicts
+
+    # Torn sidecar write: a partial row is dropped and refilled from the log.
+    with open(f"{COLUMNS_DIR}/ts.col", "ab") as f:
+        f.write(b"\x01\x02\x03")
+    _invalidate_column_store()
+    assert column_store().rows == 35
+
+    # Rewriting the last record invalidates the sidecar.
+    with open(LOG_PATH, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    r = json.loads(lines[-1])
+    r["decision"]["result"] = "PERMITTED" if r["decision"]["result"] == "BLOCKED" else "BLOCKED"
+    lines[-1] = json.dumps(r, separators=(",", ":")) + "\n"
+    with open(LOG_PATH, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    invalidate_ledger_head()
+    _invalidate_column_store()
+    assert count_receipts() == _expected()
+
+    assert main(["counts", "--by", "decision", "--action", "LOCKDOWN"]) == 0
+    out = capsys.readouterr().out
+    assert f"{sum(_expected(proposed_action='LOCKDOWN').values()):>10}  total" in out
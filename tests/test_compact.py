@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import pytest
+
+import pat.compact as compact
+from pat.cli import main
+from pat.compact import (
+    MAGIC,
+    decode_records,
+    encode_record,
+    export_compact,
+    iter_compact,
+    jsonl_to_compact,
+    verify_file,
+    write_compact,
+)
+from pat.config import DEFAULT_POLICY, LOG_PATH
+from pat.hashing import canonical_json
+from pat.keys import ensure_demo_approver
+from pat.ledger import iter_receipts, reset_log, rotate_segment
+from pat.receipt import append_approval_transition, append_new_receipts
+
+
+def test_values_round_trip_exactly():
+    values = [
+        None, True, False, 0, 1, -1, 2**70, -(2**70), 1.0, -0.0, 0.1, 1e300, "",
+        "ünïcødé ✓", "\ud800", "sha256:" + "ab" * 32, "sha256:" + "AB" * 32,
+        "2026-10-17T01:37:45Z", "2026-02-30T00:00:00Z", "1969-12-31T23:59:59Z", "BLOCKED",
+        {"nested": [{"a": [1, 2.5, None]}], "type": "LOCKDOWN"}, [],
+    ]
+    for v in values:
+        (got,) = decode_records(MAGIC + encode_record(v))
+        assert canonical_json(got) == canonical_json(v) and type(got) is type(v)
+    with pytest.raises(ValueError):
+        encode_record({1: "x"})
+    with pytest.raises(ValueError, match="Truncated"):
+        list(decode_records(MAGIC + encode_record({"a": "b" * 50})[:-3]))
+
+
+def test_export_verifies_and_converts_back(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    approver_id = ensure_demo_approver()
+    items = [
+        {
+            "prompt": f"prompt {i} ✓",
+            "model_output_raw": f"confidence: 0.{80 + i}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN")[i % 2],
+            "proposed_action_target": "SCHOOL_12",
+            "proposed_action_params": {"zone": i, "radius_m": 12.5, "tags": ["a", None]},
+            "confidence_override": None,
+        }
+        for i in range(6)
+    ]
+    receipts = append_new_receipts(items, policy=DEFAULT_POLICY)
+    rotate_segment()
+    append_approval_transition(receipts[1], approver_id=approver_id, policy=DEFAULT_POLICY)
+
+    export_compact("ledger.patb")
+    decoded = list(iter_compact("ledger.patb"))
+    assert [canonical_json(r) for r in decoded] == [canonical_json(r) for r in iter_receipts()]
+    assert verify_file("ledger.patb") == (True, [])
+
+    assert main(["convert", "ledger.patb", "roundtrip.jsonl"]) == 0
+    with open(LOG_PATH, "rb") as f:
+        active = f.read()
+    with open("roundtrip.jsonl", "rb") as f:
+        assert f.read().endswith(active)
+
+    jsonl_to_compact("roundtrip.jsonl", "again.patb")
+    with open("ledger.patb", "rb") as a, open("again.patb", "rb") as b:
+        assert a.read() == b.read()
+
+    tampered = decoded[2]
+    tampered["decision"]["reason"] = "edited"
+    with open("tampered.patb", "wb") as f:
+        f.write(MAGIC + b"".join(encode_record(r) for r in decoded))
+    ok, errors = verify_file("tampered.patb")
+    assert not ok and errors[0].startswith("Line 3: canonical_hash mismatch")
+
+    assert main(["verify", "--file", "ledger.patb"]) == 0
+    assert "VERIFIED" in capsys.readouterr().out
+
+
+def test_files_decode_in_small_chunks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [{"n": i, "pad": "x" * (i * 37 % 300), "h": "sha256:" + "ab" * 32} for i in range(60)]
+    with open("small.patb", "wb") as f:
+        write_compact(f, records)
+    monkeypatch.setattr(compact, "COMPACT_READ_BYTES", 7)
+    assert list(iter_compact("small.patb")) == records
+
+    with open("small.patb", "rb") as f:
+        data = f.read()
+    with open("cut.patb", "wb") as f:
+        f.write(data[:-5])
+    with pytest.raises(ValueError, match="Truncated"):
+        list(iter_compact("cut.patb"))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+
+from pat.config import DEFAULT_POLICY, INDEX_PATH, LOG_PATH
+from pat.hashing import canonical_json
+from pat.keys import ensure_demo_approver
+from pat.ledger import (
+    append_receipt,
+    find_latest_by_event_id,
+    rebuild_event_index,
+    reset_log,
+    tamper_last_log_line,
+)
+from pat.receipt import build_approval_transition, build_new_receipt
+
+
+def _new(action_type: str = "NOTIFY"):
+    return build_new_receipt(
+        prompt="p",
+        model_output_raw="confidence: 0.92",
+        proposed_action_type=action_type,
+        proposed_action_target="X",
+        proposed_action_params={},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+    )
+
+
+def test_lookup_returns_newest_receipt_for_event(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    approver_id = ensure_demo_approver()
+
+    r1 = _new("LOCKDOWN")
+    append_receipt(r1)
+    append_receipt(_new())
+    approved = build_approval_transition(r1, approver_id=approver_id, policy=DEFAULT_POLICY)
+    append_receipt(approved)
+
+    found = find_latest_by_event_id(r1["event_id"])
+    assert found == approved
+    assert find_latest_by_event_id("nope") is None
+    assert os.path.getsize(INDEX_PATH) > 0
+
+
+def test_index_catches_up_and_survives_rewrites(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    r1 = _new()
+    append_receipt(r1)
+    assert find_latest_by_event_id(r1["event_id"]) == r1
+
+    # Outside writer, then a lost sidecar.
+    r2 = _new()
+    r2["event_id"] = "outside"
+    with open(LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(canonical_json(r2) + "\n")
+    assert find_latest_by_event_id("outside") == r2
+
+    os.remove(INDEX_PATH)
+    rebuild_event_index()
+    assert find_latest_by_event_id(r1["event_id"]) == r1
+
+    ok, _ = tamper_last_log_line()
+    assert ok
+    assert "[TAMPERED]" in find_latest_by_event_id("outside")["decision"]["reason"]
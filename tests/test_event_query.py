@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import replace
+
+import pytest
+
+import app as web
+import asgi
+import pat.ledger as ledger
+from pat.config import COLUMNS_DIR, DEFAULT_POLICY
+from pat.hashing import compute_canonical_hash, compute_this_hash
+from pat.keys import ensure_demo_approver
+from pat.ledger import (
+    _invalidate_column_store,
+    append_chained,
+    column_store,
+    configure_storage,
+    count_receipts,
+    iter_receipts,
+    reset_log,
+    rotate_segment,
+    tail_receipts,
+)
+from pat.query import EventFilter
+from pat.receipt import append_approval_transition, append_new_receipts, build_new_receipt
+
+FILTERS = [
+    EventFilter(decision="BLOCKED"),
+    EventFilter(decision="BLOCKED", action_type="DISPATCH_POLICE"),
+    EventFilter(action_type="NOTIFY", policy_version="v-next"),
+    EventFilter(approved=True),
+    EventFilter(approval_required=True, approved=False),
+    EventFilter(approver_id="nobody"),
+    EventFilter(decision="PERMITTED", since="2000-01-01T00:00:00Z"),
+    EventFilter(until="2000-01-01T00:00:00Z"),
+]
+
+
+def _items(n: int, tag: str):
+    return [
+        {
+            "prompt": f"{tag} {i}",
+            "model_output_raw": f"confidence: 0.{60 + i % 40}",
+            "proposed_action_type": ("NOTIFY", "DISPATCH_POLICE", "LOCKDOWN", "LOG_ONLY")[i % 4],
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(n)
+    ]
+
+
+def _matches(r, f: EventFilter) -> bool:
+    approval = r.get("approval") or {}
+    return (
+        (f.decision is None or r["decision"]["result"] == f.decision)
+        and (f.action_type is None or r["proposed_action"]["type"] == f.action_type)
+        and (f.approver_id is None or approval.get("approver_id") == f.approver_id)
+        and (f.approval_required is None or bool(approval.get("required")) == f.approval_required)
+        and (f.approved is None or bool(approval.get("approved")) == f.approved)
+        and (f.policy_version is None or r["policy"]["version"] == f.policy_version)
+        and (f.since is None or r["ts_utc"] >= f.since)
+        and (f.until is None or r["ts_utc"] < f.until)
+    )
+
+
+def _all_pages(where: EventFilter, size: int = 4):
+    seen, cursor = [], None
+    while True:
+        page, cursor = tail_receipts(size, before=cursor, where=where)
+        seen.extend(page)
+        if cursor is None:
+            return seen
+
+
+def _fill():
+    approver = ensure_demo_approver()
+    receipts = append_new_receipts(_items(30, "a"), policy=DEFAULT_POLICY)
+    for r in receipts[1:12:4]:
+        append_approval_transition(r, approver_id=approver, policy=DEFAULT_POLICY)
+    append_new_receipts(_items(12, "b"), policy=replace(DEFAULT_POLICY, version="v-next"))
+    return approver
+
+
+@pytest.mark.parametrize("storage", [None, "sqlite:ledger.db"])
+def test_filtered_pages_match_a_full_scan(tmp_path, monkeypatch, storage):
+    monkeypatch.chdir(tmp_path)
+    configure_storage(storage)
+    try:
+        reset_log()
+        approver = _fill()
+        if storage is None:
+            rotate_segment()
+        append_new_receipts(_items(9, "c"), policy=DEFAULT_POLICY)
+
+        everything = list(iter_receipts(reverse=True, with_offsets=True))
+        for where in FILTERS + [EventFilter(approver_id=approver, decision="PERMITTED")]:
+            expected = [(o, r) for o, r in everything if _matches(r, where)]
+            assert _all_pages(where) == expected, where
+        assert _all_pages(EventFilter(approved=True))
+    finally:
+        configure_storage(None)
+
+
+def test_postings_extend_on_append_and_survive_a_torn_flush(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    where = EventFilter(decision="BLOCKED", action_type="DISPATCH_POLICE")
+    append_new_receipts(_items(20, "a"), policy=DEFAULT_POLICY)
+    first, _ = tail_receipts(100, where=where)
+
+    append_new_receipts(_items(20, "b"), policy=DEFAULT_POLICY)
+    second, _ = tail_receipts(100, where=where)
+    assert len(second) == 2 * len(first) > 0
+
+    # A writer that died after the posting lists but before the offset
+    # column: those rows are dropped and re-added from the log once.
+    path = os.path.join(COLUMNS_DIR, "offset.col")
+    os.truncate(path, os.path.getsize(path) - 8 * 5)
+    _invalidate_column_store()
+    expected = [(o, r) for o, r in iter_receipts(reverse=True, with_offsets=True) if _matches(r, where)]
+    assert tail_receipts(100, where=where)[0] == expected
+
+
+def test_filter_params():
+    f = EventFilter.from_params({"decision": "blocked", "approved": "0", "since": "2026-01-21", "policy": ""})
+    assert f == EventFilter(decision="BLOCKED", approved=False, since="2026-01-21T00:00:00Z")
+    assert EventFilter.from_params(f.as_params()) == f
+    assert EventFilter.from_params({}).is_empty()
+    for bad in ({"approved": "maybe"}, {"since": "yesterday"}):
+        with pytest.raises(ValueError):
+            EventFilter.from_params(bad)
+
+
+async def _get(path: str, query: bytes = b""):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app({"type": "http", "method": "GET", "path": path, "query_string": query}, receive, send)
+    return sent[0]["status"]
+
+
+def test_asgi_events_filters(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    append_new_receipts(_items(8, "a"), policy=DEFAULT_POLICY)
+    body = asgi._events(None, EventFilter(action_type="LOCKDOWN"))
+    assert [e["action"] for e in body["events"]] == ["LOCKDOWN", "LOCKDOWN"]
+    flask = web.app.test_client().get("/api/events?action=LOCKDOWN")
+    assert json.loads(flask.data) == body
+    assert asyncio.run(_get("/events", b"decision=BLOCKED&action=lockdown")) == 200
+    assert asyncio.run(_get("/events", b"since=not-a-time")) == 400
+
+
+def _backfilled(i: int, ts: str, head):
+    r = build_new_receipt(**_items(i + 1, "old")[i], policy=DEFAULT_POLICY, head=head)
+    r["ts_utc"] = ts
+    integrity = r["integrity"]
+    integrity["canonical_hash"] = compute_canonical_hash(r)
+    integrity["this_hash"] = compute_this_hash(integrity["prev_hash"], integrity["canonical_hash"])
+    return r
+
+
+def test_time_windows_bound_the_walk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ledger, "TIME_INDEX_BLOCK_BYTES", 2048)
+    reset_log()
+    # Locally out of time order, as backfills and approval transitions make it.
+    for i in range(60):
+        ts = f"2026-01-{1 + (i ^ 3) * 27 // 60:02d}T{i % 24:02d}:00:00Z"
+        append_chained(lambda head, i=i, ts=ts: _backfilled(i, ts, head))
+    append_new_receipts(_items(10, "new"), policy=DEFAULT_POLICY)
+
+    everything = list(iter_receipts(reverse=True, with_offsets=True))
+    windows = [
+        EventFilter(since="2026-01-20T00:00:00Z"),
+        EventFilter(since="2026-01-10T00:00:00Z", until="2026-01-15T00:00:00Z"),
+        EventFilter(decision="BLOCKED", since="2026-01-27T00:00:00Z"),
+        EventFilter(until="2026-01-03T00:00:00Z"),
+        EventFilter(since="2100-01-01T00:00:00Z"),
+        EventFilter(decision="BLOCKED", since="2100-01-01T00:00:00Z"),
+    ]
+    for where in windows:
+        expected = [(o, r) for o, r in everything if _matches(r, where)]
+        assert _all_pages(where) == expected, where
+        counts = {}
+        for _, r in expected:
+            key = (r["proposed_action"]["type"], r["decision"]["result"])
+            counts[key] = counts.get(key, 0) + 1
+        since, until = where.epoch_range()
+        assert count_receipts(since=since, until=until, **where.column_equals()) == counts, where
+
+    store = column_store()
+    future = EventFilter(since="2100-01-01T00:00:00Z").epoch_range()[0]
+    assert store.first_since(future) == store.rows
+    assert store.first_since(EventFilter(since="2026-01-27T00:00:00Z").epoch_range()[0]) > 0
+    # A narrow window only reaches the rows of the time index's matching blocks.
+    since, until = EventFilter(since="2026-01-10T00:00:00Z", until="2026-01-11T00:00:00Z").epoch_range()
+    with ledger.ledger_lock():
+        spans = store.row_ranges(ledger._time_ranges(since, until))
+    assert 0 < sum(b - a for a, b in spans) < store.rows // 2
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+import app as web
+import asgi
+from pat.config import DEFAULT_POLICY
+from pat.keys import ensure_demo_approver
+from pat.ledger import reset_log, tamper_last_log_line, verify_ledger
+from pat.receipt import append_approval_transition, append_new_receipts
+
+
+def _items(n: int, action: str = "NOTIFY"):
+    return [
+        {
+            "prompt": f"p{i}",
+            "model_output_raw": "confidence: 0.92",
+            "proposed_action_type": action,
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(n)
+    ]
+
+
+def _counting(monkeypatch, module, name):
+    calls = []
+    real = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, wrapper)
+    return calls
+
+
+def test_flask_pages_revalidate_on_the_ledger_head(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    receipts = append_new_receipts(_items(3), policy=DEFAULT_POLICY)
+    client = web.app.test_client()
+    verifies = _counting(monkeypatch, web, "verify_ledger")
+
+    first = client.get("/verify")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and b"VERIFIED" in first.data
+    assert client.get("/verify").data == first.data
+    assert client.get("/verify", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/verify", headers={"If-None-Match": f'W/{etag}, "x"'}).status_code == 304
+    assert len(verifies) == 1
+    assert "ETag" not in client.get("/verify?full=1").headers
+    assert len(verifies) == 2
+
+    events = client.get("/events?decision=PERMITTED")
+    api = client.get("/api/events")
+    assert json.loads(api.data)["events"][0]["event_id"] == receipts[-1]["event_id"]
+
+    append_new_receipts(_items(1), policy=DEFAULT_POLICY)
+    assert client.get("/verify", headers={"If-None-Match": etag}).status_code == 200
+    assert len(verifies) == 3
+    assert client.get("/events?decision=PERMITTED").headers["ETag"] != events.headers["ETag"]
+    assert len(json.loads(client.get("/api/events").data)["events"]) == 4
+
+    # Rewriting the last line keeps the head's stored hash; still a new tag.
+    etag = client.get("/verify").headers["ETag"]
+    tamper_last_log_line()
+    tampered = client.get("/verify", headers={"If-None-Match": etag})
+    assert tampered.status_code == 200 and b"FAILED" in tampered.data
+
+
+def test_event_pages_follow_their_own_receipt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    approver = ensure_demo_approver()
+    receipt = append_new_receipts(_items(1, "LOCKDOWN"), policy=DEFAULT_POLICY)[0]
+    eid = receipt["event_id"]
+    client = web.app.test_client()
+    renders = _counting(monkeypatch, web, "_render_event")
+
+    page = client.get(f"/event/{eid}")
+    etag = page.headers["ETag"]
+    assert client.get("/event/nope").status_code == 404
+
+    # Other events don't change this one's ETag or force a re-render.
+    append_new_receipts(_items(2), policy=DEFAULT_POLICY)
+    assert client.get(f"/event/{eid}", headers={"If-None-Match": etag}).status_code == 304
+    assert len(renders) == 1
+
+    json_etag = client.get(f"/receipt/{eid}.json").headers["ETag"]
+    append_approval_transition(receipt, approver_id=approver, policy=DEFAULT_POLICY)
+    approved = client.get(f"/event/{eid}", headers={"If-None-Match": etag})
+    assert approved.status_code == 200 and approved.headers["ETag"] != etag
+    assert b"Signature verified: <b>True" in approved.data
+    assert client.get(f"/receipt/{eid}.json").headers["ETag"] != json_etag
+    assert len(renders) == 2
+
+
+async def _get(path: str, etag: str = ""):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    await asgi.app({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers}, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"]).get(b"etag", b"").decode(), sent[1]["body"]
+
+
+def test_asgi_conditional_gets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    eid = append_new_receipts(_items(2), policy=DEFAULT_POLICY)[0]["event_id"]
+    verifies = _counting(monkeypatch, asgi, "verify_ledger")
+
+    status, etag, body = asyncio.run(_get("/verify"))
+    assert status == 200 and json.loads(body)["ok"]
+    assert asyncio.run(_get("/verify", etag)) == (304, etag, b"")
+    assert len(verifies) == 1
+
+    status, event_etag, _ = asyncio.run(_get(f"/event/{eid}"))
+    append_new_receipts(_items(1), policy=DEFAULT_POLICY)
+    assert asyncio.run(_get(f"/event/{eid}", event_etag))[0] == 304
+    assert asyncio.run(_get("/verify", etag))[0] == 200
+    assert asyncio.run(_get("/event/nope"))[:2] == (404, "")
+
+
+def test_verify_page_caps_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(web, "VERIFY_MAX_ERRORS", 2)
+    reset_log()
+    append_new_receipts(_items(6), policy=DEFAULT_POLICY)
+    with open("pat_log.jsonl", "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    with open("pat_log.jsonl", "w", encoding="utf-8") as f:
+        f.writelines(line.replace('"p', '"q') for line in lines)
+
+    page = web.app.test_client().get("/verify?full=1")
+    assert b"2+ errors" in page.data and page.data.count(b'badge bad">FAIL</span>') == 2
+    monkeypatch.setattr(asgi, "VERIFY_MAX_ERRORS", 2)
+    assert asgi._verify(True)["truncated"] and len(asgi._verify(True)["errors"]) == 2
+
+    # Exactly as many errors as the cap is not truncated.
+    reset_log()
+    append_new_receipts(_items(3), policy=DEFAULT_POLICY)
+    tamper_last_log_line()
+    n = len(verify_ledger(full=True)[1])
+    monkeypatch.setattr(web, "VERIFY_MAX_ERRORS", n)
+    monkeypatch.setattr(asgi, "VERIFY_MAX_ERRORS", n)
+    page = web.app.test_client().get("/verify?full=1")
+    assert f"{n} errors".encode() in page.data and b"+ errors" not in page.data
+    body = asgi._verify(True)
+    assert len(body["errors"]) == n and not body["truncated"]
+
+
+def test_verify_tag_follows_in_place_edits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    append_new_receipts(_items(3), policy=DEFAULT_POLICY)
+    client = web.app.test_client()
+    etag = client.get("/verify").headers["ETag"]
+    _, asgi_etag, _ = asyncio.run(_get("/verify"))
+
+    # Same length, same head hash: only the file's mtime moves.
+    with open("pat_log.jsonl", "r+b") as f:
+        data = f.read()
+        f.seek(0)
+        f.write(data.replace(b'"p0"', b'"q0"', 1))
+    st = os.stat("pat_log.jsonl")
+    os.utime("pat_log.jsonl", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert os.path.getsize("pat_log.jsonl") == len(data)
+
+    assert client.get("/verify", headers={"If-None-Match": etag}).status_code == 200
+    assert asyncio.run(_get("/verify", asgi_etag))[0] == 200
+    assert b"FAILED" in client.get("/verify?full=1").data
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+
+import app as web
+import pat.ledger as ledger
+from pat.config import DEFAULT_POLICY, LOG_PATH
+from pat.ledger import append_receipt, iter_receipts, read_all_receipts, reset_log, verify_chain, verify_ledger
+from pat.receipt import build_new_receipt
+
+
+def _fill(n: int) -> None:
+    for i in range(n):
+        append_receipt(
+            build_new_receipt(
+                prompt="p" * i,
+                model_output_raw="confidence: 0.92",
+                proposed_action_type="NOTIFY",
+                proposed_action_target="X",
+                proposed_action_params={},
+                confidence_override=None,
+                policy=DEFAULT_POLICY,
+            )
+        )
+
+
+def test_forward_and_reverse_iteration_agree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ledger, "READ_BLOCK_BYTES", 97)
+    reset_log()
+    _fill(12)
+    with open(LOG_PATH, "a", encoding="utf-8") as f:
+        f.write("\n")
+
+    forward = list(iter_receipts(with_offsets=True))
+    backward = list(iter_receipts(reverse=True, with_offsets=True))
+    assert backward == forward[::-1]
+    assert [r for _, r in forward] == read_all_receipts()
+
+    offset, r = forward[4]
+    assert list(iter_receipts(start_offset=offset))[0] == r
+    assert list(iter_receipts(end_offset=offset, reverse=True))[0] == forward[3][1]
+
+
+def test_error_limit_stops_early(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _fill(10)
+    with open(LOG_PATH, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    with open(LOG_PATH, "w", encoding="utf-8") as f:
+        for r in rows:
+            r["integrity"]["prev_hash"] = "sha256:bad"
+            f.write(json.dumps(r) + "\n")
+
+    ok, errors = verify_chain(iter_receipts(), max_errors=3)
+    assert not ok and len(errors) == 3
+    ok, errors = verify_ledger(full=True, max_errors=1)
+    assert not ok and len(errors) == 1
+
+
+def test_tail_pages_walk_back_to_genesis(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _fill(7)
+    everything = read_all_receipts()[::-1]
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = ledger.tail_receipts(3, before=cursor)
+        seen.extend(r for _, r in page)
+        if cursor is None:
+            break
+        assert ledger.is_record_boundary(cursor)
+    assert seen == everything
+    assert not ledger.is_record_boundary(5)
+
+
+def test_newest_first_reads_skip_a_half_written_line(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ledger, "READ_BLOCK_BYTES", 97)
+    reset_log()
+    _fill(5)
+    newest = read_all_receipts()[::-1]
+    with open(LOG_PATH, "ab") as f:
+        f.write(b'{"event_id":"2026-')
+
+    page, cursor = ledger.tail_receipts(3)
+    assert [r for _, r in page] == newest[:3] and cursor is not None
+    assert [r for r in iter_receipts(reverse=True)] == newest
+
+    events = json.loads(web.app.test_client().get("/api/events").data)["events"]
+    assert [e["event_id"] for e in events] == [r["event_id"] for r in newest]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pat.keys as keys
+from pat.config import KEYRING_PATH
+from pat.keys import (
+    ensure_demo_approver,
+    get_public_key_b64,
+    load_keyring,
+    new_approver_keypair,
+    sign_with_approver,
+    verify_signature,
+)
+
+
+def test_public_keys_are_decoded_once_until_the_keyring_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    approver_id = ensure_demo_approver()
+    sig = sign_with_approver(approver_id, "msg")
+
+    decodes = []
+    real = keys._b64_to_pubkey
+    monkeypatch.setattr(keys, "_b64_to_pubkey", lambda b64: decodes.append(b64) or real(b64))
+
+    for _ in range(5):
+        assert verify_signature(approver_id, "msg", sig)
+    assert not verify_signature(approver_id, "other", sig)
+    assert len(decodes) == 1
+
+    new_approver_keypair("a.other")
+    assert get_public_key_b64("a.other")
+    assert verify_signature(approver_id, "msg", sig)
+    assert len(decodes) == 2  # keyring was replaced, cache rebuilt
+
+    # Rotating the key behind the app's back (same path, rewritten in place)
+    # is picked up from the file's stat.
+    kr = load_keyring()
+    kr["keys"][approver_id]["public_key_b64"] = kr["keys"]["a.other"]["public_key_b64"]
+    with open(KEYRING_PATH, "w", encoding="utf-8") as f:
+        f.write(json.dumps(kr) + " ")
+    st = os.stat(KEYRING_PATH)
+    os.utime(KEYRING_PATH, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert not verify_signature(approver_id, "msg", sig)
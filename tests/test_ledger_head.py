@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pat.config import DEFAULT_POLICY, LOG_PATH
+from pat.hashing import canonical_json
+from pat.ledger import (
+    GENESIS_HASH,
+    append_receipt,
+    get_ledger_head,
+    read_all_receipts,
+    reset_log,
+    verify_chain,
+)
+from pat.receipt import build_new_receipt
+
+
+def _new(prompt: str):
+    return build_new_receipt(
+        prompt=prompt,
+        model_output_raw="confidence: 0.92",
+        proposed_action_type="NOTIFY",
+        proposed_action_target="X",
+        proposed_action_params={},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+    )
+
+
+def test_head_tracks_appends_and_outside_writers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    assert get_ledger_head().count == 0
+    assert get_ledger_head().last_hash == GENESIS_HASH
+
+    r1 = _new("a")
+    append_receipt(r1)
+    r2 = _new("b")
+    append_receipt(r2)
+
+    head = get_ledger_head()
+    assert head.count == 2
+    assert head.last_hash == r2["integrity"]["this_hash"]
+    assert r1["event_id"] < r2["event_id"]
+
+    # Simulate a second process appending behind our back.
+    r3 = _new("c")
+    r3["integrity"]["this_hash"] = "sha256:" + "f" * 64
+    with open(LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(canonical_json(r3) + "\n")
+
+    head = get_ledger_head()
+    assert head.count == 3
+    assert head.last_hash == "sha256:" + "f" * 64
+
+    reset_log()
+    assert get_ledger_head().count == 0
+
+
+def test_chain_built_from_head_verifies(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    for i in range(5):
+        append_receipt(_new(str(i)))
+    ok, errors = verify_chain(read_all_receipts())
+    assert ok, errors
+
+
+def test_head_skips_a_line_still_being_written(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    r1 = _new("a")
+    append_receipt(r1)
+    size = get_ledger_head().size
+
+    # Another process is halfway through its write.
+    line = (canonical_json(_new("b")) + "\n").encode("utf-8")
+    with open(LOG_PATH, "ab") as f:
+        f.write(line[:40])
+    head = get_ledger_head()
+    assert (head.count, head.size, head.last_hash) == (1, size, r1["integrity"]["this_hash"])
+
+    with open(LOG_PATH, "ab") as f:
+        f.write(line[40:])
+    head = get_ledger_head()
+    assert (head.count, head.size) == (2, size + len(line))
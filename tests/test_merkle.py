@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import pat.ledger as ledger
+from pat.config import DEFAULT_POLICY
+from pat.ledger import (
+    consistency_proof,
+    inclusion_proof,
+    merkle_root,
+    reset_log,
+    rotate_segment,
+)
+from pat.merkle import (
+    EMPTY_ROOT,
+    MerkleTree,
+    decode_hash,
+    leaf_hash,
+    node_hash,
+    receipt_leaf_hash,
+    verify_consistency,
+    verify_inclusion,
+)
+from pat.receipt import append_new_receipt
+
+
+def _reference_root(leaves):
+    if not leaves:
+        return EMPTY_ROOT
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return node_hash(_reference_root(leaves[:k]), _reference_root(leaves[k:]))
+
+
+def test_proofs_match_rfc6962_for_every_size(tmp_path):
+    leaves = [leaf_hash(str(i).encode()) for i in range(17)]
+    tree = MerkleTree(str(tmp_path / "m.bin"))
+    tree.append([(i, i + 1, leaf) for i, leaf in enumerate(leaves)])
+
+    for n in range(len(leaves) + 1):
+        root = tree.root(n)
+        assert root == _reference_root(leaves[:n])
+        for m in range(n):
+            assert verify_inclusion(leaves[m], m, n, tree.inclusion_proof(m, n), root)
+            assert not verify_inclusion(leaf_hash(b"other"), m, n, tree.inclusion_proof(m, n), root)
+        for m in range(n + 1):
+            assert verify_consistency(m, n, tree.root(m), root, tree.consistency_proof(m, n))
+            if 0 < m < n:
+                assert not verify_consistency(m, n, leaf_hash(b"x"), root, tree.consistency_proof(m, n))
+
+    reloaded = MerkleTree.load(tree.path)
+    assert reloaded.root() == tree.root() and reloaded.offsets == tree.offsets
+
+
+def _append(prompt: str):
+    return append_new_receipt(
+        prompt=prompt,
+        model_output_raw="confidence: 0.92",
+        proposed_action_type="NOTIFY",
+        proposed_action_target="X",
+        proposed_action_params={},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+    )
+
+
+def _check_inclusion(p):
+    return verify_inclusion(
+        decode_hash(p["leaf_hash"]),
+        p["leaf_index"],
+        p["tree_size"],
+        [decode_hash(h) for h in p["audit_path"]],
+        decode_hash(p["root_hash"]),
+    )
+
+
+def test_ledger_proofs_survive_appends_rotation_and_reload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    receipts = [_append(f"p{i}") for i in range(6)]
+    old = merkle_root()
+    assert old["tree_size"] == 6
+
+    rotate_segment()
+    receipts += [_append(f"q{i}") for i in range(5)]
+
+    p = inclusion_proof(receipts[3]["event_id"])
+    assert p["leaf_index"] == 3 and p["tree_size"] == 11
+    assert decode_hash(p["leaf_hash"]) == receipt_leaf_hash(receipts[3]["integrity"]["canonical_hash"])
+    assert _check_inclusion(p)
+    assert _check_inclusion(inclusion_proof(receipts[3]["event_id"], tree_size=4))
+    assert inclusion_proof(receipts[8]["event_id"], tree_size=4) is None
+    assert inclusion_proof("missing") is None
+
+    c = consistency_proof(old["tree_size"])
+    assert c["first_root"] == old["root_hash"]
+    assert verify_consistency(
+        c["first"],
+        c["second"],
+        decode_hash(c["first_root"]),
+        decode_hash(c["second_root"]),
+        [decode_hash(h) for h in c["proof"]],
+    )
+
+    # A fresh process picks the tree up from the sidecar plus the log tail.
+    root = merkle_root()
+    monkeypatch.setattr(ledger, "_merkle", None)
+    receipts.append(_append("r"))
+    assert merkle_root(11) == root
+    assert _check_inclusion(inclusion_proof(receipts[-1]["event_id"]))
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import multiprocessing
+
+import pytest
+
+from pat.config import DEFAULT_POLICY
+from pat.ledger import get_ledger_head, read_all_receipts, reset_log, verify_ledger
+from pat.receipt import append_new_receipt
+
+
+def _worker(n: int) -> None:
+    for i in range(n):
+        append_new_receipt(
+            prompt=f"w{i}",
+            model_output_raw="confidence: 0.92",
+            proposed_action_type="NOTIFY",
+            proposed_action_target="X",
+            proposed_action_params={},
+            confidence_override=None,
+            policy=DEFAULT_POLICY,
+        )
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_processes_share_one_chain(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    get_ledger_head()  # parent holds a cached head across the fork
+
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_worker, args=(15,)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    assert verify_ledger(full=True) == (True, [])
+    receipts = read_all_receipts()
+    assert len(receipts) == 60 == get_ledger_head().count
+    assert len({r["event_id"] for r in receipts}) == 60
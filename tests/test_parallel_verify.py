@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import os
+
+from pat.config import DEFAULT_POLICY, LOG_PATH
+from pat.ledger import append_receipt, reset_log, verify_ledger
+from pat.parallel import _verify_chunk, verify_ledger_parallel
+from pat.receipt import build_new_receipt
+
+
+def _fill(n: int) -> None:
+    for i in range(n):
+        append_receipt(
+            build_new_receipt(
+                prompt=f"p{i}",
+                model_output_raw="confidence: 0.92",
+                proposed_action_type="NOTIFY",
+                proposed_action_target="X",
+                proposed_action_params={},
+                confidence_override=None,
+                policy=DEFAULT_POLICY,
+            )
+        )
+
+
+def test_parallel_matches_serial_on_clean_ledger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _fill(40)
+    assert verify_ledger_parallel(workers=4, chunk_bytes=512) == (True, [])
+
+
+def test_parallel_reports_same_errors_as_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _fill(40)
+
+    with open(LOG_PATH, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    r = json.loads(lines[5])
+    r["inputs"]["prompt"] = "edited"
+    lines[5] = json.dumps(r) + "\n"
+    r = json.loads(lines[17])
+    r["integrity"]["this_hash"] = None
+    lines[17] = json.dumps(r) + "\n"
+    lines[30] = "{not json\n"
+    with open(LOG_PATH, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+    serial = verify_ledger(full=True)
+    assert not serial[0]
+    assert verify_ledger_parallel(workers=4, chunk_bytes=512) == serial
+    assert verify_ledger_parallel(workers=1) == serial
+
+
+def test_error_cap_reaches_the_workers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _fill(40)
+    with open(LOG_PATH, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(LOG_PATH, "w", encoding="utf-8") as f:
+        f.writelines(line.replace('"NOTIFY"', '"LOG_ONLY"') for line in lines)
+
+    serial = verify_ledger(full=True, max_errors=3)
+    assert len(serial[1]) == 3
+    assert verify_ledger_parallel(workers=4, chunk_bytes=512, max_errors=3) == serial
+    # One worker over the whole file stops reading once it has three errors.
+    assert _verify_chunk(LOG_PATH, 0, os.path.getsize(LOG_PATH), 3).count < 40
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from pat.config import DEFAULT_POLICY, PolicyRuleSet
+from pat.hashing import compute_rules_hash
+from pat.policy import compile_policy, extract_confidence, run_policy_checks
+
+
+def test_policy_compiles_once_and_evaluates_like_the_rule_set():
+    compiled = DEFAULT_POLICY.compile()
+    assert compile_policy(DEFAULT_POLICY) is compiled
+    assert compile_policy(compiled) is compiled
+    assert compiled.rules_hash == compute_rules_hash(DEFAULT_POLICY.as_text())
+
+    strict = PolicyRuleSet("P", "1", ("NOTIFY",), 0.95)
+    assert strict.compile().high_stakes == frozenset({"NOTIFY"})
+    assert strict.compile().rules_hash != compiled.rules_hash
+
+    _, decision, reason, required = run_policy_checks(" lockdown ", 0.9, True, DEFAULT_POLICY)
+    assert (decision, reason, required) == ("PERMITTED", "Approved + confidence >= threshold", True)
+    _, decision, _, required = run_policy_checks("NOTIFY", 0.9, False, strict)
+    assert (decision, required) == ("BLOCKED", True)
+    checks, decision, _, _ = compiled.check("SELF_DESTRUCT", 1.0, True)
+    assert decision == "BLOCKED" and checks[0]["result"] == "FAIL"
+
+    assert extract_confidence("Confidence = 92%") == 0.92
+    assert extract_confidence("confidence: .5") == 0.5
+    assert extract_confidence("no number") is None
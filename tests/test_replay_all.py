@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+
+from pat.cli import main
+from pat.config import DEFAULT_POLICY, LOG_PATH
+from pat.ledger import invalidate_ledger_head, reset_log, rotate_segment
+from pat.receipt import append_new_receipts
+from pat.replay import replay_all
+
+
+def _items(n: int, **overrides):
+    return [
+        dict(
+            {
+                "prompt": f"p{i}",
+                "model_output_raw": f"confidence: 0.{80 + i % 10}",
+                "proposed_action_type": ("NOTIFY", "LOCKDOWN")[i % 2],
+                "proposed_action_target": "X",
+                "proposed_action_params": {},
+                "confidence_override": None,
+            },
+            **overrides,
+        )
+        for i in range(n)
+    ]
+
+
+def test_replay_all_memoizes_and_reports_mismatches(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    append_new_receipts(_items(30), policy=DEFAULT_POLICY)
+    rotate_segment()
+    # 1 and 1.0 encode differently in the stored checks; both must match.
+    append_new_receipts(_items(2, confidence_override=1) + _items(2, confidence_override=1.0), policy=DEFAULT_POLICY)
+    append_new_receipts(_items(10), policy=DEFAULT_POLICY)
+
+    report = replay_all(DEFAULT_POLICY, workers=1)
+    assert report.ok and report.total == 44 and report.matched == 44
+    assert report.distinct_inputs < 44
+
+    with open(LOG_PATH, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    r = json.loads(lines[6])
+    r["decision"]["result"] = "PERMITTED" if r["decision"]["result"] == "BLOCKED" else "BLOCKED"
+    lines[6] = json.dumps(r) + "\n"
+    with open(LOG_PATH, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    invalidate_ledger_head()
+
+    serial = replay_all(DEFAULT_POLICY, workers=1)
+    pooled = replay_all(DEFAULT_POLICY, workers=2, chunk_bytes=1024)
+    assert serial == pooled
+    assert (serial.matched, serial.mismatched) == (43, 1)
+    assert serial.mismatches[0]["line"] == 37 and serial.mismatches[0]["event_id"] == r["event_id"]
+
+    assert main(["replay", "--workers", "1"]) == 1
+    out = capsys.readouterr().out
+    assert "mismatched:      1" in out and "Line 37" in out and "REPLAY MISMATCH" in out
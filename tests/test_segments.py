@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from pat.config import DEFAULT_POLICY, SEGMENTS_DIR
+from pat.ledger import (
+    configure_rotation,
+    find_latest_by_event_id,
+    get_ledger_head,
+    read_all_receipts,
+    reset_log,
+    rotate_segment,
+    tail_receipts,
+    verify_ledger,
+)
+from pat.parallel import verify_ledger_parallel
+from pat.receipt import append_new_receipt
+from pat.segments import _write_manifest, file_sha256, load_manifests, relocate_segment
+
+
+def _append(n: int):
+    return [
+        append_new_receipt(
+            prompt=f"p{i}",
+            model_output_raw="confidence: 0.92",
+            proposed_action_type="NOTIFY",
+            proposed_action_target="X",
+            proposed_action_params={},
+            confidence_override=None,
+            policy=DEFAULT_POLICY,
+        )
+        for i in range(n)
+    ]
+
+
+def test_reads_and_verification_span_segments(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    first = _append(5)
+    assert verify_ledger() == (True, [])
+    rotate_segment()
+    _append(3)
+    rotate_segment()
+    last = _append(2)
+
+    manifests = load_manifests(SEGMENTS_DIR)
+    assert [m.count for m in manifests] == [5, 3]
+    assert manifests[1].prev_hash == manifests[0].last_hash
+    assert get_ledger_head().count == 10
+    assert get_ledger_head().last_hash == last[-1]["integrity"]["this_hash"]
+
+    receipts = read_all_receipts()
+    assert len(receipts) == 10 and receipts[0] == first[0]
+    assert find_latest_by_event_id(first[2]["event_id"]) == first[2]
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = tail_receipts(4, before=cursor)
+        seen.extend(r for _, r in page)
+        if cursor is None:
+            break
+    assert seen == receipts[::-1]
+
+    assert verify_ledger() == (True, [])
+    assert verify_ledger(full=True) == (True, [])
+    assert verify_ledger(full=True, trust_sealed=False) == (True, [])
+    assert verify_ledger_parallel(workers=2, chunk_bytes=256) == (True, [])
+
+    relocate_segment(SEGMENTS_DIR, 1, str(tmp_path / "cold"))
+    assert find_latest_by_event_id(first[2]["event_id"]) == first[2]
+    assert verify_ledger(full=True) == (True, [])
+
+
+def test_sealed_segment_edit_is_caught_by_manifest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _append(4)
+    m = rotate_segment()
+    _append(1)
+
+    with open(m.path, "r+b") as f:
+        f.seek(10)
+        f.write(b"X")
+
+    ok, errors = verify_ledger(trust_sealed=True)
+    assert not ok
+    assert errors[0].startswith("Segment 1: sha256 mismatch")
+
+
+def test_full_verify_does_not_trust_a_rewritten_manifest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _append(4)
+    m = rotate_segment()
+    _append(1)
+    assert verify_ledger() == (True, [])
+
+    # Edit a sealed record and re-seal its manifest to match the new bytes.
+    with open(m.path, "rb") as f:
+        data = f.read()
+    with open(m.path, "wb") as f:
+        f.write(data.replace(b'"p1"', b'"q1"', 1))
+    _write_manifest(SEGMENTS_DIR, replace(m, sha256=file_sha256(m.path)))
+    load_manifests(SEGMENTS_DIR, force=True)
+    assert verify_ledger(trust_sealed=True) == (True, [])
+
+    ok, errors = verify_ledger(full=True)
+    assert not ok and errors[0].startswith("Line 2: canonical_hash mismatch")
+
+
+def test_size_based_rotation(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    configure_rotation(max_bytes=3000)
+    try:
+        _append(12)
+    finally:
+        configure_rotation()
+    assert len(load_manifests(SEGMENTS_DIR)) >= 2
+    assert get_ledger_head().count == 12
+    assert verify_ledger(full=True, trust_sealed=False) == (True, [])
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+import pat.keys as keys
+from pat.keys import (
+    _privkey_to_b64,
+    _pubkey_to_b64,
+    ensure_demo_approver,
+    load_keyring,
+    reinstate_signer,
+    reload_signers,
+    revoke_signer,
+    save_keyring,
+    sign_with_approver,
+    verify_signature,
+)
+
+
+def _rotate(approver_id: str) -> None:
+    priv = Ed25519PrivateKey.generate()
+    kr = load_keyring()
+    kr["keys"][approver_id]["private_key_b64"] = _privkey_to_b64(priv)
+    kr["keys"][approver_id]["public_key_b64"] = _pubkey_to_b64(priv.public_key())
+    save_keyring(kr)
+
+
+def test_signer_handles_are_cached_and_sign_without_the_keyring_lock(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    approver_id = ensure_demo_approver()
+    reload_signers()
+
+    loads = []
+    real = keys._b64_to_privkey
+    monkeypatch.setattr(keys, "_b64_to_privkey", lambda b64: loads.append(b64) or real(b64))
+
+    with keys._key_lock:  # a keyring writer holding the lock must not block approvals
+        with ThreadPoolExecutor(8) as pool:
+            sigs = list(pool.map(lambda i: sign_with_approver(approver_id, f"m{i}"), range(64)))
+    assert len(loads) == 1
+    assert all(verify_signature(approver_id, f"m{i}", s) for i, s in enumerate(sigs))
+
+
+def test_revoke_and_reinstate(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    approver_id = ensure_demo_approver()
+    sign_with_approver(approver_id, "x")
+
+    revoke_signer(approver_id)
+    with pytest.raises(ValueError):
+        sign_with_approver(approver_id, "x")
+
+    # Neither a rotated keyring nor a reload lifts the revocation.
+    _rotate(approver_id)
+    with pytest.raises(ValueError):
+        sign_with_approver(approver_id, "x")
+    reload_signers(approver_id)
+    reload_signers()
+    with pytest.raises(ValueError):
+        sign_with_approver(approver_id, "x")
+    reinstate_signer(approver_id)
+    assert verify_signature(approver_id, "x", sign_with_approver(approver_id, "x"))
+
+
+def test_rotated_keys_are_picked_up_without_reload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    approver_id = ensure_demo_approver()
+    reload_signers()
+    old = sign_with_approver(approver_id, "x")
+
+    _rotate(approver_id)
+    new = sign_with_approver(approver_id, "x")
+    assert new != old and verify_signature(approver_id, "x", new)
+
+
+def test_revocation_is_per_keyring(tmp_path, monkeypatch):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    monkeypatch.chdir(tmp_path / "a")
+    approver_id = ensure_demo_approver()
+    revoke_signer(approver_id)
+    with pytest.raises(ValueError):
+        sign_with_approver(approver_id, "x")
+
+    monkeypatch.chdir(tmp_path / "b")
+    assert ensure_demo_approver() == approver_id
+    assert verify_signature(approver_id, "x", sign_with_approver(approver_id, "x"))
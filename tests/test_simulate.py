@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pat.cli import main  # noqa: E402
+from pat.config import DEFAULT_POLICY  # noqa: E402
+from pat.ledger import iter_receipts, reset_log, rotate_segment  # noqa: E402
+from pat.policy import compile_policy  # noqa: E402
+from pat.receipt import append_new_receipts  # noqa: E402
+from pat.simulate import load_decision_columns, simulate  # noqa: E402
+
+
+def _items(n: int):
+    return [
+        {
+            "prompt": f"p{i}",
+            "model_output_raw": "no score" if i % 7 == 0 else f"confidence: 0.{70 + i % 30}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN", "LOG_ONLY", "bogus")[i % 4],
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": 1 if i % 11 == 0 else None,
+        }
+        for i in range(n)
+    ]
+
+
+def test_whatif_matches_per_receipt_checks(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    append_new_receipts(_items(40), policy=DEFAULT_POLICY)
+    rotate_segment()
+    append_new_receipts(_items(25), policy=DEFAULT_POLICY)
+
+    serial = load_decision_columns(workers=1)
+    pooled = load_decision_columns(workers=2, chunk_bytes=2048)
+    assert len(serial) == len(pooled) == 65
+    assert [serial.actions[c] for c in serial.action_code] == [pooled.actions[c] for c in pooled.action_code]
+
+    candidates = [
+        DEFAULT_POLICY,
+        replace(DEFAULT_POLICY, confidence_threshold=0.75),
+        replace(DEFAULT_POLICY, confidence_threshold=0.95, high_stakes_actions=("NOTIFY",)),
+    ]
+    receipts = list(iter_receipts())
+    reports = simulate(candidates, columns=pooled, bucket_s=3600)
+    assert reports[0].to_blocked == reports[0].to_permitted == 0
+
+    for policy, rep in zip(candidates, reports):
+        to_blocked = to_permitted = 0
+        by_action = {}
+        for r in receipts:
+            _, decision, _, _ = compile_policy(policy).check(
+                r["proposed_action"]["type"], r["model_output"]["effective_confidence"], r["approval"]["approved"]
+            )
+            stored = r["decision"]["result"]
+            if stored != decision:
+                flip = by_action.setdefault(r["proposed_action"]["type"], [0, 0])
+                flip[decision == "PERMITTED"] += 1
+                to_blocked += decision == "BLOCKED"
+                to_permitted += decision == "PERMITTED"
+        assert (rep.to_blocked, rep.to_permitted) == (to_blocked, to_permitted)
+        assert rep.by_action == by_action
+        assert sum(b + p for b, p in rep.by_bucket.values()) == to_blocked + to_permitted
+    assert reports[1].to_permitted > 0 and reports[2].to_blocked > 0
+    # The columnar sidecar gives the same answers without parsing JSON.
+    assert simulate(candidates, bucket_s=3600) == reports
+
+    assert main(["whatif", "--threshold", "0.75", "0.9", "--workers", "1"]) == 0
+    out = capsys.readouterr().out
+    assert "Loaded 65 receipts" in out and f"BLOCKED->PERMITTED: {reports[1].to_permitted}" in out
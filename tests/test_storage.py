@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+
+from pat.cli import main
+from pat.config import DEFAULT_POLICY
+from pat.httpcache import verify_etag
+from pat.keys import ensure_demo_approver
+from pat.ledger import (
+    configure_storage,
+    configure_writer,
+    export_jsonl,
+    find_latest_by_event_id,
+    get_ledger_head,
+    import_jsonl,
+    inclusion_proof,
+    read_all_receipts,
+    reset_log,
+    rotate_segment,
+    storage_backend,
+    tail_receipts,
+    tamper_last_log_line,
+    verify_ledger,
+)
+from pat.query import EventFilter
+from pat.receipt import append_approval_transition, append_new_receipts
+from pat.replay import replay_all
+from pat.storage import LedgerBackend
+
+
+def _items(n: int):
+    return [
+        {
+            "prompt": f"storage {i}",
+            "model_output_raw": f"confidence: 0.{70 + i % 30}",
+            "proposed_action_type": ("NOTIFY", "LOCKDOWN", "LOG_ONLY")[i % 3],
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def sqlite_ledger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    configure_storage("sqlite:ledger.db")
+    try:
+        reset_log()
+        yield tmp_path
+    finally:
+        configure_storage(None)
+
+
+def test_sqlite_chain_lookups_and_pages(sqlite_ledger):
+    receipts = append_new_receipts(_items(40), policy=DEFAULT_POLICY)
+    approved = append_approval_transition(receipts[1], approver_id=ensure_demo_approver(), policy=DEFAULT_POLICY)
+
+    head = get_ledger_head()
+    assert head.count == 41
+    assert head.last_hash == approved["integrity"]["this_hash"]
+    assert read_all_receipts() == receipts + [approved]
+    assert find_latest_by_event_id(receipts[1]["event_id"]) == approved
+    assert find_latest_by_event_id("EVT-missing") is None
+    assert inclusion_proof(receipts[5]["event_id"])["leaf_index"] == 5
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = tail_receipts(7, before=cursor)
+        seen.extend(r for _, r in page)
+        if cursor is None:
+            break
+    assert seen == list(reversed(receipts + [approved]))
+
+    page, _ = tail_receipts(100, where=EventFilter(decision="BLOCKED", action_type="LOCKDOWN"))
+    expected = [
+        r for r in reversed(receipts + [approved])
+        if r["decision"]["result"] == "BLOCKED" and r["proposed_action"]["type"] == "LOCKDOWN"
+    ]
+    assert [r for _, r in page] == expected
+    assert tail_receipts(100, where=EventFilter(until="2000-01-01T00:00:00Z"))[0] == []
+
+    ok, errors = verify_ledger(full=True)
+    assert ok, errors
+    assert verify_ledger()[0]
+
+
+def test_sqlite_tamper_is_caught(sqlite_ledger):
+    append_new_receipts(_items(5), policy=DEFAULT_POLICY)
+    assert verify_ledger()[0]
+    assert tamper_last_log_line()[0]
+    ok, errors = verify_ledger()
+    assert not ok
+    assert any("Line 5" in e for e in errors)
+
+
+def test_sqlite_head_stamp_follows_in_place_rewrites(sqlite_ledger):
+    append_new_receipts(_items(3), policy=DEFAULT_POLICY)
+    backend = storage_backend()
+    before = get_ledger_head()
+    _, last = next(backend.scan(reverse=True))
+    # Same length, same this_hash: only the change stamp can tell.
+    assert backend.replace_last(last.replace(b'"storage 2"', b'"storage X"'))
+    after = get_ledger_head()
+    assert (after.size, after.count, after.last_hash) == (before.size, before.count, before.last_hash)
+    assert verify_etag(after) != verify_etag(before)
+
+    threads = [threading.Thread(target=backend.head) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    conns = list(backend._conns)
+    assert len(conns) == 4
+    backend.close()
+    for conn in conns:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert get_ledger_head().count == 3
+
+
+def test_sqlite_with_group_commit_writer(sqlite_ledger):
+    configure_writer("always")
+    try:
+        append_new_receipts(_items(10), policy=DEFAULT_POLICY)
+    finally:
+        configure_writer(None)
+    assert get_ledger_head().count == 10
+    assert verify_ledger(full=True)[0]
+
+
+def test_sqlite_replay_runs_in_process(sqlite_ledger, capsys):
+    append_new_receipts(_items(12), policy=DEFAULT_POLICY)
+    report = replay_all(DEFAULT_POLICY, workers=4)
+    assert report.ok and report.total == 12
+    assert main(["replay", "--workers", "4"]) == 0
+    assert "REPLAY OK" in capsys.readouterr().out
+
+
+def test_sqlite_verify_with_workers_runs_in_process(sqlite_ledger, capsys):
+    append_new_receipts(_items(12), policy=DEFAULT_POLICY)
+    assert main(["verify", "--workers", "4"]) == 0
+    assert "VERIFIED" in capsys.readouterr().out
+    tamper_last_log_line()
+    assert main(["verify", "--workers", "4"]) == 1
+
+
+def test_jsonl_export_round_trips_byte_identical(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    append_new_receipts(_items(25), policy=DEFAULT_POLICY)
+    rotate_segment()
+    append_new_receipts(_items(10), policy=DEFAULT_POLICY)
+    export_jsonl("from_jsonl.jsonl")
+
+    configure_storage("sqlite:ledger.db")
+    try:
+        reset_log()
+        assert import_jsonl("from_jsonl.jsonl") == 35
+        with pytest.raises(ValueError):
+            import_jsonl("from_jsonl.jsonl")
+        with pytest.raises(ValueError):
+            rotate_segment()
+        assert verify_ledger(full=True)[0]
+        export_jsonl("from_sqlite.jsonl")
+    finally:
+        configure_storage(None)
+
+    with open("from_jsonl.jsonl", "rb") as a, open("from_sqlite.jsonl", "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_unknown_storage_spec():
+    with pytest.raises(ValueError):
+        configure_storage("postgres://nope")
+
+
+def test_incomplete_backend_fails_at_construction():
+    class Partial(LedgerBackend):
+        def head(self):
+            raise AssertionError
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import threading
+
+import pat.ledger as ledger
+from pat.columns import _epoch
+from pat.config import DEFAULT_POLICY, TIME_INDEX_PATH
+from pat.hashing import compute_canonical_hash, compute_this_hash
+from pat.keys import ensure_demo_approver
+from pat.ledger import (
+    append_chained,
+    find_latest_by_event_id,
+    iter_receipts,
+    iter_receipts_between,
+    rebuild_time_index,
+    reset_log,
+    rotate_segment,
+    seek_time,
+    verify_ledger,
+)
+from pat.receipt import append_approval_transition, append_new_receipts, build_new_receipt, next_event_id
+
+
+def _old_style(i: int, ts: str, head):
+    # A backfilled receipt with an older-format id and its own ts_utc.
+    r = build_new_receipt(
+        prompt=f"backfill {i}",
+        model_output_raw="confidence: 0.92",
+        proposed_action_type="NOTIFY",
+        proposed_action_target="X",
+        proposed_action_params={},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+        head=head,
+    )
+    r["event_id"] = f"{ts}_{i:05d}"
+    r["ts_utc"] = ts
+    integrity = r["integrity"]
+    integrity["canonical_hash"] = compute_canonical_hash(r)
+    integrity["this_hash"] = compute_this_hash(integrity["prev_hash"], integrity["canonical_hash"])
+    return r
+
+
+def _items(n: int):
+    return [
+        {
+            "prompt": f"p{i}",
+            "model_output_raw": "confidence: 0.7",
+            "proposed_action_type": "LOCKDOWN",
+            "proposed_action_target": "X",
+            "proposed_action_params": {},
+            "confidence_override": None,
+        }
+        for i in range(n)
+    ]
+
+
+def test_event_ids_sort_by_time_and_never_collide():
+    ids = []
+    lock = threading.Lock()
+
+    def worker():
+        mine = [next_event_id() for _ in range(500)]
+        assert mine == sorted(mine)
+        with lock:
+            ids.extend(mine)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(w, next_event_id().encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    child = os.read(r, 200).decode()
+    os.close(r)
+    os.close(w)
+
+    ids.append(child)
+    assert len(set(ids)) == len(ids)
+    assert child.split("_")[1].split("-")[0] != ids[0].split("_")[1].split("-")[0]
+    assert next_event_id() > max(ids[:-1])
+
+
+def test_time_ranges_match_a_full_parse(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ledger, "TIME_INDEX_BLOCK_BYTES", 4096)
+    reset_log()
+    # Backfilled receipts out of time order, in the older id format.
+    stamps = [f"2026-01-{1 + (i * 7) % 28:02d}T{i % 24:02d}:00:00Z" for i in range(40)]
+    for i, ts in enumerate(stamps):
+        append_chained(lambda head, i=i, ts=ts: _old_style(i, ts, head))
+    live = append_new_receipts(_items(20), policy=DEFAULT_POLICY)
+    rotate_segment()
+    approver = ensure_demo_approver()
+    append_approval_transition(live[3], approver_id=approver, policy=DEFAULT_POLICY)
+    append_new_receipts(_items(5), policy=DEFAULT_POLICY)
+    assert verify_ledger(full=True, trust_sealed=False)[0]
+
+    assert find_latest_by_event_id("2026-01-08T01:00:00Z_00001")["ts_utc"] == stamps[1]
+    everything = list(iter_receipts(with_offsets=True))
+    assert len(ledger.time_index().blocks) > 3
+
+    bounds = [None, _epoch("2026-01-05T00:00:00Z"), _epoch("2026-01-20T12:00:00Z"), _epoch(live[0]["ts_utc"])]
+    for since in bounds:
+        for until in bounds:
+            expected = [
+                (o, r)
+                for o, r in everything
+                if (since is None or _epoch(r["ts_utc"]) >= since) and (until is None or _epoch(r["ts_utc"]) < until)
+            ]
+            assert list(iter_receipts_between(since, until, with_offsets=True)) == expected, (since, until)
+
+    since = _epoch("2026-01-25T00:00:00Z")
+    cursor = seek_time(since)
+    assert all(_epoch(r["ts_utc"]) < since for o, r in everything if o < cursor)
+
+
+def test_index_extends_on_append_and_recovers_a_torn_tail(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ledger, "TIME_INDEX_BLOCK_BYTES", 2048)
+    reset_log()
+    append_new_receipts(_items(10), policy=DEFAULT_POLICY)
+    idx = ledger.time_index()
+    append_new_receipts(_items(10), policy=DEFAULT_POLICY)
+    assert idx is ledger.time_index()
+    assert idx.scanned == os.path.getsize("pat_log.jsonl")
+    blocks = list(idx.blocks)
+    assert blocks
+
+    with open(TIME_INDEX_PATH, "ab") as f:
+        f.write(b'[12,34')
+    ledger._invalidate_time_index()
+    assert ledger.time_index().blocks == blocks
+    assert len(list(iter_receipts_between())) == 20
+
+    rebuild_time_index()
+    assert ledger.time_index().blocks == blocks
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pat.ledger as ledger
+from pat.checkpoint import load_checkpoint
+from pat.config import DEFAULT_POLICY, VERIFY_CHECKPOINT_PATH
+from pat.ledger import append_receipt, reset_log, tamper_last_log_line, verify_ledger
+from pat.receipt import build_new_receipt
+
+
+def _append(n: int) -> None:
+    for i in range(n):
+        append_receipt(
+            build_new_receipt(
+                prompt=str(i),
+                model_output_raw="confidence: 0.92",
+                proposed_action_type="NOTIFY",
+                proposed_action_target="X",
+                proposed_action_params={},
+                confidence_override=None,
+                policy=DEFAULT_POLICY,
+            )
+        )
+
+
+def test_verify_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _append(3)
+    assert verify_ledger() == (True, [])
+    assert load_checkpoint(VERIFY_CHECKPOINT_PATH).count == 3
+
+    _append(2)
+    calls = []
+    real = ledger.compute_canonical_hash
+    monkeypatch.setattr(ledger, "compute_canonical_hash", lambda r: calls.append(1) or real(r))
+
+    assert verify_ledger() == (True, [])
+    # Two new records plus the re-hashed checkpoint anchor.
+    assert len(calls) == 3
+    assert load_checkpoint(VERIFY_CHECKPOINT_PATH).count == 5
+
+    calls.clear()
+    assert verify_ledger(full=True) == (True, [])
+    assert len(calls) == 5
+
+
+def test_rewrite_behind_checkpoint_is_detected(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    _append(3)
+    assert verify_ledger()[0]
+
+    ok, _ = tamper_last_log_line()
+    assert ok
+    ok, errors = verify_ledger()
+    assert not ok
+    assert errors[0].startswith("Line 3:")
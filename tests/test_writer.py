@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from pat.config import DEFAULT_POLICY
+from pat.ledger import (
+    append_receipt,
+    configure_writer,
+    find_latest_by_event_id,
+    get_ledger_head,
+    read_all_receipts,
+    reset_log,
+    verify_chain,
+)
+from pat.receipt import build_new_receipt
+from pat.writer import FsyncPolicy
+
+
+def _new(prompt: str):
+    return build_new_receipt(
+        prompt=prompt,
+        model_output_raw="confidence: 0.92",
+        proposed_action_type="NOTIFY",
+        proposed_action_target="X",
+        proposed_action_params={},
+        confidence_override=None,
+        policy=DEFAULT_POLICY,
+    )
+
+
+def test_policy_parsing():
+    assert FsyncPolicy.parse("always") == FsyncPolicy(fsync=True)
+    assert FsyncPolicy.parse("none") == FsyncPolicy(fsync=False)
+    assert FsyncPolicy.parse("batch(5ms, 64)") == FsyncPolicy(fsync=True, window_ms=5.0, max_batch=64)
+    assert FsyncPolicy.parse("batch(32)").max_batch == 32
+    with pytest.raises(ValueError):
+        FsyncPolicy.parse("sometimes")
+
+
+def test_group_commit_appends_from_many_threads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    receipts = [_new(str(i)) for i in range(40)]
+    for i, r in enumerate(receipts):
+        r["event_id"] = f"evt-{i}"
+
+    configure_writer("batch(5ms,8)")
+    try:
+        threads = [
+            threading.Thread(target=lambda chunk: [append_receipt(r) for r in chunk], args=(receipts[k::4],))
+            for k in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        configure_writer(None)
+
+    assert get_ledger_head().count == 40
+    assert find_latest_by_event_id("evt-17") == receipts[17]
+
+
+def test_always_policy_keeps_chain(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_log()
+    configure_writer("always")
+    try:
+        for i in range(5):
+            append_receipt(_new(str(i)))
+    finally:
+        configure_writer(None)
+    ok, errors = verify_chain(read_all_receipts())
+    assert ok, errors